@@ -1,5 +1,8 @@
 """Command Line Interface for AnyMotion API."""
 
-import pkg_resources
+try:
+    from importlib import metadata
+except ImportError:  # pragma: no cover
+    import importlib_metadata as metadata  # type: ignore
 
-__version__ = pkg_resources.get_distribution(__name__).version
+__version__ = metadata.version(__name__)
@@ -0,0 +1,220 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from anymotion_sdk.client import UploadResult
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+
+from .client import CliClient
+from .poller import JobResult
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+MAX_IO_WORKERS = 16
+
+
+class AsyncClient(object):
+    """Asyncio interface of CliClient.
+
+    HTTP requests are sent on a bounded pool of I/O threads that share the
+    keep-alive connections of the client, while waiting for processing is done
+    by the shared poller without holding a thread. Therefore, hundreds of jobs
+    can be in flight at the same time.
+
+    Examples:
+        >>> aclient = AsyncClient(client)
+        >>> keypoint_id = await aclient.extract_keypoint(image_id=1)
+        >>> await aclient.wait_for_extraction(keypoint_id)
+        <JobResult [SUCCESS]>
+    """
+
+    def __init__(
+        self,
+        client: CliClient,
+        max_workers: int = MAX_IO_WORKERS,
+        connections: Optional[int] = None,
+    ):
+        """Initialize the client.
+
+        Args:
+            client: The client to send the requests.
+            max_workers: The number of the I/O threads.
+            connections: The number of connections used at the same time, if it
+                is more than max_workers, e.g. a file is downloaded in parts.
+        """
+        self.client = client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        _resize_connection_pool(client, max(max_workers, connections or 0))
+
+    def close(self) -> None:
+        """Shut down the I/O threads."""
+        self._executor.shutdown(wait=False)
+
+    async def call(self, func: Callable[..., R], *args, **kwargs) -> R:
+        """Run the blocking function on the I/O threads."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(func, *args, **kwargs)
+        )
+
+    async def get_one_data(self, endpoint: str, endpoint_id: int, **kwargs) -> dict:
+        """Get one piece of data."""
+        return await self.call(
+            self.client.get_one_data, endpoint, endpoint_id, **kwargs
+        )
+
+    async def get_list_data(
+        self, endpoint: str, params: Optional[dict] = None
+    ) -> List[dict]:
+        """Get list data."""
+        return await self.call(self.client.get_list_data, endpoint, params=params)
+
+    async def upload(
+        self, path: Union[str, Path], text: Optional[str] = None
+    ) -> UploadResult:
+        """Upload movie or image to the cloud storage."""
+        return await self.call(self.client.upload, path, text=text)
+
+    async def find_uploaded(self, path: Union[str, Path]) -> Optional[UploadResult]:
+        """Find the image or movie uploaded from the same content as the file."""
+        return await self.call(self.client.find_uploaded, path)
+
+    async def download(self, drawing_id: int, path: Path, **kwargs) -> Path:
+        """Download a file from drawing_id."""
+        return await self.call(self.client.download, drawing_id, path, **kwargs)
+
+    async def download_file(self, url: str, path: Path, **kwargs) -> None:
+        """Download the file of the url to path."""
+        return await self.call(self.client.download_file, url, path, **kwargs)
+
+    async def find_keypoint(self, **kwargs) -> Optional[int]:
+        """Find the latest keypoint extracted successfully from the media."""
+        return await self.call(self.client.find_keypoint, **kwargs)
+
+    async def extract_keypoint(self, **kwargs) -> int:
+        """Start keypoint extraction."""
+        return await self.call(self.client.extract_keypoint, **kwargs)
+
+    async def draw_keypoint(self, **kwargs) -> int:
+        """Start drawing for keypoint_id or comparison_id."""
+        return await self.call(self.client.draw_keypoint, **kwargs)
+
+    async def analyze_keypoint(self, keypoint_id: int, rule: Union[list, dict]) -> int:
+        """Start analyze for keypoint_id."""
+        return await self.call(self.client.analyze_keypoint, keypoint_id, rule)
+
+    async def compare_keypoint(self, source_id: int, target_id: int) -> int:
+        """Start compare for source_id and target_id."""
+        return await self.call(self.client.compare_keypoint, source_id, target_id)
+
+    async def wait_for_extraction(self, keypoint_id: int) -> JobResult:
+        """Wait for extraction."""
+        return await self._wait_for("keypoints", keypoint_id)
+
+    async def wait_for_drawing(self, drawing_id: int) -> JobResult:
+        """Wait for drawing."""
+        return await self._wait_for("drawings", drawing_id)
+
+    async def wait_for_analysis(self, analysis_id: int) -> JobResult:
+        """Wait for analysis."""
+        return await self._wait_for("analyses", analysis_id)
+
+    async def wait_for_comparison(self, comparison_id: int) -> JobResult:
+        """Wait for comparison."""
+        return await self._wait_for("comparisons", comparison_id)
+
+    async def _wait_for(self, endpoint: str, job_id: int) -> JobResult:
+        future = self.client.submit_wait(endpoint, job_id)
+        return await asyncio.wrap_future(future)
+
+
+def run(main: Awaitable[R]) -> R:
+    """Run the coroutine on a new event loop from synchronous code."""
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            _cancel_all_tasks(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+async def map_unordered(
+    func: Callable[[T], Awaitable[R]], items: Iterable[T], jobs: int
+) -> AsyncIterator[Tuple[T, "asyncio.Future[R]"]]:
+    """Run func for each item with at most jobs items at the same time.
+
+    The pairs of item and finished task are yielded in order of completion, so
+    that the caller can report each result as soon as it is available.
+    Calling ``task.result()`` re-raises the exception raised by func.
+    """
+    semaphore = asyncio.Semaphore(jobs)
+    queue: "asyncio.Queue[Tuple[T, asyncio.Future[R]]]" = asyncio.Queue()
+
+    async def run_item(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    tasks = []
+    for item in items:
+        task = asyncio.ensure_future(run_item(item))
+        task.add_done_callback(partial(lambda x, t: queue.put_nowait((x, t)), item))
+        tasks.append(task)
+
+    try:
+        for _ in range(len(tasks)):
+            yield await queue.get()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _cancel_all_tasks(loop: asyncio.AbstractEventLoop) -> None:
+    all_tasks = getattr(asyncio, "all_tasks", None) or getattr(
+        asyncio.Task, "all_tasks"
+    )
+    tasks = [task for task in all_tasks(loop) if not task.done()]
+    for task in tasks:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+
+def _resize_connection_pool(client: CliClient, maxsize: int) -> None:
+    """Keep as many connections alive as used at the same time.
+
+    The pool is replaced only if it is smaller, so the connections kept alive
+    are reused by the following commands in interactive mode.
+    """
+    session = client.session.session
+    # An adapter may be mounted for both prefixes.
+    replaced = {}
+    for prefix in ["http://", "https://"]:
+        adapter = session.get_adapter(prefix)
+        if not isinstance(adapter, HTTPAdapter):
+            continue
+        if getattr(adapter, "_pool_maxsize", DEFAULT_POOLSIZE) >= maxsize:
+            continue
+        if adapter not in replaced:
+            replaced[adapter] = HTTPAdapter(
+                max_retries=adapter.max_retries, pool_maxsize=maxsize
+            )
+        session.mount(prefix, replaced[adapter])
+    for adapter in replaced:
+        adapter.close()
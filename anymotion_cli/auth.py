@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from anymotion_sdk.auth import Authentication
+from anymotion_sdk.session import HttpSession
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+
+class TokenCache(object):
+    """Cache of the access token shared by CLI processes.
+
+    The token is saved to the file with permissions that only the owner can
+    read and write. While a process is getting a new token, the other processes
+    wait for it and then reuse the token.
+
+    Examples:
+        >>> cache = TokenCache(get_app_dir() / "tokens" / "default.json")
+        >>> with cache.lock():
+        ...     cache.save("key", "token", 1580086399)
+        ...     cache.load("key")
+        ('token', 1580086399)
+    """
+
+    _thread_lock = threading.Lock()
+
+    def __init__(self, file: Path):
+        self._file = file
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Lock the cache between processes and threads."""
+        self._file.parent.mkdir(mode=0o700, exist_ok=True)
+        lock_file = self._file.with_suffix(".lock")
+        with self._thread_lock:
+            fd = os.open(str(lock_file), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def load(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return the cached token and its expiration date(unix time)."""
+        try:
+            data = json.loads(self._file.read_text())
+            if data["key"] != key:
+                return None
+            return str(data["token"]), float(data["expired_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, key: str, token: str, expired_at: float) -> None:
+        """Save the token and its expiration date(unix time)."""
+        data = json.dumps({"key": key, "token": token, "expired_at": expired_at})
+        tmp_file = self._file.with_suffix(".tmp")
+        try:
+            fd = os.open(str(tmp_file), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.chmod(str(tmp_file), 0o600)
+            tmp_file.replace(self._file)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """Remove the cached token."""
+        try:
+            self._file.unlink()
+        except OSError:
+            pass
+
+
+class CachedAuthentication(Authentication):
+    """Authenticate to AnyMotion with the token cached across CLI invocations.
+
+    The cached token is reused until shortly before its expiration date, only if
+    it was got with the same API URL and credentials.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        cache: TokenCache,
+        base_url: str = "https://api.customer.jp/",
+        session: Optional[HttpSession] = None,
+        buffer: int = 300,
+    ):
+        super().__init__(client_id, client_secret, base_url=base_url, session=session)
+        self._cache = cache
+        self._buffer = buffer
+
+        credentials = "\n".join([base_url, client_id, client_secret])
+        self._key = hashlib.sha256(credentials.encode()).hexdigest()
+
+    def _get_token(self) -> None:
+        with self._cache.lock():
+            cached = self._cache.load(self._key)
+            if cached is not None and cached[1] - self._buffer > time.time():
+                self._token, self.expired_at = cached
+                return
+
+            super()._get_token()
+            self._cache.save(self._key, str(self._token), self.expired_at)
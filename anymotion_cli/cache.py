@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import CACHE_SIZE
+
+# Endpoints of the resources that never change once they are finished.
+CACHEABLE_ENDPOINTS = ["images", "movies", "keypoints", "analyses", "comparisons"]
+
+
+def is_immutable(endpoint: str, data: Any) -> bool:
+    """Return True if the resource data will never change.
+
+    Images and movies do not change once they are uploaded. Keypoints, analyses
+    and comparisons do not change once they are finished successfully.
+    """
+    if endpoint not in CACHEABLE_ENDPOINTS or not isinstance(data, dict):
+        return False
+    if endpoint in ["images", "movies"]:
+        return True
+    return data.get("execStatus") == "SUCCESS"
+
+
+class ResponseCache(object):
+    """Size-bounded cache of API responses on disk.
+
+    Each response is saved to a file named by the hash of the key. Responses
+    larger than compress_threshold bytes, such as keypoints of a movie, are
+    saved compressed. When the total size exceeds max_size, the least recently
+    used files are removed.
+
+    Examples:
+        >>> cache = ResponseCache(get_app_dir() / "cache")
+        >>> cache.set(("api_url", "keypoints", 1), {"id": 1})
+        >>> cache.get(("api_url", "keypoints", 1))
+        {'id': 1}
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_size: int = CACHE_SIZE,
+        compress_threshold: int = 64 * 1024,
+    ):
+        self.directory = directory
+        self.max_size = max_size
+        self.compress_threshold = compress_threshold
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Return the cached data, or None if it is not cached."""
+        for path in self._paths(key):
+            try:
+                content = path.read_bytes()
+                if path.suffix == ".gz":
+                    content = gzip.decompress(content)
+                data = json.loads(content.decode())
+            except (OSError, ValueError, EOFError):
+                continue
+
+            # Update the access time used for LRU eviction.
+            try:
+                os.utime(str(path))
+            except OSError:
+                pass
+            return data
+        return None
+
+    def set(self, key: Tuple, data: Any) -> None:
+        """Save the data."""
+        content = json.dumps(data, separators=(",", ":")).encode()
+        path, other_path = self._paths(key)
+        if len(content) > self.compress_threshold:
+            content = gzip.compress(content)
+        else:
+            path, other_path = other_path, path
+
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=str(self.directory), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            Path(tmp_name).replace(path)
+        except OSError:
+            return
+        self._remove(other_path)
+
+        self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of entries and the total size(bytes)."""
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "size": sum(size for _, size, _ in entries),
+            "max_size": self.max_size,
+        }
+
+    def clear(self) -> None:
+        """Remove all the cached data."""
+        for path, _, _ in self._entries():
+            self._remove(path)
+
+    def _paths(self, key: Tuple) -> Tuple[Path, Path]:
+        name = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+        path = self.directory / f"{name}.json"
+        return path.with_suffix(".gz"), path
+
+    def _entries(self) -> List[Tuple[Path, int, float]]:
+        entries = []
+        try:
+            paths = list(self.directory.iterdir())
+        except OSError:
+            return []
+        for path in paths:
+            if path.suffix not in [".json", ".gz"]:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        total_size = sum(size for _, size, _ in entries)
+        for path, size, _ in sorted(entries, key=lambda x: x[2]):
+            if total_size <= self.max_size:
+                break
+            self._remove(path)
+            total_size -= size
+
+    def _remove(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
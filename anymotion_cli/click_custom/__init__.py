@@ -5,3 +5,4 @@ from .core import (  # noqa F401
     CustomOption,
 )
 from .decorators import custom_option  # noqa F401
+from .types import IntListParamType  # noqa F401
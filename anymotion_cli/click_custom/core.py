@@ -1,3 +1,6 @@
+from importlib import import_module
+from typing import Dict, List, Optional
+
 import click
 
 from .didyoumean import DYMMixin
@@ -39,10 +42,37 @@ class CustomCommand(CustomMixin, click.Command):
 
 
 class CustomCommandCollection(CustomMixin, click.CommandCollection):
-    """Custom click CommandCollection."""
-
-    def __init__(self, *args, **kwargs):
+    """Custom click CommandCollection.
+
+    In addition to sources, subcommands can be registered lazily as a mapping
+    of command name to the module that has the ``cli`` group of the command.
+    The module is imported only when the command is used, so that only the
+    dependencies of the invoked command are imported.
+
+    Examples:
+        >>> @click.group(
+        ...     cls=CustomCommandCollection,
+        ...     lazy_sources={"upload": "anymotion_cli.commands.upload"},
+        ... )
+        ... def cli():
+        ...     pass
+    """
+
+    def __init__(self, *args, lazy_sources: Optional[Dict[str, str]] = None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.lazy_sources = lazy_sources or {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:  # noqa: D102
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_sources))
+
+    def get_command(  # noqa: D102
+        self, ctx: click.Context, cmd_name: str
+    ) -> Optional[click.Command]:
+        module_name = self.lazy_sources.get(cmd_name)
+        if module_name is None:
+            return super().get_command(ctx, cmd_name)
+        source = import_module(module_name).cli  # type: ignore
+        return source.get_command(ctx, cmd_name)
 
 
 class CustomOption(GlobalHelpOption):
@@ -7,10 +7,16 @@
 # See https://github.com/click-contrib/click-repl/blob/master/LICENSE.
 
 
+import copy
+import inspect
 import os
 import shlex
 import sys
-from collections import defaultdict
+import threading
+import traceback
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+from functools import partial
 
 import click
 import click._bashcomplete
@@ -18,6 +24,7 @@ import click.parser
 from click.exceptions import Exit as ClickExit
 from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.history import InMemoryHistory
+from prompt_toolkit.patch_stdout import patch_stdout
 from prompt_toolkit.shortcuts import prompt
 
 from ..exceptions import ExitReplException
@@ -56,6 +63,8 @@ def _help_internal():
     formatter.indent()
     with formatter.section("External Commands"):
         formatter.write_text('prefix external commands with "!"')
+    with formatter.section("Background Commands"):
+        formatter.write_text('suffix commands with "&" to run them in the background')
     with formatter.section("Internal Commands"):
         formatter.write_text('prefix internal commands with ":"')
         info_table = defaultdict(list)
@@ -74,8 +83,147 @@ def _help_internal():
     return formatter.getvalue()
 
 
+class _BackgroundCommand(object):
+    """Command to be run in the background, returned by the ":bg" command."""
+
+    def __init__(self, command):
+        self.command = command
+
+
+class _BackgroundJobs(object):
+    """Commands running in the background of the repl.
+
+    Each command is run in a daemon thread, and a notice is printed when it
+    finishes. While the prompt is shown, the output is printed above it. The
+    commands do not prompt for confirmation but use the defaults, not to read
+    the input of the prompt.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+
+    def submit(self, command, target):
+        """Run the target in the background and return the job ID.
+
+        The target returns False if the command failed. The result of the job is
+        True if the command succeeded.
+        """
+        future = Future()
+        with self._lock:
+            job_id = len(self._jobs) + 1
+            self._jobs[job_id] = (command, future)
+        click.echo(f"[{job_id}] {command}")
+
+        def run():
+            future.set_running_or_notify_cancel()
+            ok = False
+            try:
+                ok = target() is not False
+            except Exception:
+                # shown above the prompt, so that the reason of the failure is known
+                click.echo(traceback.format_exc(), err=True, nl=False)
+            finally:
+                # notify before the result is set, so that it precedes later output
+                click.echo(self._format(job_id, command, "Done" if ok else "Failed"))
+                future.set_result(ok)
+
+        threading.Thread(target=run, daemon=True).start()
+        return job_id
+
+    def list(self):
+        """Return the lines of the jobs."""
+        with self._lock:
+            jobs = list(self._jobs.items())
+        return [
+            self._format(job_id, command, self._status(future))
+            for job_id, (command, future) in jobs
+        ]
+
+    def running(self):
+        """Return the IDs of the running jobs."""
+        with self._lock:
+            return [k for k, (_, future) in self._jobs.items() if not future.done()]
+
+    def wait(self, job_ids):
+        """Wait for the jobs to finish.
+
+        Raises:
+            KeyError: A job ID is unknown.
+        """
+        with self._lock:
+            futures = [self._jobs[job_id][1] for job_id in job_ids]
+        for future in futures:
+            future.result()
+
+    @staticmethod
+    def _status(future):
+        if not future.done():
+            return "Running"
+        return "Done" if future.result() else "Failed"
+
+    @staticmethod
+    def _format(job_id, command, status):
+        colors = {"Running": "cyan", "Done": "green", "Failed": "red"}
+        return f"[{job_id}] {click.style(status, fg=colors[status])} {command}"
+
+
+_background_jobs = _BackgroundJobs()
+
+
+def _bg_internal(*args):
+    if not args:
+        return "Error: missing command: :bg COMMAND"
+    return _BackgroundCommand(" ".join(shlex.quote(arg) for arg in args))
+
+
+def _jobs_internal():
+    lines = _background_jobs.list()
+    if not lines:
+        return "There are no background jobs."
+    return "\n".join(lines)
+
+
+def _wait_internal(job_id=None):
+    if job_id is None:
+        job_ids = _background_jobs.running()
+    else:
+        try:
+            job_ids = [int(job_id)]
+        except ValueError:
+            return f"Error: invalid job ID: {job_id}"
+    return _wait_for(job_ids)
+
+
+def _fg_internal():
+    job_ids = _background_jobs.running()
+    if not job_ids:
+        return "There are no running background jobs."
+    return _wait_for(job_ids[-1:])
+
+
+def _wait_for(job_ids):
+    try:
+        _background_jobs.wait(job_ids)
+    except KeyError as e:
+        return f"Error: no such job: {e.args[0]}"
+    except KeyboardInterrupt:
+        pass
+    return ""
+
+
 _register_internal_command(["exit"], _exit_internal, "Exits the interactive mode.")
 _register_internal_command(["help"], _help_internal, "Show this message.")
+_register_internal_command(
+    ["bg"], _bg_internal, "Run the command in the background (same as suffix &)."
+)
+_register_internal_command(["jobs"], _jobs_internal, "List the background jobs.")
+_register_internal_command(
+    ["wait"], _wait_internal, "Wait for the job of the ID, or all running jobs."
+)
+_register_internal_command(
+    ["fg"], _fg_internal, "Wait for the latest running background job."
+)
 
 
 class ClickCompleter(Completer):
@@ -203,7 +351,9 @@ def repl(
     if isatty:
 
         def get_command():
-            return prompt(**prompt_kwargs)
+            # print the output of background jobs above the prompt
+            with patch_stdout(raw=True):
+                return prompt(**prompt_kwargs)
 
     else:
         get_command = sys.stdin.readline
@@ -225,14 +375,21 @@ def repl(
         if allow_system_commands and dispatch_repl_commands(command):
             continue
 
+        background = False
         if allow_internal_commands:
             try:
                 result = handle_internal_commands(command)
-                if isinstance(result, str):
-                    click.echo(result)
-                    continue
             except ExitReplException:
                 break
+            if isinstance(result, _BackgroundCommand):
+                command, background = result.command, True
+            elif result is not None:
+                if result:
+                    click.echo(result)
+                continue
+
+        if command.rstrip().endswith("&"):
+            command, background = command.rstrip()[:-1], True
 
         try:
             args = shlex.split(command)
@@ -250,19 +407,39 @@ def repl(
         if not check_option(args):
             continue
 
+        if background:
+            if args:
+                # the state is copied not to be changed by the later commands
+                obj = copy.copy(group_ctx.obj)
+                target = partial(_invoke, group, group_ctx, args, obj=obj)
+                _background_jobs.submit(command.strip(), target)
+            continue
+
         try:
-            with group.make_context(None, args, parent=group_ctx) as ctx:
-                group.invoke(ctx)
-                ctx.exit()
-        except click.ClickException as e:
-            e.show()
-        except ClickExit:
-            pass
-        except SystemExit:
-            pass
+            _invoke(group, group_ctx, args)
         except ExitReplException:
             break
 
+    running = _background_jobs.running()
+    if running:
+        click.echo(f"Stopped {len(running)} background jobs.")
+
+
+def _invoke(group, group_ctx, args, **extra):
+    """Run the command and return False if it failed."""
+    try:
+        with group.make_context(None, args, parent=group_ctx, **extra) as ctx:
+            group.invoke(ctx)
+            ctx.exit()
+    except click.ClickException as e:
+        e.show()
+        return False
+    except ClickExit as e:
+        return e.exit_code == 0
+    except SystemExit as e:
+        return not e.code
+    return True
+
 
 def dispatch_repl_commands(command):
     """Execute system commands entered in the repl.
@@ -282,6 +459,12 @@ def handle_internal_commands(command):
     Repl-internal commands are all commands starting with ":".
     """
     if command.startswith(":"):
-        target = _get_registered_target(command[1:], default=None)
+        name, _, rest = command[1:].strip().partition(" ")
+        target = _get_registered_target(name, default=None)
         if target:
-            return target()
+            try:
+                args = shlex.split(rest)
+                inspect.signature(target).bind(*args)
+            except (ValueError, TypeError) as e:
+                return f"Error: invalid arguments of :{name}: {e}"
+            return target(*args)
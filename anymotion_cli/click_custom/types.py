@@ -0,0 +1,26 @@
+from typing import List
+
+import click
+
+
+class IntListParamType(click.ParamType):
+    """Comma separated list of integers.
+
+    Examples:
+        >>> IntListParamType().convert("1,2, 3", None, None)
+        [1, 2, 3]
+    """
+
+    name = "ids"
+
+    def convert(self, value, param, ctx) -> List[int]:  # noqa: D102
+        if isinstance(value, list):
+            return value
+
+        try:
+            values = [int(x) for x in value.split(",") if x.strip()]
+        except ValueError:
+            values = []
+        if len(values) == 0:
+            self.fail(f"{value} is not a comma separated list of integers", param, ctx)
+        return values
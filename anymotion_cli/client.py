@@ -0,0 +1,527 @@
+import copy
+import threading
+from concurrent.futures import Future
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlparse
+
+from anymotion_sdk import Client, RequestsError
+from anymotion_sdk.auth import Authentication
+from anymotion_sdk.client import UploadResult
+from anymotion_sdk.exceptions import ClientException
+from anymotion_sdk.utils import get_media_type
+
+from .auth import CachedAuthentication, TokenCache
+from .cache import CACHEABLE_ENDPOINTS, ResponseCache, is_immutable
+from .journal import FINISHED_STATUSES, JobJournal
+from .names import NameResolver
+from .poller import JobResult, Poller
+from .schedule import AdaptiveSchedule, FixedSchedule, duration_bucket
+from .transfer import ProgressCallback, download_file, hash_file, upload_file
+from .uploads import UploadIndex
+
+
+class CliClient(Client):
+    """API Client for the AnyMotion API used by the CLI.
+
+    The ``wait_for_*`` methods share one Poller, so waiting for many processes
+    at the same time from several threads does not multiply the status requests.
+    If token_cache is given, the access token is reused across CLI invocations.
+    If response_cache is given, the data of resources that never change, such as
+    the keypoints extracted successfully, is got from it instead of the API.
+    If upload_index is given, the uploaded files are recorded to it and
+    ``find_uploaded`` finds the image or movie of the same content.
+    If job_journal is given, the started processing and its status are recorded
+    to it.
+    """
+
+    auth: Authentication
+
+    def __init__(
+        self,
+        *args,
+        interval: Union[int, float] = 5,
+        timeout: Union[int, float] = 600,
+        schedule: Optional[Union[FixedSchedule, AdaptiveSchedule]] = None,
+        token_cache: Optional[TokenCache] = None,
+        response_cache: Optional[ResponseCache] = None,
+        upload_index: Optional[UploadIndex] = None,
+        job_journal: Optional[JobJournal] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, interval=interval, timeout=timeout, **kwargs)
+        if token_cache is not None:
+            self.auth = CachedAuthentication(
+                self.auth.client_id,
+                self.auth.client_secret,
+                token_cache,
+                base_url=self.auth.base_url,
+                session=self.session,
+            )
+        self.poller = Poller(
+            self, interval=interval, timeout=timeout, schedule=schedule
+        )
+        # The adaptive schedule expects the time to complete also from the
+        # duration of the movie.
+        self._use_duration = isinstance(schedule, AdaptiveSchedule)
+
+        self.response_cache = response_cache
+        # If True, the cached data is not used but updated.
+        self.refresh_cache = False
+        self.upload_index = upload_index
+        self.job_journal = job_journal
+
+        # names of the files of drawings, kept as long as the client
+        self.name_resolver = NameResolver(self, prefetch=False)
+
+        # media type of the started processing, such as "image" or "movie:1m"
+        # with the bucket of the movie duration
+        self._media_kinds: Dict[Tuple[str, int], str] = {}
+
+        # ("image" or "movie", media id) -> the latest successful keypoint id
+        self._keypoint_index: Optional[Dict[Tuple[str, int], int]] = None
+        self._keypoint_lock = threading.Lock()
+
+    def copy(self) -> "CliClient":
+        """Return a copy of the client, which can be set separately.
+
+        The copy shares the connections, the token, the poller and the data
+        kept by the client, such as the names of the files, but its caches,
+        upload index, job journal and the callbacks of requests are its own.
+        """
+        client = copy.copy(self)
+        client.session = copy.copy(self.session)
+        client.session.request_callbacks = []
+        client.session.response_callbacks = []
+        client.name_resolver = self.name_resolver.bind(client)
+        return client
+
+    def get_one_data(
+        self, endpoint: str, endpoint_id: int, use_cache: bool = True
+    ) -> dict:
+        """Get one piece of data.
+
+        See ``anymotion_sdk.Client.get_one_data``. If use_cache is False, the
+        response cache is neither read nor written, e.g. when the data is kept
+        in the local keypoint store instead.
+        """
+        cache = self.response_cache
+        if cache is None or not use_cache or endpoint not in CACHEABLE_ENDPOINTS:
+            return super().get_one_data(endpoint, endpoint_id)
+
+        key = (self._api_url, self.auth.client_id, endpoint, endpoint_id)
+        if not self.refresh_cache:
+            data = cache.get(key)
+            if data is not None:
+                return data
+
+        data = super().get_one_data(endpoint, endpoint_id)
+        if is_immutable(endpoint, data):
+            cache.set(key, data)
+        return data
+
+    def iter_list_data(
+        self, endpoint: str, params: Optional[dict] = None
+    ) -> Iterator[List[dict]]:
+        """Get list data page by page.
+
+        It is the same as ``get_list_data``, but yields each page as soon as it is
+        received, so the memory used is bounded by the page size.
+
+        Args:
+            endpoint: images, movies, keypoints, drawings, analyses, or comparisons
+            params
+
+        Raises:
+            RequestsError: HTTP request fails.
+        """
+        params = dict(params or {})
+        params["size"] = self._page_size
+
+        url: Optional[str] = urljoin(self._api_url, f"{endpoint}/")
+        while url:
+            response = self.session.request(url, params=params, token=self.auth.token)
+            page, url = response.get(("data", "next"))
+            params = {}
+            yield page
+
+    def upload(
+        self,
+        path: Union[str, Path],
+        text: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> UploadResult:
+        """Upload movie or image to the cloud storage.
+
+        See ``anymotion_sdk.Client.upload``. Unlike it, the file is streamed from
+        the disk both for the MD5 and for the upload, and the upload is retried.
+
+        Args:
+            progress: Called with the uploaded size(bytes) and the total size
+                (bytes).
+
+        Raises:
+            FileNotFoundError: No such file
+            FileTypeError: Invalid file types.
+            RequestsError: HTTP request fails.
+        """
+        path = Path(path).expanduser()
+
+        media_type = get_media_type(path)
+        content_md5, sha256 = self._digest(path)
+
+        # Register movie or image
+        response = self.session.request(
+            urljoin(self._api_url, f"{media_type}s/"),
+            method="POST",
+            json={"content_md5": content_md5, "name": path.stem, "text": text},
+            token=self.auth.token,
+        )
+        media_id, upload_url = response.get(("id", "uploadUrl"))
+
+        # Upload to the cloud storage
+        upload_file(
+            self.session.session,
+            upload_url,
+            path,
+            headers={"Content-MD5": content_md5},
+            progress=progress,
+        )
+
+        if self.upload_index is not None:
+            self.upload_index.add(sha256, media_type, media_id)
+
+        if media_type == "image":
+            return UploadResult(image_id=media_id, movie_id=None)
+        else:
+            return UploadResult(image_id=None, movie_id=media_id)
+
+    def find_uploaded(self, path: Union[str, Path]) -> Optional[UploadResult]:
+        """Find the image or movie uploaded from the same content as the file.
+
+        It returns None if upload_index is not given. The found image or movie
+        is checked to still exist.
+
+        Raises:
+            FileNotFoundError: No such file
+            FileTypeError: Invalid file types.
+        """
+        if self.upload_index is None:
+            return None
+
+        path = Path(path).expanduser()
+        media_type = get_media_type(path)
+        _, sha256 = self._digest(path)
+
+        found = self.upload_index.get(sha256)
+        if found is None or found[0] != media_type:
+            return None
+        try:
+            # not from the response cache, which does not know it is deleted
+            Client.get_one_data(self, f"{media_type}s", found[1])
+        except RequestsError:
+            self.upload_index.remove(sha256)
+            return None
+
+        if media_type == "image":
+            return UploadResult(image_id=found[1], movie_id=None)
+        else:
+            return UploadResult(image_id=None, movie_id=found[1])
+
+    def download(
+        self,
+        drawing_id: int,
+        path: Optional[Union[str, Path]] = None,
+        exist_ok: bool = False,
+        fix_suffix: bool = False,
+        stream: bool = True,
+        progress: Optional[ProgressCallback] = None,
+        segments: int = 1,
+    ) -> Path:
+        """Download a file from drawing_id.
+
+        See ``anymotion_sdk.Client.download``. Unlike it, an interrupted download
+        is resumed, and the file appears at path only when it is complete.
+        The stream argument is ignored because the file is always streamed.
+
+        Args:
+            progress: Called with the downloaded size(bytes) and the total size
+                (bytes or None if unknown).
+            segments: The number of byte ranges downloaded in parallel.
+
+        Raises:
+            ClientException
+            FileExistsError
+            RequestsError: HTTP request fails.
+        """
+        data = self.get_one_data("drawings", drawing_id)
+        url = data.get("drawingUrl")
+        if url is None:
+            raise ClientException(
+                "Can't download the file because it doesn't have a drawing url."
+            )
+        url_path = Path(urlparse(url).path)
+
+        if path is None:
+            path = url_path.name
+        path = Path(path).expanduser()
+
+        if path.is_dir():
+            path /= url_path.name
+
+        if fix_suffix and path.suffix != url_path.suffix:
+            path = path.with_suffix(url_path.suffix)
+
+        if path.exists() and not exist_ok:
+            raise FileExistsError(f"File exists: {path}")
+
+        self.download_file(url, path, progress=progress, segments=segments)
+        return path
+
+    def download_file(
+        self,
+        url: str,
+        path: Path,
+        progress: Optional[ProgressCallback] = None,
+        segments: int = 1,
+    ) -> None:
+        """Download the file of the url, such as the drawing url, to path.
+
+        See ``anymotion_cli.transfer.download_file``.
+
+        Raises:
+            RequestsError: HTTP request fails.
+        """
+        download_file(
+            self.session.session,
+            url,
+            path,
+            chunk_size=self._chunk_size,
+            progress=progress,
+            segments=segments,
+        )
+
+    def _digest(self, path: Path) -> Tuple[str, str]:
+        if self.upload_index is not None:
+            return self.upload_index.digest(path, chunk_size=self._chunk_size)
+        return hash_file(path, chunk_size=self._chunk_size)
+
+    def extract_keypoint(
+        self,
+        data: Optional[dict] = None,
+        image_id: Optional[int] = None,
+        movie_id: Optional[int] = None,
+    ) -> int:
+        """Start keypoint extraction.
+
+        See ``anymotion_sdk.Client.extract_keypoint``.
+        """
+        keypoint_id = super().extract_keypoint(
+            data=data, image_id=image_id, movie_id=movie_id
+        )
+        if image_id or (data or {}).get("image_id"):
+            self._media_kinds[("keypoints", keypoint_id)] = "image"
+        else:
+            movie_id = movie_id or (data or {}).get("movie_id")
+            self._media_kinds[("keypoints", keypoint_id)] = self._movie_kind(movie_id)
+        inputs = dict(data or {})
+        inputs.update(image_id=image_id or inputs.get("image_id"))
+        inputs.update(movie_id=movie_id or inputs.get("movie_id"))
+        self._record("keypoints", keypoint_id, inputs)
+        return keypoint_id
+
+    def find_keypoint(
+        self,
+        image_id: Optional[int] = None,
+        movie_id: Optional[int] = None,
+        prefetch: bool = False,
+    ) -> Optional[int]:
+        """Find the latest keypoint extracted successfully from the image or movie.
+
+        The keypoints are listed filtered by the image or movie. If prefetch is
+        True, e.g. for finding the keypoints of many items, all the successful
+        keypoints are listed only once for the client instead, and the ones
+        extracted by the client after that are added to them.
+
+        Returns:
+            The keypoint id, or None if it is not found.
+
+        Raises:
+            RequestsError: HTTP request fails.
+        """
+        key = ("image", image_id) if image_id else ("movie", movie_id or 0)
+        with self._keypoint_lock:
+            if self._keypoint_index is not None:
+                return self._keypoint_index.get(key)
+        if not prefetch:
+            params = {"execStatus": "SUCCESS", key[0]: key[1]}
+            index: Dict[Tuple[str, int], int] = {}
+            for data in self.get_list_data("keypoints", params=params):
+                _add_keypoint(index, data)
+            return index.get(key)
+
+        with self._keypoint_lock:
+            if self._keypoint_index is None:
+                index = {}
+                params = {"execStatus": "SUCCESS"}
+                for data in self.get_list_data("keypoints", params=params):
+                    _add_keypoint(index, data)
+                self._keypoint_index = index
+            return self._keypoint_index.get(key)
+
+    def draw_keypoint(
+        self,
+        keypoint_id: Optional[int] = None,
+        comparison_id: Optional[int] = None,
+        rule: Optional[Union[list, dict]] = None,
+        background_rule: Optional[Union[list, dict]] = None,
+    ) -> int:
+        """Start drawing for keypoint_id or comparison_id.
+
+        See ``anymotion_sdk.Client.draw_keypoint``.
+        """
+        drawing_id = super().draw_keypoint(
+            keypoint_id=keypoint_id,
+            comparison_id=comparison_id,
+            rule=rule,
+            background_rule=background_rule,
+        )
+        media_kind = self._media_kinds.get(("keypoints", keypoint_id or 0))
+        if media_kind:
+            self._media_kinds[("drawings", drawing_id)] = media_kind
+        inputs = {
+            "keypoint_id": keypoint_id,
+            "comparison_id": comparison_id,
+            "rule": rule,
+            "background_rule": background_rule,
+        }
+        self._record("drawings", drawing_id, inputs)
+        return drawing_id
+
+    def analyze_keypoint(self, keypoint_id: int, rule: Union[list, dict]) -> int:
+        """Start analyze for keypoint_id.
+
+        See ``anymotion_sdk.Client.analyze_keypoint``.
+        """
+        analysis_id = super().analyze_keypoint(keypoint_id, rule)
+        media_kind = self._media_kinds.get(("keypoints", keypoint_id))
+        if media_kind:
+            self._media_kinds[("analyses", analysis_id)] = media_kind
+        self._record(
+            "analyses", analysis_id, {"keypoint_id": keypoint_id, "rule": rule}
+        )
+        return analysis_id
+
+    def compare_keypoint(self, source_id: int, target_id: int) -> int:
+        """Start compare for source_id and target_id.
+
+        See ``anymotion_sdk.Client.compare_keypoint``.
+        """
+        comparison_id = super().compare_keypoint(source_id, target_id)
+        inputs = {"source_id": source_id, "target_id": target_id}
+        self._record("comparisons", comparison_id, inputs)
+        return comparison_id
+
+    def wait_for_extraction(self, keypoint_id: int) -> JobResult:  # type: ignore
+        """Wait for extraction.
+
+        Raises:
+            RequestsError: HTTP request fails.
+        """
+        return self._wait_for("keypoints", keypoint_id)
+
+    def wait_for_drawing(self, drawing_id: int) -> JobResult:  # type: ignore
+        """Wait for drawing.
+
+        Raises:
+            RequestsError: HTTP request fails.
+        """
+        return self._wait_for("drawings", drawing_id)
+
+    def wait_for_analysis(self, analysis_id: int) -> JobResult:  # type: ignore
+        """Wait for analysis.
+
+        Raises:
+            RequestsError: HTTP request fails.
+        """
+        return self._wait_for("analyses", analysis_id)
+
+    def wait_for_comparison(self, comparison_id: int) -> JobResult:  # type: ignore
+        """Wait for comparison.
+
+        Raises:
+            RequestsError: HTTP request fails.
+        """
+        return self._wait_for("comparisons", comparison_id)
+
+    def submit_wait(self, endpoint: str, job_id: int) -> Future:
+        """Start waiting for the processing and return a future of its JobResult.
+
+        Args:
+            endpoint: keypoints, drawings, analyses, or comparisons
+            job_id
+        """
+        kind = endpoint
+        media_kind = self._media_kinds.get((endpoint, job_id))
+        if media_kind:
+            kind += f":{media_kind}"
+        future = self.poller.submit(endpoint, job_id, kind=kind)
+        future.add_done_callback(partial(self._on_finished, endpoint, job_id))
+        return future
+
+    def _movie_kind(self, movie_id: Optional[int]) -> str:
+        """Return "movie" with the bucket of its duration, if it is known."""
+        if not self._use_duration or movie_id is None:
+            return "movie"
+        try:
+            data = self.get_one_data("movies", movie_id)
+        except RequestsError:
+            return "movie"
+        duration = _get_duration(data)
+        if duration is None:
+            return "movie"
+        return f"movie:{duration_bucket(duration)}"
+
+    def _record(self, endpoint: str, job_id: int, inputs: dict) -> None:
+        if self.job_journal is not None:
+            inputs = {k: v for k, v in inputs.items() if v is not None}
+            self.job_journal.add(endpoint, job_id, inputs)
+
+    def _on_finished(self, endpoint: str, job_id: int, future: Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        # A timed out job may be still in progress on the server.
+        if self.job_journal is not None and result.status in FINISHED_STATUSES:
+            self.job_journal.update(endpoint, job_id, result.status)
+
+        if endpoint == "keypoints" and result.status == "SUCCESS":
+            with self._keypoint_lock:
+                if self._keypoint_index is not None:
+                    _add_keypoint(self._keypoint_index, result.json)
+
+    def _wait_for(self, endpoint: str, job_id: int) -> JobResult:
+        return self.submit_wait(endpoint, job_id).result()
+
+
+def _add_keypoint(index: Dict[Tuple[str, int], int], data: dict) -> None:
+    keypoint_id = data.get("id")
+    if not keypoint_id:
+        return
+    for media_type in ["image", "movie"]:
+        media_id = data.get(media_type)
+        if media_id:
+            key = (media_type, media_id)
+            index[key] = max(index.get(key, 0), keypoint_id)
+
+
+def _get_duration(data: dict) -> Optional[float]:
+    """Return the duration(sec) of the movie, or None if it is unknown."""
+    duration = data.get("duration")
+    if isinstance(duration, (int, float)):
+        return duration
+    frame_count, fps = data.get("frameCount"), data.get("fps")
+    if isinstance(frame_count, (int, float)) and isinstance(fps, (int, float)) and fps:
+        return frame_count / fps
+    return None
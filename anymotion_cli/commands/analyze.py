@@ -1,5 +1,5 @@
 import io
-from typing import Optional
+from typing import Optional, Union
 
 import click
 from anymotion_sdk import RequestsError
@@ -8,9 +8,9 @@ from yaspin import yaspin
 from ..click_custom import CustomCommand
 from ..exceptions import ClickException
 from ..options import common_options
-from ..output import echo, echo_success
+from ..output import echo, echo_json, echo_success
 from ..state import State, pass_state
-from ..utils import color_id, get_client, parse_rule
+from ..utils import color_id, get_client, get_keypoint_store, get_settings, parse_rule
 from .analysis import show
 
 
@@ -33,6 +33,14 @@ def cli() -> None:  # noqa: D103
     help="Path of analysis rules file in JSON format.",
 )
 @click.option("--show-result", is_flag=True)
+@click.option(
+    "--local",
+    is_flag=True,
+    help=(
+        "Analyze on this computer with the keypoints in the local store, "
+        "and show the result. It requires NumPy."
+    ),
+)
 @common_options
 @pass_state
 @click.pass_context
@@ -43,8 +51,15 @@ def analyze(
     rule_str: Optional[str],
     rule_file: Optional[io.TextIOWrapper],
     show_result: bool,
+    local: bool,
 ) -> None:
-    """Analyze the extracted keypoint data."""
+    """Analyze the extracted keypoint data.
+
+    With --local option, the analysis types angle, vectorAngle,
+    topVertexAngle, bottomVertexAngle and distance are computed on this
+    computer for all frames at once, without waiting for the API. The
+    keypoints are got from the local store, or from the API and saved to it.
+    """
     if rule_str is not None and rule_file is not None:
         raise click.UsageError(
             '"--rule" and "--rule-file" options cannot be used at the same time.'
@@ -61,6 +76,10 @@ def analyze(
     if rule is None:
         raise Exception("rule is None")
 
+    if local:
+        _analyze_local(state, keypoint_id, rule)
+        return
+
     client = get_client(state)
 
     try:
@@ -83,3 +102,23 @@ def analyze(
         raise ClickException("Analysis is timed out.")
     else:
         raise ClickException(f"Analysis failed.\n{response.failure_detail}")
+
+
+def _analyze_local(state: State, keypoint_id: int, rule: Union[list, dict]) -> None:
+    store = get_keypoint_store(state.profile, get_settings(state.profile))
+    from ..keypoints import get_keypoint_array
+    from ..local_analysis import analyze as analyze_locally
+
+    client = get_client(state)
+    try:
+        array = get_keypoint_array(client, store, keypoint_id)
+    except (OSError, RequestsError, ValueError) as e:
+        raise ClickException(str(e))
+
+    try:
+        result = analyze_locally(array, rule)
+    except ValueError as e:
+        raise ClickException(f"Rule is invalid for local analysis. {e}")
+
+    count = sum(len(row["values"]) for row in result)
+    echo_json(result, pager=count >= state.pager_length)
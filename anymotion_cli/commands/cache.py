@@ -0,0 +1,56 @@
+import click
+
+from ..click_custom import CustomGroup
+from ..options import common_options
+from ..output import echo, format_size
+from ..state import State, pass_state
+from ..utils import color_path, get_response_cache
+
+
+@click.group()
+def cli() -> None:  # noqa: D103
+    pass
+
+
+@cli.group(
+    cls=CustomGroup,
+    help_options_color="cyan",
+    short_help="Manage the local cache of the API responses.",
+)
+def cache() -> None:
+    """Manage the local cache of the API responses.
+
+    The data that never changes, such as the keypoints extracted successfully,
+    is cached to reduce the requests to the API.
+    """
+
+
+@cache.command(short_help="Show the statistics of the cache.")
+@common_options
+@pass_state
+def stats(state: State) -> None:
+    """Show the statistics of the cache."""
+    from tabulate import tabulate
+
+    response_cache = get_response_cache()
+    stats = response_cache.stats()
+
+    table = tabulate(
+        [
+            ["path", color_path(response_cache.directory)],
+            ["entries", stats["entries"]],
+            ["size", format_size(stats["size"])],
+            ["max_size", format_size(stats["max_size"])],
+        ],
+        headers=["Name", "Value"],
+    )
+    echo(table)
+
+
+@cache.command(short_help="Remove all the cached data.")
+@common_options
+@pass_state
+def clear(state: State) -> None:
+    """Remove all the cached data."""
+    get_response_cache().clear()
+    echo("Cleared the cache.")
@@ -1,16 +1,45 @@
+import heapq
+from functools import partial
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
 import click
 from anymotion_sdk import RequestsError
 from yaspin import yaspin
 
+from .. import aio
+from ..aio import MAX_IO_WORKERS, AsyncClient
 from ..click_custom import CustomCommand
+from ..client import CliClient
 from ..exceptions import ClickException
 from ..options import common_options
-from ..output import echo, echo_success
+from ..output import echo, echo_error, echo_json, echo_success
+from ..poller import JobResult
 from ..state import State, pass_state
-from ..utils import color_id, echo_invalid_option_warning, get_client
+from ..utils import (
+    color_id,
+    echo_invalid_option_warning,
+    get_client,
+    get_keypoint_store,
+    get_settings,
+)
 from .download import check_download_options, download_options
 from .draw import check_draw_options, draw, draw_options
 
+if TYPE_CHECKING:
+    from ..keypoints import KeypointArray, KeypointStore
+
+# (comparison id, score) of a target. The comparison id is None if local.
+_Result = Tuple[Optional[int], Optional[float]]
+
 
 @click.group()
 def cli() -> None:  # noqa: D103
@@ -23,13 +52,45 @@ def cli() -> None:  # noqa: D103
     short_help="Compare the two extracted keypoint data.",
 )
 @click.argument("source_id", type=int)
-@click.argument("target_id", type=int)
+@click.argument("target_id", type=int, required=False)
 @click.option(
     "-d",
     "--with-drawing",
     is_flag=True,
     help="Drawing with comparison results.",
 )
+@click.option(
+    "--local",
+    is_flag=True,
+    help=(
+        "Compare on this computer with the keypoints in the local store, "
+        "and show the difference. It requires NumPy."
+    ),
+)
+@click.option(
+    "--targets-from",
+    type=click.File("r"),
+    metavar="FILE",
+    help=(
+        "Compare the source with each keypoint id written on a line of the "
+        "file, and show the most similar ones. Use '-' for standard input."
+    ),
+)
+@click.option(
+    "--top-k",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Number of the most similar targets shown. Used with '--targets-from'.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of comparisons run at the same time. Used with '--targets-from'.",
+)
 @draw_options
 @download_options
 @common_options
@@ -39,8 +100,12 @@ def compare(
     ctx: click.Context,
     state: State,
     source_id: int,
-    target_id: int,
+    target_id: Optional[int],
     with_drawing: bool,
+    local: bool,
+    targets_from: Optional[IO[str]],
+    top_k: int,
+    jobs: int,
     **kwargs,
 ) -> None:
     """Compare the two extracted keypoint data.
@@ -51,12 +116,54 @@ def compare(
     '--rule', '--bg-rule', and '--rule-file', and '--download / --no-download'.
     In addition, when downloading the drawn file, you can use download options
     such as '-o, --out', '--force' and '--open / --no-open'.
+
+    When using the '--local' option, the difference of each frame of the source
+    is computed on this computer without waiting for the API. The frames of the
+    target are aligned to those of the source, so keypoints of different
+    lengths can be compared. The keypoints are got from the local store, or
+    from the API and saved to it.
+
+    When using the '--targets-from' option instead of TARGET_ID, the source is
+    compared with each target in the file, and the '--top-k' most similar
+    targets are shown. The score of a target is the mean distance of the
+    joints over all frames of its difference, so the lower is the more
+    similar. Each difference is reduced to its score as soon as it is got, and
+    only the scores of the top targets are kept. It can be used with the
+    '--local' option.
     """
+    if local and with_drawing:
+        raise click.UsageError(
+            '"--local" and "--with-drawing" options cannot be used at the same time.'
+        )
+    if targets_from is not None and target_id is not None:
+        raise click.UsageError(
+            '"TARGET_ID" and "--targets-from" option cannot be used at the same time.'
+        )
+    if targets_from is not None and with_drawing:
+        raise click.UsageError(
+            '"--targets-from" and "--with-drawing" options cannot be used at the '
+            "same time."
+        )
+
+    args = click.get_os_args()
     if not with_drawing:
-        args = click.get_os_args()
         options = check_draw_options(args) + check_download_options(args)
         echo_invalid_option_warning("using '--with-drawing'", options)
 
+    if targets_from is not None:
+        target_ids = _read_target_ids(targets_from)
+        _compare_many(state, source_id, target_ids, top_k, jobs, local)
+        return
+
+    options = list(set(args) & set(["--top-k", "-j", "--jobs"]))
+    echo_invalid_option_warning("using '--targets-from'", options)
+    if target_id is None:
+        raise click.UsageError("Missing argument 'TARGET_ID'.")
+
+    if local:
+        _compare_local(state, source_id, target_id)
+        return
+
     client = get_client(state)
 
     try:
@@ -81,3 +188,219 @@ def compare(
     if with_drawing:
         echo()
         ctx.invoke(draw, comparison_id=comparison_id, **kwargs)
+
+
+def _compare_local(state: State, source_id: int, target_id: int) -> None:
+    store = get_keypoint_store(state.profile, get_settings(state.profile))
+    from ..keypoints import get_keypoint_array
+    from ..local_comparison import compare as compare_locally
+
+    client = get_client(state)
+    try:
+        source = get_keypoint_array(client, store, source_id)
+        target = get_keypoint_array(client, store, target_id)
+    except (OSError, RequestsError, ValueError) as e:
+        raise ClickException(str(e))
+
+    difference = compare_locally(source, target)
+    echo_json(difference, pager=len(difference) >= state.pager_length)
+
+
+def _read_target_ids(file: IO[str]) -> List[int]:
+    """Read the keypoint ids, one on each line, skipping blanks and duplicates.
+
+    Lines starting with "#" are comments.
+    """
+    target_ids: List[int] = []
+    seen = set()
+    for number, line in enumerate(file, start=1):
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+        try:
+            target_id = int(line)
+        except ValueError:
+            raise click.BadParameter(
+                f"Line {number} is not a keypoint id: {line}",
+                param_hint="'--targets-from'",
+            )
+        if target_id not in seen:
+            seen.add(target_id)
+            target_ids.append(target_id)
+    if len(target_ids) == 0:
+        raise click.BadParameter(
+            "There are no keypoint ids.", param_hint="'--targets-from'"
+        )
+    return target_ids
+
+
+def _compare_many(
+    state: State,
+    source_id: int,
+    target_ids: List[int],
+    top_k: int,
+    jobs: int,
+    local: bool,
+) -> None:
+    from tabulate import tabulate
+
+    client = get_client(state)
+    aclient = AsyncClient(client, max_workers=min(jobs, MAX_IO_WORKERS))
+    compare_target: Callable[[int], Awaitable[_Result]]
+    if local:
+        store = get_keypoint_store(state.profile, get_settings(state.profile))
+        from ..keypoints import get_keypoint_array
+
+        try:
+            source = get_keypoint_array(client, store, source_id)
+        except (OSError, RequestsError, ValueError) as e:
+            aclient.close()
+            raise ClickException(str(e))
+        compare_target = partial(_compare_target_locally, aclient, store, source)
+    else:
+        compare_target = partial(_compare_target, aclient, source_id)
+
+    echo(f"Comparing keypoint {color_id(source_id)} with {len(target_ids)} targets.")
+    try:
+        ranked, failed = aio.run(_compare_each(compare_target, target_ids, top_k, jobs))
+    finally:
+        aclient.close()
+
+    if ranked:
+        headers = ["Rank", "Target ID", "Score"]
+        if not local:
+            headers.append("Comparison ID")
+        rows = []
+        for rank, (score, target_id, comparison_id) in enumerate(ranked, start=1):
+            row: list = [rank, target_id, score]
+            if not local:
+                row.append(comparison_id)
+            rows.append(row)
+        echo()
+        echo(tabulate(rows, headers=headers, floatfmt=".4f"))
+
+    if failed:
+        raise ClickException(f"{failed} of {len(target_ids)} comparisons failed.")
+
+
+async def _compare_each(
+    compare_target: Callable[[int], Awaitable[_Result]],
+    target_ids: List[int],
+    top_k: int,
+    jobs: int,
+) -> Tuple[List[Tuple[float, int, Optional[int]]], int]:
+    """Compare with each target, and return the top-k and the number of failures.
+
+    Only the scores of the top-k are kept, in a heap whose top is the worst of
+    them, and they are sorted at the end.
+    """
+    heap: List[Tuple[float, int, Optional[int]]] = []
+    failed = 0
+    async for target_id, task in aio.map_unordered(compare_target, target_ids, jobs):
+        label = f"target id: {color_id(target_id)}"
+        try:
+            comparison_id, score = task.result()
+        except _ComparisonError as e:
+            label += f", comparison id: {color_id(e.comparison_id)}"
+            if e.response.status == "TIMEOUT":
+                echo_error(f"Comparison is timed out. ({label})")
+            else:
+                echo_error(f"Comparison failed. ({label})\n{e.response.failure_detail}")
+            failed += 1
+            continue
+        except (OSError, RequestsError, ValueError) as e:
+            echo_error(f"Comparison failed. ({label})\n{e}")
+            failed += 1
+            continue
+
+        if comparison_id is not None:
+            label += f", comparison id: {color_id(comparison_id)}"
+        if score is None:
+            echo_error(f"There is no difference to score. ({label})")
+            failed += 1
+            continue
+
+        echo_success(f"Comparison is complete. ({label}, score: {score:.4f})")
+        item = (-score, target_id, comparison_id)
+        if len(heap) < top_k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    ranked = sorted((-score, target_id, cid) for score, target_id, cid in heap)
+    return ranked, failed
+
+
+async def _compare_target(
+    aclient: AsyncClient, source_id: int, target_id: int
+) -> _Result:
+    comparison_id = await aclient.compare_keypoint(source_id, target_id)
+    response = await aclient.wait_for_comparison(comparison_id)
+    if response.status != "SUCCESS":
+        raise _ComparisonError(comparison_id, response)
+
+    # The result already has the difference. It is reduced on the I/O thread,
+    # and only the score is kept.
+    difference = response.json.get("difference") or []
+    score = await aclient.call(score_difference, difference)
+    return comparison_id, score
+
+
+async def _compare_target_locally(
+    aclient: AsyncClient,
+    store: "KeypointStore",
+    source: "KeypointArray",
+    target_id: int,
+) -> _Result:
+    score = await aclient.call(_score_local, aclient.client, store, source, target_id)
+    return None, score
+
+
+class _ComparisonError(Exception):
+    """The comparison has finished without success."""
+
+    def __init__(self, comparison_id: int, response: JobResult):
+        super().__init__(response.status)
+        self.comparison_id = comparison_id
+        self.response = response
+
+
+def _score_local(
+    client: CliClient,
+    store: "KeypointStore",
+    source: "KeypointArray",
+    target_id: int,
+) -> Optional[float]:
+    """Compare the keypoints locally and reduce the difference to the score."""
+    from ..keypoints import get_keypoint_array
+    from ..local_comparison import compare as compare_locally
+
+    target = get_keypoint_array(client, store, target_id)
+    return score_difference(compare_locally(source, target))
+
+
+def score_difference(difference: list) -> Optional[float]:
+    """Return the mean of the distances in the difference.
+
+    All the "distance" values at any depth are used, so that it does not depend
+    on how the frames and joints are nested. None is returned if there are no
+    distances.
+    """
+    total, count = 0.0, 0
+    for distance in _iter_distances(difference):
+        total += distance
+        count += 1
+    return total / count if count else None
+
+
+def _iter_distances(data: object) -> Iterator[float]:
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == "distance" and isinstance(value, (int, float)):
+                if not isinstance(value, bool):
+                    yield float(value)
+            else:
+                yield from _iter_distances(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from _iter_distances(value)
@@ -6,8 +6,8 @@ from yaspin import yaspin
 
 from ..click_custom import CustomGroup
 from ..exceptions import ClickException
-from ..options import common_options
-from ..output import echo_json
+from ..options import cache_options, common_options, format_option
+from ..output import echo_json, echo_ndjson
 from ..state import State, pass_state
 from ..utils import get_client
 
@@ -37,6 +37,7 @@ def comparison() -> None:
 )
 @click.option("--no-difference", is_flag=True, help="Do not show difference data.")
 @click.option("--join", is_flag=True, help="Join the related data.")
+@cache_options
 @common_options
 @pass_state
 def show(
@@ -86,9 +87,10 @@ def show(
     ),
     help="Get data for the specified status only.",
 )
+@format_option
 @common_options
 @pass_state
-def list(state: State, status: Optional[str]) -> None:
+def list(state: State, status: Optional[str], output_format: str) -> None:
     """Show a list of information for all comparisons."""
     client = get_client(state)
 
@@ -96,6 +98,13 @@ def list(state: State, status: Optional[str]) -> None:
     if status:
         params = {"execStatus": status}
 
+    if output_format == "ndjson":
+        try:
+            echo_ndjson(client.iter_list_data("comparisons", params=params))
+        except RequestsError as e:
+            raise ClickException(str(e))
+        return
+
     try:
         if state.use_spinner:
             with yaspin(text="Retrieving..."):
@@ -1,15 +1,14 @@
 from typing import Any, Optional, Union
 
 import click
-from tabulate import tabulate
 
 from ..click_custom import CustomGroup
 from ..exceptions import ClickException, SettingsValueError
 from ..options import common_options
-from ..output import echo, echo_warning
+from ..output import echo, echo_warning, is_background
 from ..settings import API_URL
 from ..state import State, pass_state
-from ..utils import get_settings
+from ..utils import get_settings, get_token_cache
 
 
 @click.group()
@@ -29,6 +28,8 @@ def cli() -> None:  # noqa: D103
 def configure(ctx: click.Context, state: State) -> None:
     """Configure your AnyMotion Credentials."""
     if ctx.invoked_subcommand is None:
+        if is_background():
+            raise ClickException("Unable to configure in a background job.")
         settings = get_settings(state.profile, use_env=False)
 
         client_id = click.prompt(
@@ -51,6 +52,8 @@ def configure(ctx: click.Context, state: State) -> None:
             settings.write_credentials(client_id, client_secret)
         except SettingsValueError as e:
             raise ClickException(str(e))
+        finally:
+            state.forget_client(state.profile)
 
 
 @configure.command(short_help="Show the configuration you use.")
@@ -58,6 +61,8 @@ def configure(ctx: click.Context, state: State) -> None:
 @pass_state
 def list(state: State) -> None:
     """Show the configuration you use."""
+    from tabulate import tabulate
+
     settings = get_settings(state.profile)
 
     none = click.style("None", fg="yellow")
@@ -72,6 +77,7 @@ def list(state: State) -> None:
             ["client_secret", client_secret],
             ["polling_interval", settings.interval],
             ["timeout", settings.timeout],
+            ["polling_mode", settings.polling_mode],
         ],
         headers=["Name", "Value"],
     )
@@ -91,6 +97,7 @@ def list(state: State) -> None:
             "client_secret",
             "api_url",
             "polling_interval",
+            "polling_mode",
             "timeout",
             "is_download",
             "is_open",
@@ -112,6 +119,8 @@ def get(state: State, key: str) -> None:
         echo(settings.api_url)
     elif key == "polling_interval":
         echo(_to_str(settings.interval))
+    elif key == "polling_mode":
+        echo(settings.polling_mode)
     elif key == "timeout":
         echo(_to_str(settings.timeout))
     elif key == "is_download":
@@ -137,6 +146,7 @@ def set(state: State, key: str, value: str) -> None:
     elif key == "client_secret":
         client_id = _to_str(settings.client_id)
         settings.write_credentials(client_id, value)
+    state.forget_client(state.profile)
 
 
 @configure.command(short_help="Clear the configuration value from the file.")
@@ -147,6 +157,8 @@ def clear(state: State) -> None:
     settings = get_settings(state.profile)
     settings.write_config(API_URL)
     settings.write_credentials("", "")
+    get_token_cache(state.profile).clear()
+    state.forget_client(state.profile)
 
 
 class HiddenCredential(str):
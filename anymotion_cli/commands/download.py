@@ -1,18 +1,31 @@
+import json
 from pathlib import Path
 from textwrap import dedent
-from typing import Callable, List, Optional
+from typing import Callable, Dict, List, Optional
 from urllib.parse import urlparse
 
 import click
 from anymotion_sdk import RequestsError
-from yaspin import yaspin
 
+from .. import aio
+from ..aio import MAX_IO_WORKERS, AsyncClient
 from ..click_custom import CustomCommand
 from ..exceptions import ClickException
-from ..options import common_options
-from ..output import echo, echo_warning
+from ..names import NameResolver
+from ..options import cache_options, common_options
+from ..output import (
+    TransferProgress,
+    confirm,
+    echo,
+    echo_error,
+    echo_success,
+    echo_warning,
+)
 from ..state import State, pass_state
-from ..utils import color_path, get_client
+from ..transfer import MAX_SEGMENTS
+from ..utils import color_id, color_path, get_client
+
+MANIFEST_NAME = ".amcli-manifest.jsonl"
 
 
 def validate_path(ctx, param, value):
@@ -25,6 +38,16 @@ def validate_path(ctx, param, value):
 
 def download_options(f: Callable) -> Callable:
     """Set download options."""
+    f = click.option(
+        "--segments",
+        type=click.IntRange(1, MAX_SEGMENTS),
+        default=1,
+        show_default=True,
+        help=(
+            "Number of parts of the file downloaded in parallel. "
+            "It speeds up downloading a large movie."
+        ),
+    )(f)
     f = click.option(
         "--open/--no-open",
         "is_open",
@@ -54,7 +77,9 @@ def check_download_options(args: List[str]) -> List[str]:
     Returns:
         A list of using option names.
     """
-    used_options = set(args) & set(["-o", "--out", "--force", "--open", "--no-open"])
+    used_options = set(args) & set(
+        ["-o", "--out", "--force", "--open", "--no-open", "--segments"]
+    )
     return list(used_options)
 
 
@@ -66,14 +91,59 @@ def cli() -> None:  # noqa: D103
 @cli.command(
     cls=CustomCommand, help_options_color="cyan", short_help="Download the drawn file."
 )
-@click.argument("drawing_id", type=int)
+@click.argument("drawing_id", type=int, required=False)
+@click.option(
+    "--all",
+    "is_all",
+    is_flag=True,
+    help=(
+        "Download all the drawn files to the directory of '--out'. "
+        "The files already downloaded there are skipped."
+    ),
+)
+@click.option(
+    "--since",
+    type=int,
+    metavar="DRAWING_ID",
+    help="Download the drawn files with a larger ID only. Used with '--all'.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of files downloaded at the same time. Used with '--all'.",
+)
 @download_options
+@cache_options
 @common_options
 @pass_state
 def download(
-    state: State, drawing_id: int, out: Path, force: bool, is_open: Optional[bool]
+    state: State,
+    drawing_id: Optional[int],
+    is_all: bool,
+    since: Optional[int],
+    jobs: int,
+    out: Path,
+    force: bool,
+    is_open: Optional[bool],
+    segments: int,
 ) -> None:
-    """Download the drawn file."""
+    """Download the drawn file.
+
+    With '--all', all the drawn files are downloaded to the directory.
+    """
+    if drawing_id is not None and is_all:
+        raise click.UsageError(
+            "DRAWING_ID and '--all' option cannot be used at the same time."
+        )
+    elif is_all:
+        _download_all(state, out, since, jobs, force, segments)
+        return
+    elif drawing_id is None:
+        raise click.UsageError("Either DRAWING_ID or '--all' option is required.")
+
     client = get_client(state)
 
     try:
@@ -83,8 +153,6 @@ def download(
 
     status = data.get("execStatus")
     url = data.get("drawingUrl")
-    keypoint_id = data.get("keypoint")
-    comparison_id = data.get("comparison")
 
     if status != "SUCCESS" or url is None:
         raise ClickException("Unable to download because drawing failed.")
@@ -92,12 +160,7 @@ def download(
     url_path = Path(str(urlparse(url).path))
     if out.is_dir():
         try:
-            if keypoint_id:
-                name = _get_name_from_keypoint_id(client, keypoint_id)
-            elif comparison_id:
-                name = _get_name_from_comparison_id(client, comparison_id)
-            else:
-                name = ""
+            name = client.name_resolver.drawing_name(data)
         except RequestsError as e:
             raise ClickException(str(e))
 
@@ -110,16 +173,22 @@ def download(
     if out.suffix.lower() != url_path.suffix.lower():
         echo_warning(f'"{out.suffix}" is not a valid extension.')
         expected_name = out.with_suffix(url_path.suffix).name
-        if click.confirm(f'Change output path from "{out.name}" to "{expected_name}"?'):
+        if confirm(f'Change output path from "{out.name}" to "{expected_name}"?'):
             out = out.with_suffix(url_path.suffix)
 
     if force or not _is_skip(out):
         try:
             if state.use_spinner:
-                with yaspin(text="Downloading..."):
-                    client.download(drawing_id, out, exist_ok=True)
+                with TransferProgress("Downloading...") as progress:
+                    client.download(
+                        drawing_id,
+                        out,
+                        exist_ok=True,
+                        progress=progress,
+                        segments=segments,
+                    )
             else:
-                client.download(drawing_id, out, exist_ok=True)
+                client.download(drawing_id, out, exist_ok=True, segments=segments)
         except RequestsError as e:
             raise ClickException(str(e))
 
@@ -128,7 +197,7 @@ def download(
         if is_open is None:
             is_open = state.is_open
         if is_open is None:
-            is_open = click.confirm("Open the Downloaded file?")
+            is_open = confirm("Open the Downloaded file?")
         if is_open:
             click.launch(str(out))
     else:
@@ -142,44 +211,158 @@ def download(
         echo(message)
 
 
-def _get_name_from_keypoint_id(client, keypoint_id: Optional[int]) -> str:
-    if keypoint_id is None:
-        return ""
-
-    data = client.get_keypoint(keypoint_id)
-    image_id = data.get("image")
-    movie_id = data.get("movie")
+def _download_all(
+    state: State,
+    out: Path,
+    since: Optional[int],
+    jobs: int,
+    force: bool,
+    segments: int,
+) -> None:
+    if out.exists() and not out.is_dir():
+        raise click.BadParameter(
+            f'"{out}" is not a directory.', param_hint="'-o' / '--out'"
+        )
+    out.mkdir(exist_ok=True)
 
-    if image_id:
-        data = client.get_image(image_id)
-    elif movie_id:
-        data = client.get_movie(movie_id)
-    else:
-        return ""
+    client = get_client(state)
+    manifest = Manifest(out / MANIFEST_NAME)
+    try:
+        # Only the successful drawings have the drawn files.
+        drawings = client.get_drawings(params={"execStatus": "SUCCESS"})
+    except RequestsError as e:
+        raise ClickException(str(e))
+    drawings = [x for x in drawings if since is None or x["id"] > since]
+    drawings.sort(key=lambda x: x["id"])
+
+    targets = [x for x in drawings if force or not manifest.is_downloaded(x["id"])]
+    skipped = len(drawings) - len(targets)
+    echo(
+        f"Downloading {len(targets)} drawn files to {color_path(out)}. "
+        f"({skipped} already downloaded)"
+    )
+    if len(targets) == 0:
+        return
+
+    resolver = client.name_resolver
+    resolver.prefetch = True
+    # Each file is downloaded with a connection for each segment.
+    max_workers = min(jobs, MAX_IO_WORKERS)
+    aclient = AsyncClient(
+        client, max_workers=max_workers, connections=max_workers * segments
+    )
+    try:
+        failed = aio.run(
+            _download_each(aclient, resolver, manifest, targets, out, jobs, segments)
+        )
+    finally:
+        aclient.close()
+
+    if failed:
+        raise ClickException(f"{failed} of {len(targets)} downloads failed.")
+
+
+async def _download_each(
+    aclient: AsyncClient,
+    resolver: NameResolver,
+    manifest: "Manifest",
+    drawings: List[dict],
+    out: Path,
+    jobs: int,
+    segments: int,
+) -> int:
+    failed = 0
+    async for drawing, task in aio.map_unordered(
+        lambda x: download_drawing(aclient, resolver, x, out, segments),
+        drawings,
+        jobs,
+    ):
+        drawing_id = drawing["id"]
+        label = f"drawing id: {color_id(drawing_id)}"
+        try:
+            path = task.result()
+            manifest.add(drawing_id, path)
+        except (ClickException, OSError, RequestsError) as e:
+            echo_error(f"Download failed. ({label})\n{e}")
+            failed += 1
+            continue
+
+        echo_success(f"Downloaded the file to {color_path(path)}. ({label})")
+    return failed
+
+
+async def download_drawing(
+    aclient: AsyncClient,
+    resolver: NameResolver,
+    drawing: dict,
+    out: Path,
+    segments: int,
+) -> Path:
+    """Download the drawn file to out, named after the image or movie.
+
+    Raises:
+        ClickException: The drawing failed.
+        OSError: Unable to write the file.
+        RequestsError: HTTP request fails.
+    """
+    drawing_id = drawing["id"]
+    data = await aclient.get_one_data("drawings", drawing_id)
+    url = data.get("drawingUrl")
+    if data.get("execStatus") != "SUCCESS" or url is None:
+        raise ClickException("Unable to download because drawing failed.")
 
-    return data.get("name", "")
+    url_path = Path(str(urlparse(url).path))
+    name = await aclient.call(resolver.drawing_name, data) or url_path.stem
+    # The ID is added because there can be many drawings with the same name.
+    path = out / f"{name}_{drawing_id}{url_path.suffix}"
+    await aclient.download_file(url, path, segments=segments)
+    return path
 
 
-def _get_name_from_comparison_id(client, comparison_id: Optional[int]) -> str:
-    if comparison_id is None:
-        return ""
+class Manifest(object):
+    """Record of the drawn files downloaded to a directory.
 
-    data = client.get_comparison(comparison_id)
-    target_id = data.get("target")
-    source_id = data.get("source")
+    It is a JSON Lines file with the drawing id, the file name and its size, so
+    a file already downloaded is found without any request. A file that has been
+    removed or changed since it was downloaded is downloaded again.
+    """
 
-    target_name = _get_name_from_keypoint_id(client, target_id)
-    source_name = _get_name_from_keypoint_id(client, source_id)
+    def __init__(self, file: Path):
+        self._file = file
+        self._entries: Dict[int, dict] = {}
+        try:
+            with file.open() as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._entries[int(entry["id"])] = entry
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            pass
+
+    def is_downloaded(self, drawing_id: int) -> bool:
+        """Return True if the drawn file exists as it was downloaded."""
+        entry = self._entries.get(drawing_id)
+        if entry is None:
+            return False
+        try:
+            size = (self._file.parent / entry["file"]).stat().st_size
+        except (OSError, KeyError, TypeError):
+            return False
+        return size == entry.get("size")
 
-    if target_name and source_name:
-        return f"{target_name}_{source_name}"
-    else:
-        return ""
+    def add(self, drawing_id: int, path: Path) -> None:
+        """Record the downloaded file."""
+        entry = {"id": drawing_id, "file": path.name, "size": path.stat().st_size}
+        self._entries[drawing_id] = entry
+        with self._file.open("a") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
 
 
 def _is_skip(path: Path):
     if path.exists():
         echo(f"File already exists: {color_path(path)}")
-        if not click.confirm("Do you want to overwrite?"):
+        if not confirm("Do you want to overwrite?"):
             return True
     return False
@@ -9,7 +9,7 @@ from yaspin import yaspin
 from ..click_custom import CustomCommand
 from ..exceptions import ClickException
 from ..options import common_options
-from ..output import echo, echo_success
+from ..output import confirm, echo, echo_success
 from ..state import State, pass_state
 from ..utils import color_id, echo_invalid_option_warning, get_client, parse_rule
 from .download import check_download_options, download, download_options
@@ -107,7 +107,7 @@ def draw(
     if is_download is None:
         is_download = state.is_download
     if is_download is None:
-        is_download = click.confirm("Download the drawn file?")
+        is_download = confirm("Download the drawn file?")
     if not is_download:
         args = click.get_os_args()
         options = check_download_options(args)
@@ -1,19 +1,45 @@
+from glob import glob
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import click
-from anymotion_sdk import RequestsError
+from anymotion_sdk import FileTypeError, RequestsError
+from anymotion_sdk.utils import IMAGE_SUFFIXES, MOVIE_SUFFIXES
 from yaspin import yaspin
 
-from ..click_custom import CustomCommand
+from .. import aio
+from ..aio import MAX_IO_WORKERS, AsyncClient
+from ..click_custom import CustomCommand, IntListParamType
 from ..exceptions import ClickException
-from ..options import common_options
-from ..output import echo, echo_success
+from ..options import common_options, dedup_option
+from ..output import echo, echo_error, echo_success
+from ..poller import JobResult
 from ..state import State, pass_state
-from ..utils import color_id, echo_invalid_option_warning, get_client
+from ..utils import color_id, color_path, echo_invalid_option_warning, get_client
 from .download import check_download_options, download_options
 from .draw import check_draw_options, draw, draw_options
-from .upload import upload
+from .upload import DEFAULT_TEXT, upload
+
+
+def validate_paths(ctx, param, value):
+    """Validate path and expand a directory or glob pattern into file paths."""
+    if value is None:
+        return None
+
+    # An existing file is not a pattern even if its name has "[" and so on.
+    if not Path(value).is_file() and any(c in value for c in "*?["):
+        paths = [Path(p) for p in sorted(glob(value, recursive=True))]
+    elif Path(value).is_dir():
+        paths = sorted(Path(value).iterdir())
+    else:
+        path_type = click.Path(exists=True, dir_okay=False)
+        return [Path(path_type.convert(value, param, ctx))]
+
+    suffixes = IMAGE_SUFFIXES + MOVIE_SUFFIXES
+    paths = [p for p in paths if p.is_file() and p.suffix.lower() in suffixes]
+    if len(paths) == 0:
+        raise click.BadParameter(f"No movie or image file matches '{value}'.")
+    return paths
 
 
 @click.group()
@@ -30,10 +56,41 @@ def cli() -> None:  # noqa: D103
 @click.option("--movie-id", type=int, help="Uploaded movie ID.")
 @click.option(
     "--path",
-    type=click.Path(exists=True, dir_okay=False),
+    "paths",
+    callback=validate_paths,
     metavar="PATH",
-    help="Path of the movie or image file to extract.",
+    help=(
+        "Path of the movie or image file to extract. "
+        "A directory or a glob pattern such as 'clips/*.mp4' extracts all files."
+    ),
+)
+@click.option(
+    "--image-ids",
+    type=IntListParamType(),
+    help="Comma separated uploaded image IDs.",
 )
+@click.option(
+    "--movie-ids",
+    type=IntListParamType(),
+    help="Comma separated uploaded movie IDs.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of items processed concurrently when extracting multiple items.",
+)
+@click.option(
+    "--reuse",
+    is_flag=True,
+    help=(
+        "Use the keypoints already extracted successfully from the same image or "
+        "movie instead of extracting them again."
+    ),
+)
+@dedup_option
 @click.option(
     "-d",
     "--with-drawing",
@@ -50,24 +107,46 @@ def extract(
     state: State,
     image_id: Optional[int],
     movie_id: Optional[int],
-    path: Optional[Path],
+    paths: Optional[List[Path]],
+    image_ids: Optional[List[int]],
+    movie_ids: Optional[List[int]],
+    jobs: int,
+    reuse: bool,
     with_drawing: bool,
     **kwargs,
 ) -> None:
     """Extract keypoints from image or movie.
 
-    Either '--image-id' or '--movie-id' or '--path' is required.
+    Either '--image-id', '--movie-id', '--path', '--image-ids' or '--movie-ids'
+    is required.
+
+    When '--path' matches several files, or '--image-ids' or '--movie-ids' is
+    used, all items are extracted concurrently and each result is shown as
+    soon as it finishes.
+
+    When using the '--reuse' option, the keypoints already extracted from the
+    image or movie are used, and the extraction is started only if there are
+    none.
 
     When using the '--with-drawing' option, you can use drawing options such as
     '--rule', '--bg-rule', and '--rule-file', and '--download / --no-download'.
     In addition, when downloading the drawn file, you can use download options
     such as '-o, --out', '--force' and '--open / --no-open'.
     """
-    required_options = [image_id, movie_id, path]
+    required_options = [image_id, movie_id, paths, image_ids, movie_ids]
     if required_options.count(None) != len(required_options) - 1:
         raise click.UsageError(
-            "Either '--image-id' or '--movie-id' or '--path' is required"
+            "Either '--image-id', '--movie-id', '--path', '--image-ids' or "
+            "'--movie-ids' is required"
         )
+
+    items = _make_items(image_id, movie_id, paths, image_ids, movie_ids)
+    if len(items) > 1:
+        if with_drawing:
+            echo_invalid_option_warning("extracting a single item", ["--with-drawing"])
+        _extract_batch(state, items, jobs, reuse)
+        return
+
     if not with_drawing:
         args = click.get_os_args()
         options = check_draw_options(args) + check_download_options(args)
@@ -75,13 +154,26 @@ def extract(
 
     client = get_client(state)
 
-    result = None
-    if path is not None:
-        result = ctx.invoke(upload, path=path)._asdict()
+    item = items[0]
+    if "path" in item:
+        data = ctx.invoke(upload, path=item["path"])._asdict()
         echo()
-    data = result or {"image_id": image_id, "movie_id": movie_id}
+    else:
+        data = {"image_id": item.get("image_id"), "movie_id": item.get("movie_id")}
 
     try:
+        if reuse:
+            keypoint_id = client.find_keypoint(
+                image_id=data.get("image_id"), movie_id=data.get("movie_id")
+            )
+            if keypoint_id is not None:
+                cid = color_id(keypoint_id)
+                echo_success(f"Reused the extracted keypoints. (keypoint id: {cid})")
+                if with_drawing:
+                    echo()
+                    ctx.invoke(draw, keypoint_id=keypoint_id, **kwargs)
+                return
+
         keypoint_id = client.extract_keypoint(data=data)
         echo(f"Keypoint extraction started. (keypoint id: {color_id(keypoint_id)})")
 
@@ -103,3 +195,164 @@ def extract(
     if with_drawing:
         echo()
         ctx.invoke(draw, keypoint_id=keypoint_id, **kwargs)
+
+
+def _make_items(
+    image_id: Optional[int],
+    movie_id: Optional[int],
+    paths: Optional[List[Path]],
+    image_ids: Optional[List[int]],
+    movie_ids: Optional[List[int]],
+) -> List[dict]:
+    if image_id is not None:
+        return [{"image_id": image_id}]
+    elif movie_id is not None:
+        return [{"movie_id": movie_id}]
+    elif paths is not None:
+        return [{"path": path} for path in paths]
+    elif image_ids is not None:
+        return [{"image_id": image_id} for image_id in image_ids]
+    elif movie_ids is not None:
+        return [{"movie_id": movie_id} for movie_id in movie_ids]
+    else:
+        raise Exception("There are no items to extract.")
+
+
+def _extract_batch(
+    state: State,
+    items: List[dict],
+    jobs: int,
+    reuse: bool,
+    run: Optional[dict] = None,
+) -> None:
+    """Extract the items concurrently.
+
+    The run is recorded to the job journal. If the recorded run is given, it is
+    resumed: the jobs already started in it are waited for again.
+    """
+    client = get_client(state)
+
+    try:
+        # get the token once so that workers do not request it concurrently
+        client.auth.token
+    except RequestsError as e:
+        raise ClickException(str(e))
+
+    journal = client.job_journal
+    if run is not None:
+        run_id, since = run["id"], run["started_at"]
+    else:
+        since = None
+        # The paths are absolute, so that the run is resumed from any directory.
+        recorded = [
+            {"path": item["path"].resolve()} if "path" in item else item
+            for item in items
+        ]
+        options = {"reuse": reuse}
+        run_id = journal.start_run("extract", recorded, options) if journal else None
+
+    echo(f"Keypoint extraction started for {len(items)} items.")
+
+    aclient = AsyncClient(client, max_workers=min(jobs, MAX_IO_WORKERS))
+    try:
+        failed = aio.run(_extract_all(aclient, items, jobs, reuse, since))
+    finally:
+        aclient.close()
+        if client.upload_index is not None:
+            client.upload_index.flush()
+
+    if journal is not None and run_id is not None:
+        journal.finish_run(run_id)
+
+    if failed:
+        raise ClickException(f"{failed} of {len(items)} keypoint extractions failed.")
+
+
+async def _extract_all(
+    aclient: AsyncClient,
+    items: List[dict],
+    jobs: int,
+    reuse: bool,
+    since: Optional[float] = None,
+) -> int:
+    failed = 0
+    async for item, task in aio.map_unordered(
+        lambda x: _extract_item(aclient, x, reuse, since), items, jobs
+    ):
+        label = _item_label(item)
+        try:
+            keypoint_id, response = task.result()
+        except (FileTypeError, OSError, RequestsError) as e:
+            # OSError, e.g. the file is removed or cannot be read
+            echo_error(f"Keypoint extraction failed. ({label})\n{e}")
+            failed += 1
+            continue
+
+        cid = color_id(keypoint_id)
+        if response is None:
+            echo_success(
+                f"Reused the extracted keypoints. ({label}, keypoint id: {cid})"
+            )
+        elif response.status == "SUCCESS":
+            echo_success(
+                f"Keypoint extraction is complete. ({label}, keypoint id: {cid})"
+            )
+        elif response.status == "TIMEOUT":
+            echo_error(
+                f"Keypoint extraction is timed out. ({label}, keypoint id: {cid})"
+            )
+            failed += 1
+        else:
+            echo_error(
+                f"Keypoint extraction failed. ({label}, keypoint id: {cid})\n"
+                f"{response.failure_detail}"
+            )
+            failed += 1
+    return failed
+
+
+async def _extract_item(
+    aclient: AsyncClient, item: dict, reuse: bool, since: Optional[float] = None
+) -> Tuple[int, Optional[JobResult]]:
+    """Extract the item and return the keypoint id and the result.
+
+    The result is None if the keypoints already extracted are reused. If since
+    is given, the job started since then for the item is waited for instead of
+    starting a new one.
+    """
+    path = item.get("path")
+    if path is None:
+        data = item
+    else:
+        result = await aclient.find_uploaded(path)
+        if result is None:
+            result = await aclient.upload(path, text=DEFAULT_TEXT)
+        data = result._asdict()
+
+    if reuse:
+        found_id = await aclient.find_keypoint(
+            image_id=data.get("image_id"),
+            movie_id=data.get("movie_id"),
+            prefetch=True,
+        )
+        if found_id is not None:
+            return found_id, None
+
+    journal = aclient.client.job_journal
+    if since is not None and journal is not None:
+        inputs = {k: v for k, v in data.items() if v is not None}
+        job = await aclient.call(journal.find_job, "keypoints", inputs, since)
+        if job is not None:
+            return job["id"], await aclient.wait_for_extraction(job["id"])
+
+    keypoint_id = await aclient.extract_keypoint(data=data)
+    return keypoint_id, await aclient.wait_for_extraction(keypoint_id)
+
+
+def _item_label(item: dict) -> str:
+    if "path" in item:
+        return f"path: {color_path(item['path'])}"
+    elif "image_id" in item:
+        return f"image id: {color_id(item['image_id'])}"
+    else:
+        return f"movie id: {color_id(item['movie_id'])}"
@@ -38,6 +38,8 @@ def run_interactive_mode(ctx: click.Context, state: State) -> None:
     )
     click.echo()
 
+    state.reuse_clients()
+
     style = Style.from_dict({"profile": "gray"})
     message = [("class:cli_name", state.cli_name)]
     if state.profile != "default":
@@ -0,0 +1,177 @@
+import json
+from concurrent.futures import as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import click
+
+from ..click_custom import CustomGroup
+from ..exceptions import ClickException
+from ..options import common_options
+from ..output import echo, echo_error, echo_success
+from ..state import State, pass_state
+from ..utils import color_id, get_client
+
+if TYPE_CHECKING:
+    from ..journal import JobJournal
+
+# name and ID label of the processing of each endpoint
+JOB_NAMES = {
+    "keypoints": ("Keypoint extraction", "keypoint id"),
+    "drawings": ("Drawing", "drawing id"),
+    "analyses": ("Analysis", "analysis id"),
+    "comparisons": ("Comparison", "comparison id"),
+}
+INPUTS_WIDTH = 40
+
+
+@click.group()
+def cli() -> None:  # noqa: D103
+    pass
+
+
+@cli.group(
+    cls=CustomGroup,
+    help_options_color="cyan",
+    short_help="Manage the started processing recorded in the job journal.",
+)
+def jobs() -> None:
+    """Manage the started processing recorded in the job journal.
+
+    Every extraction, drawing, analysis and comparison started by the CLI is
+    recorded locally, so the jobs still in progress can be waited for again
+    after the CLI is stopped.
+    """
+
+
+@jobs.command("list", short_help="Show the recorded jobs.")
+@click.option(
+    "--in-progress", is_flag=True, help="Show only the jobs still in progress."
+)
+@click.option(
+    "--limit",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Maximum number of jobs to show.",
+)
+@common_options
+@pass_state
+def list_jobs(state: State, in_progress: bool, limit: int) -> None:
+    """Show the recorded jobs from the newest."""
+    from tabulate import tabulate
+
+    journal = _get_journal(state)
+
+    rows = []
+    for job in journal.jobs(in_progress=in_progress, limit=limit):
+        inputs = json.dumps(job["inputs"], separators=(",", ":"))
+        if len(inputs) > INPUTS_WIDTH:
+            width = INPUTS_WIDTH - 3
+            inputs = inputs[:width] + "..."
+        started_at = datetime.fromtimestamp(job["started_at"])
+        rows.append(
+            [
+                job["endpoint"],
+                job["id"],
+                job["status"],
+                started_at.strftime("%Y-%m-%d %H:%M:%S"),
+                inputs,
+            ]
+        )
+
+    if len(rows) == 0:
+        echo("There are no jobs.")
+        return
+    echo(tabulate(rows, headers=["Endpoint", "ID", "Status", "Started", "Inputs"]))
+
+
+@jobs.command(short_help="Wait for the jobs still in progress.")
+@common_options
+@pass_state
+def wait(state: State) -> None:
+    """Wait for the jobs still in progress, and record their results."""
+    client = get_client(state)
+    journal = _get_journal(state)
+
+    in_progress = journal.jobs(in_progress=True)
+    if len(in_progress) == 0:
+        echo("There are no jobs in progress.")
+        return
+
+    echo(f"Waiting for {len(in_progress)} jobs.")
+    futures = {
+        client.submit_wait(job["endpoint"], job["id"]): job for job in in_progress
+    }
+    failed = 0
+    for future in as_completed(futures):
+        job = futures[future]
+        name, id_label = JOB_NAMES.get(job["endpoint"], ("Job", "id"))
+        label = f"{id_label}: {color_id(job['id'])}"
+        try:
+            response = future.result()
+        except Exception as e:
+            # e.g. RequestsError, or any error of checking the status
+            echo_error(f"{name} failed. ({label})\n{e}")
+            failed += 1
+            continue
+
+        if response.status == "SUCCESS":
+            echo_success(f"{name} is complete. ({label})")
+        elif response.status == "TIMEOUT":
+            echo_error(f"{name} is timed out. ({label})")
+            failed += 1
+        else:
+            echo_error(f"{name} failed. ({label})\n{response.failure_detail}")
+            failed += 1
+
+    if failed:
+        raise ClickException(f"{failed} of {len(in_progress)} jobs failed.")
+
+
+@jobs.command(short_help="Resume the interrupted batch run.")
+@click.argument("run_id", type=int, required=False)
+@click.option(
+    "-j",
+    "--jobs",
+    "max_jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of items processed concurrently.",
+)
+@common_options
+@pass_state
+def resume(state: State, run_id: Optional[int], max_jobs: int) -> None:
+    """Resume the interrupted batch run.
+
+    RUN_ID is the ID of the batch run, such as extracting multiple items. If it
+    is omitted, the latest run that has not finished is resumed. The jobs
+    already started in the run are waited for instead of being started again,
+    and only the rest of the items are processed, with the options of the run.
+    """
+    from .extract import _extract_batch
+
+    journal = _get_journal(state)
+    run = journal.get_run(run_id)
+    if run is None:
+        raise ClickException("There is no batch run to resume.")
+
+    if run["command"] != "extract":
+        raise ClickException(f"Unable to resume the run of {run['command']}.")
+
+    items = [
+        {"path": Path(item["path"])} if "path" in item else item
+        for item in run["items"]
+    ]
+    echo(f"Resuming the batch run. (run id: {color_id(run['id'])})")
+    reuse = bool(run["options"].get("reuse"))
+    _extract_batch(state, items, max_jobs, reuse=reuse, run=run)
+
+
+def _get_journal(state: State) -> "JobJournal":
+    journal = get_client(state).job_journal
+    if journal is None:
+        raise ClickException("The job journal is not available.")
+    return journal
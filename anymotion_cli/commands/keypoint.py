@@ -1,15 +1,28 @@
-from typing import Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
 
 import click
 from anymotion_sdk import RequestsError
 from yaspin import yaspin
 
+from .. import aio
+from ..aio import MAX_IO_WORKERS, AsyncClient
 from ..click_custom import CustomGroup
 from ..exceptions import ClickException
-from ..options import common_options
-from ..output import echo_json
+from ..options import cache_options, common_options, format_option
+from ..output import echo, echo_error, echo_json, echo_ndjson, echo_success
 from ..state import State, pass_state
-from ..utils import get_client
+from ..utils import (
+    color_id,
+    color_path,
+    get_client,
+    get_keypoint_store,
+    get_settings,
+    require_numpy,
+)
+
+if TYPE_CHECKING:
+    from ..keypoints import KeypointStore
 
 
 @click.group()
@@ -37,6 +50,7 @@ def keypoint() -> None:
 )
 @click.option("--no-keypoint", is_flag=True, help="Do not show keypoint data.")
 @click.option("--join", is_flag=True, help="Join the related data.")
+@cache_options
 @common_options
 @pass_state
 def show(
@@ -82,9 +96,10 @@ def show(
     ),
     help="Get data for the specified status only.",
 )
+@format_option
 @common_options
 @pass_state
-def list(state: State, status: Optional[str]) -> None:
+def list(state: State, status: Optional[str], output_format: str) -> None:
     """Show a list of information for all keypoints."""
     client = get_client(state)
 
@@ -92,6 +107,13 @@ def list(state: State, status: Optional[str]) -> None:
     if status:
         params = {"execStatus": status}
 
+    if output_format == "ndjson":
+        try:
+            echo_ndjson(client.iter_list_data("keypoints", params=params))
+        except RequestsError as e:
+            raise ClickException(str(e))
+        return
+
     try:
         if state.use_spinner:
             with yaspin(text="Retrieving..."):
@@ -105,3 +127,184 @@ def list(state: State, status: Optional[str]) -> None:
         echo_json(data)
     else:
         echo_json(data, pager=True)
+
+
+@keypoint.command(short_help="Export extracted keypoint data to an array file.")
+@click.argument("keypoint_id", type=int)
+@click.option(
+    "--format",
+    "export_format",
+    type=click.Choice(["npz", "parquet", "arrow"], case_sensitive=False),
+    default="npz",
+    show_default=True,
+    help="Format of the file. parquet and arrow require pyarrow.",
+)
+@click.option(
+    "-o",
+    "--out",
+    type=click.Path(),
+    metavar="PATH",
+    help=(
+        "Path of file or directory to output. "
+        "[default: <KEYPOINT_ID>.<FORMAT> in the current directory]"
+    ),
+)
+@click.option("--force", is_flag=True, help="If the file exists, overwrite it.")
+@cache_options
+@common_options
+@pass_state
+def export(
+    state: State,
+    keypoint_id: int,
+    export_format: str,
+    out: Optional[str],
+    force: bool,
+) -> None:
+    """Export extracted keypoint data to an array file.
+
+    The keypoints of all frames are converted to a dense float32 array of the
+    shape (frames, joints, 2) and a mask of the detected joints, which are much
+    smaller and faster to load than JSON.
+    """
+    require_numpy()
+    from ..keypoints import KeypointArray
+
+    export_format = export_format.lower()
+    path = Path(out or ".")
+    if path.is_dir():
+        path = path / f"{keypoint_id}.{export_format}"
+    if path.exists() and not force:
+        raise ClickException(
+            f"File already exists: {path}\nUse --force option to overwrite it."
+        )
+
+    client = get_client(state)
+    try:
+        if state.use_spinner:
+            with yaspin(text="Retrieving..."):
+                response = client.get_keypoint(keypoint_id)
+        else:
+            response = client.get_keypoint(keypoint_id)
+    except RequestsError as e:
+        raise ClickException(str(e))
+    if response.get("execStatus") != "SUCCESS":
+        raise ClickException("Status is not SUCCESS.")
+
+    meta = {
+        "keypoint_id": keypoint_id,
+        "image_id": response.get("image"),
+        "movie_id": response.get("movie"),
+    }
+    array = KeypointArray.from_frames(
+        response.get("keypoint") or [],
+        meta={k: v for k, v in meta.items() if v is not None},
+    )
+    try:
+        array.save(path, export_format)
+    except ImportError:
+        raise ClickException(
+            f"pyarrow is required to export to {export_format}. "
+            "Install it with 'pip install anymotion-cli[arrow]'."
+        )
+    except OSError as e:
+        raise ClickException(str(e))
+
+    frames, joints = array.mask.shape
+    echo_success(
+        f"Keypoints are exported to {color_path(path)}. "
+        f"({frames} frames, {joints} joints)"
+    )
+
+
+@keypoint.command(short_help="Save the successful keypoints to the local store.")
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of keypoints got concurrently.",
+)
+@common_options
+@pass_state
+def sync(state: State, jobs: int) -> None:
+    """Save the successful keypoints to the local keypoint store.
+
+    Only the keypoints not saved yet are got, so it can be run repeatedly to
+    keep the store up to date. Each keypoint is saved as "<KEYPOINT_ID>.npy",
+    which can be opened with numpy.load(path, mmap_mode="r"), with the sidecar
+    "<KEYPOINT_ID>.json" of its image or movie and joint names.
+    """
+    store = get_keypoint_store(state.profile, get_settings(state.profile))
+    client = get_client(state)
+
+    try:
+        keypoints = client.get_keypoints(params={"execStatus": "SUCCESS"})
+        targets = [x for x in keypoints if x["id"] not in store]
+        fps = {}
+        if any(x.get("movie") for x in targets):
+            fps = {x["id"]: x.get("fps") for x in client.get_list_data("movies")}
+    except RequestsError as e:
+        raise ClickException(str(e))
+    except OSError as e:
+        raise ClickException(f"Unable to use the keypoint store: {e}")
+
+    skipped = len(keypoints) - len(targets)
+    echo(
+        f"Saving {len(targets)} keypoints to {color_path(store.directory)}. "
+        f"({skipped} already saved)"
+    )
+    if len(targets) == 0:
+        return
+
+    targets.sort(key=lambda x: x["id"])
+    aclient = AsyncClient(client, max_workers=min(jobs, MAX_IO_WORKERS))
+    try:
+        failed = aio.run(_sync_each(aclient, store, targets, fps, jobs))
+    finally:
+        aclient.close()
+
+    if failed:
+        raise ClickException(f"{failed} of {len(targets)} keypoints failed to save.")
+
+
+async def _sync_each(
+    aclient: AsyncClient,
+    store: "KeypointStore",
+    keypoints: List[dict],
+    fps: dict,
+    jobs: int,
+) -> int:
+    failed = 0
+    async for keypoint, task in aio.map_unordered(
+        lambda x: _sync_keypoint(aclient, store, x, fps), keypoints, jobs
+    ):
+        label = f"keypoint id: {color_id(keypoint['id'])}"
+        try:
+            task.result()
+        except (OSError, RequestsError) as e:
+            echo_error(f"Saving the keypoints failed. ({label})\n{e}")
+            failed += 1
+            continue
+
+        echo_success(f"Saved the keypoints. ({label})")
+    return failed
+
+
+async def _sync_keypoint(
+    aclient: AsyncClient, store: "KeypointStore", keypoint: dict, fps: dict
+) -> None:
+    from ..keypoints import KeypointArray
+
+    # The store keeps the keypoints, so they are not also put in the response cache.
+    data = await aclient.get_one_data("keypoints", keypoint["id"], use_cache=False)
+    meta = {
+        "keypoint_id": keypoint["id"],
+        "image_id": data.get("image"),
+        "movie_id": data.get("movie"),
+        "fps": fps.get(data.get("movie")),
+    }
+    array = await aclient.call(
+        KeypointArray.from_frames, data.get("keypoint") or [], meta=meta
+    )
+    await aclient.call(store.add, array)
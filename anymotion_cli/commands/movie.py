@@ -4,8 +4,8 @@ from yaspin import yaspin
 
 from ..click_custom import CustomGroup
 from ..exceptions import ClickException
-from ..options import common_options
-from ..output import echo_json
+from ..options import cache_options, common_options, format_option
+from ..output import echo_json, echo_ndjson
 from ..state import State, pass_state
 from ..utils import get_client
 
@@ -26,6 +26,7 @@ def movie() -> None:
 
 @movie.command(short_help="Show movie information.")
 @click.argument("movie_id", type=int)
+@cache_options
 @common_options
 @pass_state
 def show(state: State, movie_id: int) -> None:
@@ -41,12 +42,20 @@ def show(state: State, movie_id: int) -> None:
 
 
 @movie.command(short_help="Show a list of information for all movies.")
+@format_option
 @common_options
 @pass_state
-def list(state: State) -> None:
+def list(state: State, output_format: str) -> None:
     """Show a list of information for all movies."""
     client = get_client(state)
 
+    if output_format == "ndjson":
+        try:
+            echo_ndjson(client.iter_list_data("movies"))
+        except RequestsError as e:
+            raise ClickException(str(e))
+        return
+
     try:
         if state.use_spinner:
             with yaspin(text="Retrieving..."):
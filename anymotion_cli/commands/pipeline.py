@@ -0,0 +1,437 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import click
+from anymotion_sdk import RequestsError
+
+from .. import aio
+from ..aio import MAX_IO_WORKERS, AsyncClient
+from ..click_custom import CustomCommand, CustomGroup
+from ..exceptions import ClickException
+from ..options import common_options, dedup_option
+from ..output import echo, echo_error, echo_success
+from ..poller import JobResult
+from ..state import State, pass_state
+from ..utils import color_id, color_path, get_client, parse_rule
+from .download import download_drawing
+from .extract import validate_paths
+from .upload import DEFAULT_TEXT
+
+R = TypeVar("R")
+
+STAGE_NAMES = {
+    "upload": "Upload",
+    "extract": "Keypoint extraction",
+    "analyze": "Analysis",
+    "compare": "Comparison",
+    "draw": "Drawing",
+    "download": "Download",
+}
+# The number of items processed at the same time in each stage.
+DEFAULT_CONCURRENCY = {
+    "upload": 4,
+    "extract": 16,
+    "analyze": 16,
+    "compare": 16,
+    "draw": 16,
+    "download": 4,
+}
+
+
+@click.group()
+def cli() -> None:  # noqa: D103
+    pass
+
+
+@cli.group(
+    cls=CustomGroup,
+    help_options_color="cyan",
+    short_help="Run the stages from upload to download for many inputs.",
+)
+def pipeline() -> None:
+    """Run the stages from upload to download for many inputs."""
+
+
+@pipeline.command(
+    cls=CustomCommand,
+    help_options_color="cyan",
+    short_help="Run the pipeline written in the spec file.",
+)
+@click.argument("spec_file", type=click.Path(exists=True, dir_okay=False))
+@dedup_option
+@common_options
+@pass_state
+def run(state: State, spec_file: str) -> None:
+    """Run the pipeline written in the spec file.
+
+    The spec file is written in JSON, or in YAML if PyYAML is installed and the
+    extension is '.yaml' or '.yml'. For example:
+
+    \b
+        inputs:
+          - clips/*.mp4
+          - image_id: 1
+          - keypoint_id: 2
+        extract:
+          reuse: true
+        analyze:
+          - rule_file: rules/angle.json
+        compare:
+          target:
+            keypoint_id: 3
+        draw:
+          rule_file: rules/draw.json
+        download:
+          out: drawn
+        concurrency:
+          extract: 8
+
+    Each input is a path, a directory or a glob pattern relative to the spec
+    file, or an uploaded image, movie or extracted keypoint. After the
+    keypoints of an input are extracted, the analyses, the comparison with the
+    target and the drawing of them run at the same time. The number of items
+    processed at the same time in each stage is limited by 'concurrency'.
+    """  # noqa: D301
+    spec = load_spec(Path(spec_file))
+    client = get_client(state)
+
+    try:
+        # get the token once so that workers do not request it concurrently
+        client.auth.token
+    except RequestsError as e:
+        raise ClickException(str(e))
+
+    if spec["download"] is not None:
+        spec["download"]["out"].mkdir(parents=True, exist_ok=True)
+
+    echo(f"Pipeline started for {len(spec['inputs'])} inputs.")
+
+    aclient = AsyncClient(client, max_workers=MAX_IO_WORKERS)
+    try:
+        runner = _Pipeline(aclient, spec)
+        aio.run(runner.run())
+    finally:
+        aclient.close()
+        if client.upload_index is not None:
+            client.upload_index.flush()
+
+    if runner.failed:
+        total = runner.failed + runner.completed
+        raise ClickException(f"{runner.failed} of {total} stages failed.")
+
+
+def load_spec(path: Path) -> Dict[str, Any]:
+    """Read the spec file and return the normalized spec.
+
+    Raises:
+        ClickException: The spec is invalid.
+    """
+    text = path.read_text()
+    if path.suffix.lower() in [".yaml", ".yml"]:
+        try:
+            import yaml
+        except ImportError:
+            raise ClickException(
+                "PyYAML is required to read the YAML spec. "
+                "Install it with 'pip install anymotion-cli[yaml]', "
+                "or write the spec in JSON."
+            )
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ClickException(f"Invalid spec: {e}")
+    else:
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ClickException(f"Invalid spec: {e}")
+
+    try:
+        return _normalize_spec(data, path.parent)
+    except (ValueError, TypeError, click.BadParameter) as e:
+        message = e.format_message() if isinstance(e, click.BadParameter) else e
+        raise ClickException(f"Invalid spec: {message}")
+
+
+def _normalize_spec(data: Any, base_dir: Path) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise ValueError("It must be an object.")
+    keys = ["inputs", "extract", "analyze", "compare", "draw", "download"]
+    unknown_keys = set(data) - set(keys + ["concurrency"])
+    if unknown_keys:
+        raise ValueError(f"Unknown keys: {', '.join(sorted(unknown_keys))}")
+
+    inputs = data.get("inputs")
+    if not isinstance(inputs, list) or len(inputs) == 0:
+        raise ValueError("'inputs' must be a non-empty list.")
+    items = []
+    for value in inputs:
+        items.extend(_normalize_input(value, base_dir))
+
+    extract = data.get("extract") or {}
+    analyze = data.get("analyze") or []
+    if not isinstance(analyze, list):
+        raise ValueError("'analyze' must be a list of rules.")
+    rules = []
+    for i, value in enumerate(analyze):
+        rule = _get_rule(dict(value), "rule", base_dir)
+        if rule is None:
+            # checked here, not to fail after the inputs are processed
+            raise ValueError(f"'analyze[{i}]' requires 'rule' or 'rule_file'.")
+        rules.append(rule)
+    compare = data.get("compare")
+    if compare is not None:
+        target = _normalize_input(dict(compare).get("target"), base_dir)
+        if len(target) != 1:
+            raise ValueError("'compare.target' must be one input.")
+        compare = {"target": target[0]}
+    draw = data.get("draw")
+    if draw is not None:
+        draw = dict(draw)
+        draw = {
+            "rule": _get_rule(draw, "rule", base_dir),
+            "background_rule": _get_rule(draw, "background_rule", base_dir),
+        }
+    download = data.get("download")
+    if download is not None:
+        if draw is None:
+            raise ValueError("'download' requires 'draw'.")
+        download = {"out": base_dir / str(dict(download).get("out", "."))}
+
+    concurrency = dict(DEFAULT_CONCURRENCY)
+    for stage, value in dict(data.get("concurrency") or {}).items():
+        if stage not in concurrency:
+            raise ValueError(f"Unknown stage in 'concurrency': {stage}")
+        if not isinstance(value, int) or value < 1:
+            raise ValueError(f"'concurrency.{stage}' must be a positive integer.")
+        concurrency[stage] = value
+
+    return {
+        "inputs": items,
+        "extract": {"reuse": bool(dict(extract).get("reuse", False))},
+        "analyze": rules,
+        "compare": compare,
+        "draw": draw,
+        "download": download,
+        "concurrency": concurrency,
+    }
+
+
+def _normalize_input(value: Any, base_dir: Path) -> List[dict]:
+    if isinstance(value, str):
+        path = Path(value).expanduser()
+        if not path.is_absolute():
+            path = base_dir / path
+        return [{"path": p} for p in validate_paths(None, None, str(path))]
+
+    if isinstance(value, dict) and len(value) == 1:
+        key, media_id = list(value.items())[0]
+        if key in ["image_id", "movie_id", "keypoint_id"] and isinstance(media_id, int):
+            return [{key: media_id}]
+    raise ValueError(
+        f"Invalid input: {value!r}. It must be a path, image_id, movie_id or "
+        "keypoint_id."
+    )
+
+
+def _get_rule(data: dict, key: str, base_dir: Path) -> Optional[Any]:
+    """Get the rule of the key, or read it from the file of "<key>_file"."""
+    file_key = f"{key}_file"
+    if key in data and file_key in data:
+        raise ValueError(f"'{key}' and '{file_key}' cannot be used at the same time.")
+    if file_key in data:
+        try:
+            return parse_rule((base_dir / str(data[file_key])).read_text())
+        except OSError as e:
+            raise ValueError(str(e))
+        except ClickException as e:
+            raise ValueError(f"{data[file_key]}: {e.format_message()}")
+    return data.get(key)
+
+
+class _StageError(Exception):
+    """Raised when the processing of a stage fails."""
+
+
+class _Skipped(Exception):
+    """Raised when a stage is skipped because the stage it depends on failed."""
+
+
+class _Pipeline(object):
+    """Run the stages of each input as a DAG on the event loop.
+
+    The stages of all inputs are interleaved, so while some inputs are
+    uploaded, the others are extracted or drawn. Each stage has its own
+    semaphore, and only the stages after the failed one are skipped.
+    """
+
+    def __init__(self, aclient: AsyncClient, spec: Dict[str, Any]):
+        self.aclient = aclient
+        self.spec = spec
+        self.completed = 0
+        self.failed = 0
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._keypoints: Dict[str, "asyncio.Future[int]"] = {}
+
+    async def run(self) -> None:
+        """Run the pipeline for all inputs."""
+        self._semaphores = {
+            stage: asyncio.Semaphore(n) for stage, n in self.spec["concurrency"].items()
+        }
+        await asyncio.gather(*[self._run_input(x) for x in self.spec["inputs"]])
+
+    async def _run_input(self, item: dict) -> None:
+        label = _item_label(item)
+        try:
+            keypoint_id = await self._get_keypoint(item)
+        except _Skipped:
+            return
+
+        branches = [self._analyze(label, keypoint_id, x) for x in self.spec["analyze"]]
+        if self.spec["compare"] is not None:
+            branches.append(self._compare(label, keypoint_id))
+        if self.spec["draw"] is not None:
+            branches.append(self._draw(label, keypoint_id))
+        results = await asyncio.gather(*branches, return_exceptions=True)
+        # The failed stages are already reported and counted.
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, _Skipped):
+                raise result
+
+    def _get_keypoint(self, item: dict) -> "asyncio.Future[int]":
+        # An input is extracted only once even if it is also the target.
+        key = json.dumps(item, default=str, sort_keys=True)
+        if key not in self._keypoints:
+            self._keypoints[key] = asyncio.ensure_future(self._extract(item))
+        return self._keypoints[key]
+
+    async def _extract(self, item: dict) -> int:
+        if "keypoint_id" in item:
+            return int(item["keypoint_id"])
+
+        label = _item_label(item)
+        data = item
+        if "path" in item:
+            data = await self._run_stage("upload", label, lambda: self._upload(item))
+
+        async def extract() -> int:
+            aclient = self.aclient
+            if self.spec["extract"]["reuse"]:
+                found_id = await aclient.find_keypoint(
+                    image_id=data.get("image_id"),
+                    movie_id=data.get("movie_id"),
+                    prefetch=len(self.spec["inputs"]) > 1,
+                )
+                if found_id is not None:
+                    cid = color_id(found_id)
+                    echo_success(
+                        f"Reused the extracted keypoints. ({label}, keypoint id: {cid})"
+                    )
+                    return found_id
+
+            keypoint_id = await aclient.extract_keypoint(data=data)
+            _check(await aclient.wait_for_extraction(keypoint_id))
+            cid = color_id(keypoint_id)
+            echo_success(
+                f"Keypoint extraction is complete. ({label}, keypoint id: {cid})"
+            )
+            return keypoint_id
+
+        return await self._run_stage("extract", label, extract)
+
+    async def _upload(self, item: dict) -> dict:
+        path = item["path"]
+        result = await self.aclient.find_uploaded(path)
+        if result is None:
+            result = await self.aclient.upload(path, text=DEFAULT_TEXT)
+        data = result._asdict()
+        media_type = "image" if data["image_id"] else "movie"
+        cid = color_id(data[f"{media_type}_id"])
+        echo_success(f"Uploaded {color_path(path)}. ({media_type} id: {cid})")
+        return data
+
+    async def _analyze(self, label: str, keypoint_id: int, rule: Any) -> None:
+        async def analyze() -> None:
+            analysis_id = await self.aclient.analyze_keypoint(keypoint_id, rule)
+            _check(await self.aclient.wait_for_analysis(analysis_id))
+            cid = color_id(analysis_id)
+            echo_success(f"Analysis is complete. ({label}, analysis id: {cid})")
+
+        await self._run_stage("analyze", label, analyze)
+
+    async def _compare(self, label: str, keypoint_id: int) -> None:
+        target_id = await self._get_keypoint(self.spec["compare"]["target"])
+        if target_id == keypoint_id:
+            return
+
+        async def compare() -> None:
+            comparison_id = await self.aclient.compare_keypoint(keypoint_id, target_id)
+            _check(await self.aclient.wait_for_comparison(comparison_id))
+            cid = color_id(comparison_id)
+            echo_success(f"Comparison is complete. ({label}, comparison id: {cid})")
+
+        await self._run_stage("compare", label, compare)
+
+    async def _draw(self, label: str, keypoint_id: int) -> None:
+        async def draw() -> int:
+            drawing_id = await self.aclient.draw_keypoint(
+                keypoint_id=keypoint_id,
+                rule=self.spec["draw"]["rule"],
+                background_rule=self.spec["draw"]["background_rule"],
+            )
+            _check(await self.aclient.wait_for_drawing(drawing_id))
+            cid = color_id(drawing_id)
+            echo_success(f"Drawing is complete. ({label}, drawing id: {cid})")
+            return drawing_id
+
+        drawing_id = await self._run_stage("draw", label, draw)
+        if self.spec["download"] is None:
+            return
+
+        async def download() -> None:
+            client = self.aclient.client
+            path = await download_drawing(
+                self.aclient,
+                client.name_resolver,
+                {"id": drawing_id},
+                self.spec["download"]["out"],
+                segments=1,
+            )
+            echo_success(f"Downloaded the file to {color_path(path)}. ({label})")
+
+        await self._run_stage("download", label, download)
+
+    async def _run_stage(
+        self, stage: str, label: str, func: Callable[[], Awaitable[R]]
+    ) -> R:
+        async with self._semaphores[stage]:
+            try:
+                result = await func()
+            except asyncio.CancelledError:
+                # It is an Exception before Python 3.8.
+                raise
+            except Exception as e:
+                # e.g. RequestsError, FileTypeError, OSError of the file, or
+                # ValueError of the invalid response
+                message = e.format_message() if isinstance(e, ClickException) else e
+                echo_error(f"{STAGE_NAMES[stage]} failed. ({label})\n{message}")
+                self.failed += 1
+                raise _Skipped()
+            self.completed += 1
+            return result
+
+
+def _item_label(item: dict) -> str:
+    key = list(item)[0]
+    if key == "path":
+        return f"path: {color_path(item['path'])}"
+    return f"{key.replace('_', ' ')}: {color_id(item[key])}"
+
+
+def _check(result: JobResult) -> None:
+    if result.status == "TIMEOUT":
+        raise _StageError("It is timed out.")
+    elif result.status != "SUCCESS":
+        raise _StageError(str(result.failure_detail))
@@ -1,13 +1,16 @@
 import click
 from anymotion_sdk import FileTypeError, RequestsError
+from anymotion_sdk.client import UploadResult
 
 from ..click_custom import CustomCommand
 from ..exceptions import ClickException
-from ..options import common_options
-from ..output import echo_success
+from ..options import common_options, dedup_option
+from ..output import TransferProgress, echo_success
 from ..state import State, pass_state
 from ..utils import color_id, color_path, get_client
 
+DEFAULT_TEXT = "Created by AnyMotion CLI."
+
 
 @click.group()
 def cli() -> None:  # noqa: D103
@@ -22,30 +25,49 @@ def cli() -> None:  # noqa: D103
 @click.argument("path", type=click.Path(exists=True, dir_okay=False))
 @click.option(
     "--text",
-    default="Created by AnyMotion CLI.",
+    default=DEFAULT_TEXT,
     help="Description of the upload file.",
 )
+@dedup_option
 @common_options
 @pass_state
 def upload(state: State, path: str, text: str) -> None:
-    """Upload the local movie or image file to the cloud storage."""
+    """Upload the local movie or image file to the cloud storage.
+
+    If the same content has already been uploaded, the upload is skipped and the
+    uploaded image or movie is used.
+    """
     client = get_client(state)
 
     try:
-        result = client.upload(path, text=text)
+        result = client.find_uploaded(path)
+        if result is not None:
+            message = (
+                f"Skipped the upload of {color_path(path)} "
+                "because the same content has already been uploaded."
+            )
+            _echo_result(result, message)
+            return result
+
+        if state.use_spinner:
+            with TransferProgress("Uploading...") as progress:
+                result = client.upload(path, text=text, progress=progress)
+        else:
+            result = client.upload(path, text=text)
     except FileTypeError as e:
         raise click.BadParameter(str(e))
     except RequestsError as e:
         raise ClickException(str(e))
 
-    cpath = color_path(path)
+    _echo_result(result, f"Uploaded {color_path(path)} to the cloud storage.")
+    return result
 
+
+def _echo_result(result: UploadResult, message: str) -> None:
     if result.image_id:
         cid = color_id(result.image_id)
         media_type = "image"
     else:
         cid = color_id(result.movie_id)
         media_type = "movie"
-    echo_success(f"Uploaded {cpath} to the cloud storage. ({media_type} id: {cid})")
-
-    return result
+    echo_success(f"{message} ({media_type} id: {cid})")
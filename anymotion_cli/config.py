@@ -12,6 +12,8 @@ def get_app_dir() -> Path:
 # default values
 API_URL = "https://api.customer.jp/anymotion/v1/"
 POLLING_INTERVAL = 5
+POLLING_MODE = "fixed"
 TIMEOUT = 600
 IS_DOWNLOAD = True
 IS_OPEN = False
+CACHE_SIZE = 100 * 1024 * 1024
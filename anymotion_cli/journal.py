@@ -0,0 +1,190 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+# Statuses after which a job never changes.
+FINISHED_STATUSES = ["SUCCESS", "FAILURE"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    scope TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    inputs TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (scope, endpoint, id)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope TEXT NOT NULL,
+    command TEXT NOT NULL,
+    items TEXT NOT NULL,
+    finished INTEGER NOT NULL DEFAULT 0,
+    started_at REAL NOT NULL,
+    options TEXT NOT NULL DEFAULT '{}'
+);
+"""
+
+
+class JobJournal(object):
+    """Local record of the started processing, such as extraction and drawing.
+
+    Every started job is recorded to an SQLite database with its inputs, and
+    its status is updated when it finishes. So after the CLI is killed, the
+    jobs still in progress on the server can be waited for again instead of
+    being started again. A batch run is also recorded with its items, so that
+    it can be resumed.
+
+    The records are separated by the API URL and client ID (scope).
+
+    Examples:
+        >>> journal = JobJournal(get_app_dir() / "jobs.sqlite3", scope)
+        >>> journal.add("keypoints", 1, {"image_id": 2})
+        >>> journal.update("keypoints", 1, "SUCCESS")
+        >>> journal.jobs()
+        [{'endpoint': 'keypoints', 'id': 1, 'inputs': {'image_id': 2}, ...}]
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, file: Path, scope: str):
+        self._file = file
+        self._scope = scope
+        self._initialized = False
+
+    def add(
+        self, endpoint: str, job_id: int, inputs: dict, status: str = "PROCESSING"
+    ) -> None:
+        """Record the started job."""
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self._scope, endpoint, job_id, _dumps(inputs), status, now, now),
+        )
+
+    def update(self, endpoint: str, job_id: int, status: str) -> None:
+        """Update the status of the job."""
+        self._execute(
+            "UPDATE jobs SET status = ?, updated_at = ? "
+            "WHERE scope = ? AND endpoint = ? AND id = ?",
+            (status, time.time(), self._scope, endpoint, job_id),
+        )
+
+    def jobs(
+        self, in_progress: bool = False, limit: Optional[int] = None
+    ) -> List[dict]:
+        """Return the recorded jobs from the newest.
+
+        Args:
+            in_progress: If True, only the jobs not finished are returned.
+            limit: The maximum number of jobs.
+        """
+        query = "SELECT * FROM jobs WHERE scope = ?"
+        if in_progress:
+            statuses = ", ".join(f"'{x}'" for x in FINISHED_STATUSES)
+            query += f" AND status NOT IN ({statuses})"  # nosec
+        query += " ORDER BY started_at DESC, id DESC LIMIT ?"
+        rows, _ = self._execute(query, (self._scope, limit or -1))
+        return [_to_job(row) for row in rows]
+
+    def find_job(self, endpoint: str, inputs: dict, since: float) -> Optional[dict]:
+        """Return the latest job started with the inputs since the time.
+
+        The failed jobs are not returned, so that they are started again.
+        """
+        rows, _ = self._execute(
+            "SELECT * FROM jobs "
+            "WHERE scope = ? AND endpoint = ? AND inputs = ? AND started_at >= ? "
+            "AND status != 'FAILURE' ORDER BY started_at DESC LIMIT 1",
+            (self._scope, endpoint, _dumps(inputs), since),
+        )
+        return _to_job(rows[0]) if rows else None
+
+    def start_run(
+        self, command: str, items: List[dict], options: Optional[dict] = None
+    ) -> Optional[int]:
+        """Record the batch run of the command and return its ID.
+
+        The options, such as whether the results are reused, are recorded so
+        that the run is resumed with them.
+        """
+        _, run_id = self._execute(
+            "INSERT INTO runs (scope, command, items, started_at, options) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (self._scope, command, _dumps(items), time.time(), _dumps(options or {})),
+        )
+        return run_id
+
+    def finish_run(self, run_id: int) -> None:
+        """Record that the batch run has finished."""
+        self._execute("UPDATE runs SET finished = 1 WHERE id = ?", (run_id,))
+
+    def get_run(self, run_id: Optional[int] = None) -> Optional[dict]:
+        """Return the batch run, or the latest unfinished one if run_id is None."""
+        query = "SELECT * FROM runs WHERE scope = ?"
+        params: list = [self._scope]
+        if run_id is None:
+            query += " AND finished = 0"
+        else:
+            query += " AND id = ?"
+            params.append(run_id)
+        rows, _ = self._execute(query + " ORDER BY id DESC LIMIT 1", params)
+        if not rows:
+            return None
+        run = dict(rows[0])
+        run["items"] = json.loads(run["items"])
+        run["options"] = json.loads(run["options"])
+        run["finished"] = bool(run["finished"])
+        return run
+
+    def _execute(
+        self, query: str, params: Sequence
+    ) -> Tuple[List[sqlite3.Row], Optional[int]]:
+        """Execute the query and return the rows and the last row ID.
+
+        A connection is made for each query, because the journal is used from
+        several threads and processes. Since the journal is only a record, the
+        error is ignored so that the processing is not affected.
+        """
+        with self._lock:
+            try:
+                self._file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+                db = sqlite3.connect(str(self._file), timeout=10)
+            except (OSError, sqlite3.Error):
+                return [], None
+            try:
+                db.row_factory = sqlite3.Row
+                if not self._initialized:
+                    db.executescript(_SCHEMA)
+                    _migrate(db)
+                    self._initialized = True
+                with db:
+                    cursor = db.execute(query, params)
+                    return cursor.fetchall(), cursor.lastrowid
+            except sqlite3.Error:
+                return [], None
+            finally:
+                db.close()
+
+
+def _migrate(db: sqlite3.Connection) -> None:
+    """Add the columns missing in the journal made by an older version."""
+    columns = [row["name"] for row in db.execute("PRAGMA table_info(runs)")]
+    if "options" not in columns:
+        db.execute("ALTER TABLE runs ADD COLUMN options TEXT NOT NULL DEFAULT '{}'")
+
+
+def _dumps(data: object) -> str:
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _to_job(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    del job["scope"]
+    job["inputs"] = json.loads(job["inputs"])
+    return job
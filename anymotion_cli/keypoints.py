@@ -0,0 +1,281 @@
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .client import CliClient
+
+# Joints of the keypoints extracted by AnyMotion, in the order of the arrays.
+# The other joints found in the data are added after them.
+JOINT_NAMES = [
+    "nose",
+    "leftEye",
+    "rightEye",
+    "leftEar",
+    "rightEar",
+    "leftShoulder",
+    "rightShoulder",
+    "leftElbow",
+    "rightElbow",
+    "leftWrist",
+    "rightWrist",
+    "leftHip",
+    "rightHip",
+    "leftKnee",
+    "rightKnee",
+    "leftAnkle",
+    "rightAnkle",
+]
+
+EXPORT_FORMATS = ["npz", "parquet", "arrow"]
+
+
+class KeypointArray(object):
+    """Keypoints of all the frames as dense arrays.
+
+    Attributes:
+        points: The (frames, joints, 2) float32 array of x and y. It is NaN where
+            the joint is not detected.
+        mask: The (frames, joints) bool array, which is True where the joint is
+            detected. If it is not given, it is computed from points when used.
+        joint_names: The names of the joints in the order of the second axis.
+        meta: The data about the keypoints, such as keypoint_id and image_id.
+
+    Examples:
+        >>> array = KeypointArray.from_frames([{"nose": [1, 2]}, {}])
+        >>> array.points.shape
+        (2, 17, 2)
+        >>> array.save(Path("keypoint.npz"), "npz")
+    """
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        mask: Optional[np.ndarray],
+        joint_names: List[str],
+        meta: Optional[dict] = None,
+    ):
+        self.points = points
+        self.joint_names = joint_names
+        self.meta = meta or {}
+        self._mask = mask
+
+    @property
+    def mask(self) -> np.ndarray:
+        """The (frames, joints) bool array of the detected joints."""
+        if self._mask is None:
+            self._mask = ~np.isnan(self.points[..., 0])
+        return self._mask
+
+    @classmethod
+    def from_frames(
+        cls, frames: Iterable[Optional[dict]], meta: Optional[dict] = None
+    ) -> "KeypointArray":
+        """Convert the keypoint data of the API, a list of {joint: [x, y]}.
+
+        The detected points are collected into flat lists and assigned to the
+        arrays at once, so no data is built for each frame.
+        """
+        joint_names = list(JOINT_NAMES)
+        index = {name: i for i, name in enumerate(joint_names)}
+        rows: List[int] = []
+        cols: List[int] = []
+        coords: List[list] = []
+
+        n_frames = 0
+        for i, frame in enumerate(frames):
+            n_frames = i + 1
+            if not frame:
+                continue
+            for name, point in frame.items():
+                if not point or point[0] is None or point[1] is None:
+                    continue
+                j = index.get(name)
+                if j is None:
+                    j = index[name] = len(joint_names)
+                    joint_names.append(name)
+                rows.append(i)
+                cols.append(j)
+                coords.append(point[:2])
+
+        points = np.full((n_frames, len(joint_names), 2), np.nan, dtype=np.float32)
+        mask = np.zeros((n_frames, len(joint_names)), dtype=bool)
+        if rows:
+            points[rows, cols] = coords
+            mask[rows, cols] = True
+        return cls(points, mask, joint_names, meta=meta)
+
+    def save(self, path: Path, export_format: str) -> None:
+        """Save the arrays to the file.
+
+        npz has the arrays "points", "mask" and "joints", and the JSON of meta
+        as "meta". parquet and arrow have a row for each frame with the columns
+        "<joint>_x" and "<joint>_y", which are null where the joint is not
+        detected, and meta in the schema metadata. They require pyarrow.
+
+        Raises:
+            ImportError: pyarrow is not installed.
+            ValueError: The format is unknown.
+        """
+        if export_format == "npz":
+            with path.open("wb") as f:
+                self._save_npz(f)
+        elif export_format in ["parquet", "arrow"]:
+            self._save_table(path, export_format)
+        else:
+            raise ValueError(f"Unknown format: {export_format}")
+
+    def _save_npz(self, f: BinaryIO) -> None:
+        np.savez_compressed(
+            f,
+            points=self.points,
+            mask=self.mask,
+            joints=np.array(self.joint_names),
+            meta=np.array(json.dumps(self.meta)),
+        )
+
+    def _save_table(self, path: Path, export_format: str) -> None:
+        import pyarrow as pa
+
+        columns = {}
+        for j, name in enumerate(self.joint_names):
+            missing = ~self.mask[:, j]
+            columns[f"{name}_x"] = pa.array(self.points[:, j, 0], mask=missing)
+            columns[f"{name}_y"] = pa.array(self.points[:, j, 1], mask=missing)
+        table = pa.table(columns).replace_schema_metadata(
+            {"anymotion": json.dumps(dict(self.meta, joints=self.joint_names))}
+        )
+
+        if export_format == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(table, str(path))
+        else:
+            import pyarrow.feather as feather
+
+            feather.write_feather(table, str(path))
+
+
+class KeypointStore(object):
+    """Local store of the successful keypoints.
+
+    Each keypoint is saved once as "<keypoint id>.npy" of the points, which is
+    NaN where the joint is not detected, with the sidecar "<keypoint id>.json"
+    of keypoint_id, image_id, movie_id, fps and joints. The points are opened
+    memory-mapped, so many keypoints can be used with little memory and time,
+    also from notebooks:
+
+        points = np.load(directory / "111.npy", mmap_mode="r")
+
+    The keypoints of each API URL and client ID (scope) are saved in its own
+    subdirectory named by the hash of the scope, so switching the account keeps
+    the keypoints of the others.
+
+    Examples:
+        >>> store = KeypointStore(get_app_dir() / "keypoints" / "default", scope)
+        >>> store.directory
+        PosixPath('/home/user/.anymotion/keypoints/default/0123456789abcdef')
+        >>> store.add(KeypointArray.from_frames(frames, meta={"keypoint_id": 1}))
+        >>> store.load(1).points.shape
+        (300, 17, 2)
+    """
+
+    def __init__(self, directory: Path, scope: str):
+        scope_hash = hashlib.sha256(scope.encode()).hexdigest()[:16]
+        self.directory = directory / scope_hash
+
+    def ids(self) -> List[int]:
+        """Return the IDs of the stored keypoints."""
+        return sorted(
+            int(path.stem)
+            for path in self.directory.glob("*.json")
+            if path.stem.isdigit()
+        )
+
+    def __contains__(self, keypoint_id: object) -> bool:
+        return (self.directory / f"{keypoint_id}.json").exists()
+
+    def add(self, array: KeypointArray) -> None:
+        """Save the keypoints, whose meta has keypoint_id.
+
+        The sidecar is written after the points, so a keypoint is stored only
+        when both are written.
+        """
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        keypoint_id = int(array.meta["keypoint_id"])
+        sidecar = {
+            "keypoint_id": keypoint_id,
+            "image_id": array.meta.get("image_id"),
+            "movie_id": array.meta.get("movie_id"),
+            "fps": array.meta.get("fps"),
+            "joints": array.joint_names,
+        }
+        with _atomic_write(self.directory / f"{keypoint_id}.npy") as f:
+            np.save(f, array.points)
+        with _atomic_write(self.directory / f"{keypoint_id}.json") as f:
+            f.write(json.dumps(sidecar).encode())
+
+    def load(self, keypoint_id: int, mmap: bool = True) -> Optional[KeypointArray]:
+        """Return the stored keypoints, or None if they are not stored.
+
+        If mmap is True, the points are a read-only memory-mapped array.
+        """
+        try:
+            sidecar = json.loads((self.directory / f"{keypoint_id}.json").read_text())
+            points = np.load(
+                str(self.directory / f"{keypoint_id}.npy"),
+                mmap_mode="r" if mmap else None,
+            )
+        except (OSError, ValueError):
+            return None
+        joint_names = sidecar.pop("joints")
+        return KeypointArray(points, None, joint_names, meta=sidecar)
+
+
+def get_keypoint_array(
+    client: "CliClient", store: KeypointStore, keypoint_id: int
+) -> KeypointArray:
+    """Return the keypoints from the store, or get them and save them to it.
+
+    Raises:
+        RequestsError: HTTP request fails.
+        ValueError: The status of the keypoints is not SUCCESS.
+    """
+    array = store.load(keypoint_id)
+    if array is not None:
+        return array
+
+    # The store keeps the keypoints, so they are not also put in the response cache.
+    data = client.get_one_data("keypoints", keypoint_id, use_cache=False)
+    if data.get("execStatus") != "SUCCESS":
+        raise ValueError(f"Status of keypoint {keypoint_id} is not SUCCESS.")
+    meta = {
+        "keypoint_id": keypoint_id,
+        "image_id": data.get("image"),
+        "movie_id": data.get("movie"),
+    }
+    array = KeypointArray.from_frames(data.get("keypoint") or [], meta=meta)
+    try:
+        store.add(array)
+    except OSError:
+        pass
+    return array
+
+
+@contextmanager
+def _atomic_write(path: Path) -> Iterator[BinaryIO]:
+    """Open a temporary file, which replaces the path if writing succeeds."""
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink()
+        raise
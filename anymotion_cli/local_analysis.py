@@ -0,0 +1,108 @@
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .keypoints import KeypointArray
+
+# Unit vectors of the vertical directions in image coordinates, where y is down.
+_UP = np.array([0.0, -1.0])
+_DOWN = np.array([0.0, 1.0])
+
+
+def analyze(array: KeypointArray, rule: Union[list, dict]) -> List[dict]:
+    """Analyze the keypoints locally with the rules of the analyze command.
+
+    Each rule is computed for all frames at once. The result has the same
+    shape as that of the API: a list of analysisType, description and values,
+    which has a value for each frame, or None where a joint is not detected.
+    The supported analysis types are:
+
+        - angle (or vectorAngle): The angle at the second of three points.
+        - topVertexAngle: The angle between the line of two points and the
+          upward vertical.
+        - bottomVertexAngle: The angle between the line of two points and the
+          downward vertical.
+        - distance: The distance between two points.
+
+    Angles are in degrees and values are rounded to integers.
+
+    Raises:
+        ValueError: The rule is invalid or not supported.
+    """
+    rules = rule if isinstance(rule, list) else [rule]
+    index = {name: i for i, name in enumerate(array.joint_names)}
+
+    result = []
+    for item in rules:
+        if not isinstance(item, dict):
+            raise ValueError(f"Rule must be an object: {item}")
+        analysis_type = item.get("analysisType")
+        if analysis_type not in _ANALYSES:
+            raise ValueError(f"Unsupported analysis type: {analysis_type}")
+        n_points, func, noun = _ANALYSES[analysis_type]
+
+        names = item.get("points")
+        if not isinstance(names, list) or len(names) != n_points:
+            raise ValueError(f"{analysis_type} requires {n_points} points: {item}")
+        unknown = [name for name in names if name not in index]
+        if unknown:
+            raise ValueError(f"Unknown points: {', '.join(map(str, unknown))}")
+
+        points = array.points[:, [index[name] for name in names]].astype(np.float64)
+        values = func(points)
+        result.append(
+            {
+                "analysisType": analysis_type,
+                "description": item.get("description") or _describe(names, noun),
+                "values": _to_list(values),
+            }
+        )
+    return result
+
+
+def _angle(points: np.ndarray) -> np.ndarray:
+    return _angle_between(points[:, 0] - points[:, 1], points[:, 2] - points[:, 1])
+
+
+def _top_vertex_angle(points: np.ndarray) -> np.ndarray:
+    return _angle_between(points[:, 1] - points[:, 0], _UP)
+
+
+def _bottom_vertex_angle(points: np.ndarray) -> np.ndarray:
+    return _angle_between(points[:, 1] - points[:, 0], _DOWN)
+
+
+def _distance(points: np.ndarray) -> np.ndarray:
+    return np.linalg.norm(points[:, 1] - points[:, 0], axis=-1)
+
+
+def _angle_between(v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+    """Return the angles in degrees between the vectors, NaN for zero vectors."""
+    norm = np.linalg.norm(v1, axis=-1) * np.linalg.norm(v2, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos = np.sum(v1 * v2, axis=-1) / norm
+    cos[norm == 0] = np.nan
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+
+def _describe(names: List[str], noun: str) -> str:
+    return f"{', '.join(names[:-1])} and {names[-1]} {noun}"
+
+
+def _to_list(values: np.ndarray) -> List[Optional[int]]:
+    rounded = np.rint(values)
+    valid = ~np.isnan(rounded)
+    return [
+        int(value) if is_valid else None
+        for value, is_valid in zip(rounded.tolist(), valid.tolist())
+    ]
+
+
+# analysisType: (number of points, function, noun of description)
+_ANALYSES: Dict[str, Tuple[int, Callable[[np.ndarray], np.ndarray], str]] = {
+    "angle": (3, _angle, "angles"),
+    "vectorAngle": (3, _angle, "angles"),
+    "topVertexAngle": (2, _top_vertex_angle, "angles"),
+    "bottomVertexAngle": (2, _bottom_vertex_angle, "angles"),
+    "distance": (2, _distance, "distances"),
+}
@@ -0,0 +1,175 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from .keypoints import KeypointArray
+
+# Width of the band of the alignment, as the ratio of the longer sequence.
+DEFAULT_WINDOW = 0.1
+
+# Cost of the frames without a joint detected in both of them.
+_MISSING_COST = 1.0
+
+_Row = Tuple[int, np.ndarray, np.ndarray]
+
+
+def compare(
+    source: KeypointArray, target: KeypointArray, window: float = DEFAULT_WINDOW
+) -> List[dict]:
+    """Compare the keypoints locally and return the difference of each frame.
+
+    Each frame is normalized by its center and size, so the position and the
+    size of the person do not matter. The frames of the target are aligned to
+    those of the source by dynamic time warping (DTW) limited to a band around
+    the diagonal, so sequences of different lengths or speeds are compared.
+
+    The result has the same shape as that of the API: a list with a value for
+    each frame of the source, which has {"distance", "direction"} for each
+    joint detected in both the source frame and the aligned target frame.
+    distance is the distance from the source joint to the target joint in the
+    normalized coordinates, and direction is its angle in degrees, clockwise
+    from the x axis in image coordinates.
+    """
+    joint_names = [name for name in source.joint_names if name in target.joint_names]
+    source_points = _normalize(
+        source.points[:, [source.joint_names.index(x) for x in joint_names]]
+    )
+    target_points = _normalize(
+        target.points[:, [target.joint_names.index(x) for x in joint_names]]
+    )
+    if len(source_points) == 0:
+        return []
+    if len(target_points) == 0:
+        return [{} for _ in range(len(source_points))]
+
+    matches = align(source_points, target_points, window=window)
+    vectors = target_points[matches] - source_points
+    distances = np.linalg.norm(vectors, axis=-1)
+    directions = np.degrees(np.arctan2(vectors[..., 1], vectors[..., 0]))
+    return _to_difference(distances, directions, joint_names)
+
+
+def align(
+    source: np.ndarray, target: np.ndarray, window: float = DEFAULT_WINDOW
+) -> np.ndarray:
+    """Return the index of the aligned target frame for each source frame.
+
+    The points are (frames, joints, 2) arrays. Only the cells within the band
+    of the width window * max(len(source), len(target)) around the diagonal
+    are computed, so the time and memory are linear in the lengths. Each row
+    of the cumulative cost is computed at once with a running minimum instead
+    of a loop over the target frames.
+    """
+    # float32 is precise enough for the costs, and halves the memory traffic
+    source = source.astype(np.float32)
+    target = target.astype(np.float32)
+    n, m = len(source), len(target)
+    step = (m - 1) / max(n - 1, 1)
+    width = max(1, int(np.ceil(window * max(n, m))), int(np.ceil(step)))
+    centers = np.rint(np.arange(n) * step).astype(int)
+    lows = np.clip(centers - width, 0, m - 1)
+    highs = np.clip(centers + width, 0, m - 1)
+
+    rows: List[_Row] = []
+    for i in range(n):
+        low, high = int(lows[i]), int(highs[i]) + 1
+        js = np.arange(low, high)
+        costs = _frame_costs(source[i], target[low:high])
+        prefix = np.cumsum(costs)
+        if i == 0:
+            cumulative = prefix
+        else:
+            previous = rows[-1]
+            reached = np.minimum(_lookup(previous, js), _lookup(previous, js - 1))
+            # cumulative[j] = min(costs[j] + reached[j], cumulative[j - 1] + costs[j])
+            cumulative = prefix + np.minimum.accumulate(costs + reached - prefix)
+        rows.append((low, cumulative, costs))
+
+    return _backtrack(rows, m)
+
+
+def _normalize(points: np.ndarray) -> np.ndarray:
+    """Move the center of each frame to the origin and scale it to unit size."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        points = points.astype(np.float64)
+        valid = ~np.isnan(points[..., 0])
+        count = valid.sum(axis=1)[:, None]
+        center = np.where(valid[..., None], points, 0).sum(axis=1) / count
+        centered = points - center[:, None]
+        squared = np.where(valid, np.sum(centered**2, axis=-1), 0).sum(axis=1)
+        scale = np.sqrt(squared / count[:, 0])
+        scale[scale == 0] = np.nan
+        return centered / scale[:, None, None]
+
+
+def _frame_costs(frame: np.ndarray, frames: np.ndarray) -> np.ndarray:
+    """Return the mean distance of the joints between the frame and each frame."""
+    squared = frames - frame
+    squared *= squared
+    distances = np.sqrt(squared[..., 0] + squared[..., 1])
+    count = np.count_nonzero(~np.isnan(distances), axis=1)
+    total = np.nansum(distances, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, _MISSING_COST)
+
+
+def _lookup(row: _Row, js: np.ndarray) -> np.ndarray:
+    """Return the cumulative costs of the row at js, inf outside of the band."""
+    low, cumulative, _ = row
+    positions = js - low
+    inside = (positions >= 0) & (positions < len(cumulative))
+    values = np.full(len(js), np.inf)
+    values[inside] = cumulative[positions[inside]]
+    return values
+
+
+def _backtrack(rows: List[_Row], m: int) -> np.ndarray:
+    """Return the target frame of the lowest cost on the path for each row."""
+    n = len(rows)
+    matches = np.zeros(n, dtype=int)
+    best = np.full(n, np.inf)
+
+    def get(i: int, j: int) -> float:
+        if i < 0:
+            return np.inf
+        low, cumulative, _ = rows[i]
+        if j < low or j - low >= len(cumulative):
+            return np.inf
+        return float(cumulative[j - low])
+
+    i, j = n - 1, m - 1
+    while True:
+        low, _, costs = rows[i]
+        if costs[j - low] < best[i]:
+            best[i] = costs[j - low]
+            matches[i] = j
+        if i == 0 and j == 0:
+            break
+        # prefer the diagonal move on ties
+        candidates = [(get(i - 1, j - 1), i - 1, j - 1)]
+        candidates.append((get(i - 1, j), i - 1, j))
+        candidates.append((get(i, j - 1), i, j - 1))
+        _, i, j = min(candidates, key=lambda x: x[0])
+    return matches
+
+
+def _to_difference(
+    distances: np.ndarray, directions: np.ndarray, joint_names: List[str]
+) -> List[dict]:
+    valid = ~np.isnan(distances)
+    result = []
+    for frame_distances, frame_directions, frame_valid in zip(
+        np.round(distances, 4).tolist(),
+        np.round(directions, 1).tolist(),
+        valid.tolist(),
+    ):
+        result.append(
+            {
+                name: {"distance": distance, "direction": direction}
+                for name, distance, direction, is_valid in zip(
+                    joint_names, frame_distances, frame_directions, frame_valid
+                )
+                if is_valid
+            }
+        )
+    return result
@@ -0,0 +1,106 @@
+import copy
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Set
+
+if TYPE_CHECKING:
+    from .client import CliClient
+
+
+class NameResolver(object):
+    """Resolve the names of the files of drawings.
+
+    The name of a drawing is the name of the image or movie from which the
+    keypoints are extracted, or "<target name>_<source name>" for a comparison.
+    The data got is kept in memory, so a name is resolved with no request once
+    the data is got.
+
+    If prefetch is True, the data of each endpoint is got at once through the
+    list endpoint, so resolving the names of many drawings does not send a
+    request for each of them. Otherwise, or if the data is created after that,
+    it is got one by one.
+
+    Examples:
+        >>> resolver = NameResolver(client)
+        >>> resolver.drawing_name({"id": 333, "keypoint": 222})
+        'image'
+    """
+
+    def __init__(self, client: "CliClient", prefetch: bool = True):
+        self.prefetch = prefetch
+        self._client = client
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, Dict[int, dict]] = {}
+        self._listed: Set[str] = set()
+
+    def bind(self, client: "CliClient") -> "NameResolver":
+        """Return a resolver that shares the data kept but requests with client.
+
+        It is used for a copy of the client, whose requests are sent with its own
+        callbacks and response cache.
+        """
+        resolver = copy.copy(self)
+        resolver._client = client
+        return resolver
+
+    def drawing_name(self, drawing: dict) -> str:
+        """Return the name of the drawing data, or "" if it is unknown.
+
+        Raises:
+            RequestsError: HTTP request fails.
+        """
+        if drawing.get("keypoint"):
+            return self.keypoint_name(drawing["keypoint"])
+        elif drawing.get("comparison"):
+            return self.comparison_name(drawing["comparison"])
+        else:
+            return ""
+
+    def keypoint_name(self, keypoint_id: Optional[int]) -> str:
+        """Return the name of the image or movie of the keypoint.
+
+        Raises:
+            RequestsError: HTTP request fails.
+        """
+        keypoint = self._get("keypoints", keypoint_id)
+        if keypoint is None:
+            return ""
+
+        if keypoint.get("image"):
+            media = self._get("images", keypoint["image"])
+        elif keypoint.get("movie"):
+            media = self._get("movies", keypoint["movie"])
+        else:
+            return ""
+        return str((media or {}).get("name") or "")
+
+    def comparison_name(self, comparison_id: Optional[int]) -> str:
+        """Return "<target name>_<source name>" of the comparison.
+
+        Raises:
+            RequestsError: HTTP request fails.
+        """
+        comparison = self._get("comparisons", comparison_id)
+        if comparison is None:
+            return ""
+
+        target_name = self.keypoint_name(comparison.get("target"))
+        source_name = self.keypoint_name(comparison.get("source"))
+        if target_name and source_name:
+            return f"{target_name}_{source_name}"
+        else:
+            return ""
+
+    def _get(self, endpoint: str, endpoint_id: Optional[int]) -> Optional[dict]:
+        if endpoint_id is None:
+            return None
+
+        with self._lock:
+            index = self._indexes.setdefault(endpoint, {})
+            if endpoint_id not in index and self.prefetch:
+                if endpoint not in self._listed:
+                    for data in self._client.get_list_data(endpoint):
+                        index[data["id"]] = data
+                    self._listed.add(endpoint)
+            if endpoint_id not in index:
+                index[endpoint_id] = self._client.get_one_data(endpoint, endpoint_id)
+            return index[endpoint_id]
@@ -94,6 +94,69 @@ def profile_option(f: Callable) -> Callable:
     )(f)
 
 
+def cache_options(f: Callable) -> Callable:
+    """Set --no-cache and --refresh options."""
+
+    def no_cache_callback(ctx: click.Context, param: Any, value: bool) -> bool:
+        state = ctx.ensure_object(State)
+        state.use_cache = not value
+        return value
+
+    def refresh_callback(ctx: click.Context, param: Any, value: bool) -> bool:
+        state = ctx.ensure_object(State)
+        state.refresh_cache = value
+        return value
+
+    f = click.option(
+        "--refresh",
+        is_flag=True,
+        expose_value=False,
+        help="Get the data from the API and update the local cache.",
+        callback=refresh_callback,
+    )(f)
+    f = click.option(
+        "--no-cache",
+        is_flag=True,
+        expose_value=False,
+        help="Do not use the local cache.",
+        callback=no_cache_callback,
+    )(f)
+    return f
+
+
+def dedup_option(f: Callable) -> Callable:
+    """Set --dedup/--no-dedup option of the commands that upload files."""
+
+    def callback(ctx: click.Context, param: Any, value: bool) -> bool:
+        state = ctx.ensure_object(State)
+        state.use_dedup = value
+        return value
+
+    return click.option(
+        "--dedup/--no-dedup",
+        default=True,
+        show_default=True,
+        expose_value=False,
+        help="Skip the upload of a file whose content has already been uploaded.",
+        callback=callback,
+    )(f)
+
+
+def format_option(f: Callable) -> Callable:
+    """Set --format option of list commands."""
+    return click.option(
+        "--format",
+        "output_format",
+        type=click.Choice(["json", "ndjson"], case_sensitive=False),
+        default="json",
+        show_default=True,
+        help=(
+            "Output format. "
+            "ndjson outputs one record per line as soon as each page is received."
+        ),
+    )(f)
+
+
 def common_options(f: Callable) -> Callable:
     """Set common options."""
     f = verbose_option(f)
@@ -1,12 +1,16 @@
 import json
 import sys
-from typing import Optional, Union
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Union
 
 import click
-import requests
-from pygments import highlight
-from pygments.formatters import TerminalFormatter
-from pygments.lexers import JsonLexer
+
+if TYPE_CHECKING:
+    import requests
+
+# Approximate number of characters of json data output at once.
+JSON_BLOCK_SIZE = 64 * 1024
 
 
 def echo(message: Optional[str] = None) -> None:
@@ -26,26 +30,64 @@ def echo_warning(message: str) -> None:
     click.echo(f"{click.style('Warning', fg='yellow')}: {message}", err=True)
 
 
+def echo_error(message: str) -> None:
+    """Output error message."""
+    click.echo(f"{click.style('Error', fg='red')}: {message}", err=True)
+
+
+def confirm(message: str, default: bool = False) -> bool:
+    """Prompt for confirmation.
+
+    In a background job of interactive mode, the default is returned without
+    prompting, not to read the input of the prompt of interactive mode.
+    """
+    if is_background():
+        return default
+    return click.confirm(message, default=default)
+
+
 def echo_json(
     data: object,
     sort_keys: bool = False,
     ensure_ascii: bool = False,
     pager: bool = False,
 ) -> None:
-    """Output json data."""
+    """Output json data.
+
+    The data is encoded and colorized block by block, so the memory used does not
+    grow with the size of the data, such as keypoints of a long movie.
+    It is colorized only for terminals.
+    """
     if is_show():
         click.echo()
 
-    body = json.dumps(data, sort_keys=sort_keys, ensure_ascii=ensure_ascii, indent=2)
-    body = highlight(body, JsonLexer(), TerminalFormatter())
+    blocks = _iter_json(data, sort_keys=sort_keys, ensure_ascii=ensure_ascii)
+    if sys.stdout.isatty():
+        blocks = _highlight(blocks)
 
     if pager:
-        click.echo_via_pager(body)
+        click.echo_via_pager(blocks)
     else:
-        click.echo(body)
+        for block in blocks:
+            click.echo(block, nl=False)
+        click.echo()
+
+
+def echo_ndjson(pages: Iterable[List[dict]]) -> None:
+    """Output json data as one compact record per line.
+
+    Each page of records is output as soon as it is received.
+    """
+    for page in pages:
+        if page:
+            lines = [
+                json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+                for record in page
+            ]
+            click.echo("\n".join(lines))
 
 
-def echo_request(request: requests.Request) -> None:
+def echo_request(request: "requests.Request") -> None:
     """Output http request.
 
     Examples:
@@ -71,7 +113,7 @@ def echo_request(request: requests.Request) -> None:
     click.echo()
 
 
-def echo_response(response: requests.Response) -> None:
+def echo_response(response: "requests.Response") -> None:
     """Output http response.
 
     Examples:
@@ -105,6 +147,78 @@ def echo_response(response: requests.Response) -> None:
     click.echo()
 
 
+class TransferProgress(object):
+    """Show the progress of a transfer with its speed in place of a spinner.
+
+    An instance is called with the transferred size(bytes) and the total size
+    (bytes or None if unknown).
+
+    Examples:
+        >>> with TransferProgress("Downloading...") as progress:
+        ...     client.download(drawing_id, path, progress=progress)
+        Downloading... 12.0 MiB / 100.0 MiB (4.0 MiB/s)
+    """
+
+    def __init__(self, text: str, interval: float = 0.2):
+        self.text = text
+        self.interval = interval
+        self._started_at = 0.0
+        self._shown_at = 0.0
+        self._start_size: Optional[int] = None
+        self._width = 0
+
+    def __enter__(self) -> "TransferProgress":
+        self._started_at = time.monotonic()
+        self._show(self.text)
+        return self
+
+    def __exit__(self, *args) -> None:
+        click.echo("\r" + " " * self._width + "\r", nl=False)
+
+    def __call__(self, size: int, total: Optional[int]) -> None:
+        """Show the transferred size, at most once per interval."""
+        now = time.monotonic()
+        if self._start_size is None:
+            # The size resumed from is not counted in the speed.
+            self._start_size = size
+        if now - self._shown_at < self.interval and size != total:
+            return
+
+        message = f"{self.text} {format_size(size)}"
+        if total is not None:
+            message += f" / {format_size(total)}"
+        elapsed = now - self._started_at
+        if elapsed > 0:
+            speed = (size - self._start_size) / elapsed
+            message += f" ({format_size(int(speed))}/s)"
+        self._show(message)
+
+    def _show(self, message: str) -> None:
+        self._shown_at = time.monotonic()
+        padding = " " * max(0, self._width - len(message))
+        click.echo("\r" + message + padding, nl=False)
+        self._width = len(message)
+
+
+def format_size(size: int) -> str:
+    """Format the size(bytes) with a binary prefix.
+
+    Examples:
+        >>> format_size(1000)
+        '1000 B'
+        >>> format_size(1536)
+        '1.5 KiB'
+    """
+    if size < 1024:
+        return f"{size} B"
+    value = size / 1024
+    for unit in ["KiB", "MiB", "GiB"]:
+        if value < 1024 or unit == "GiB":
+            break
+        value /= 1024
+    return f"{value:.1f} {unit}"
+
+
 def is_show() -> bool:
     """Flag to show.
 
@@ -116,6 +230,49 @@ def is_show() -> bool:
     return get_bool_env("ANYMOTION_STDOUT_ISSHOW", sys.stdout.isatty())
 
 
+def is_background() -> bool:
+    """Return True in a background job of interactive mode.
+
+    The commands of interactive mode are run in the main thread, and only the
+    background jobs are run in the other threads.
+    """
+    return threading.current_thread() is not threading.main_thread()
+
+
+def _iter_json(
+    data: object, sort_keys: bool = False, ensure_ascii: bool = False
+) -> Iterator[str]:
+    """Encode data to indented json and yield it in blocks of whole lines.
+
+    Each block ends with a newline.
+    """
+    encoder = json.JSONEncoder(sort_keys=sort_keys, ensure_ascii=ensure_ascii, indent=2)
+    chunks: List[str] = []
+    size = 0
+    for chunk in encoder.iterencode(data):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= JSON_BLOCK_SIZE:
+            # Strings in json never contain newlines, so it is split into lines.
+            lines, sep, rest = "".join(chunks).rpartition("\n")
+            if sep:
+                yield lines + sep
+                chunks, size = [rest], len(rest)
+    yield "".join(chunks) + "\n"
+
+
+def _highlight(blocks: Iterator[str]) -> Iterator[str]:
+    """Colorize each block of json lines."""
+    from pygments import highlight
+    from pygments.formatters import TerminalFormatter
+    from pygments.lexers import JsonLexer
+
+    lexer = JsonLexer()
+    formatter = TerminalFormatter()
+    for block in blocks:
+        yield highlight(block, lexer, formatter)
+
+
 def _parse_version(version: Optional[int]) -> str:
     if version == 10:
         return "HTTP/1.0"
@@ -0,0 +1,221 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .schedule import AdaptiveSchedule, FixedSchedule
+
+if TYPE_CHECKING:
+    from .client import CliClient
+
+PENDING_STATUSES = ["PROCESSING", "UNPROCESSED"]
+TERMINAL_STATUSES = ["SUCCESS", "FAILURE"]
+
+# Jobs due within this time(sec) are checked together.
+COALESCE_WINDOW = 0.05
+
+
+class JobResult(object):
+    """Processing result.
+
+    The result of processing by AnyMotion API such as extraction, drawing and
+    analysis. It has the same interface as ``anymotion_sdk.response.Result``.
+    """
+
+    def __init__(self, data: dict, status: Optional[str] = None):
+        self.json = data
+        self.status = status or str(data.get("execStatus"))
+
+    def __repr__(self):
+        return f"<JobResult [{self.status}]>"
+
+    @property
+    def failure_detail(self) -> Optional[str]:
+        """Return failure_detail."""
+        if self.status == "FAILURE":
+            return self.json.get("failureDetail")
+        else:
+            return None
+
+
+class _Job(object):
+    def __init__(self, endpoint: str, job_id: int, kind: str, timeout: float):
+        now = time.monotonic()
+        self.endpoint = endpoint
+        self.job_id = job_id
+        self.kind = kind
+        self.started_at = now
+        self.deadline = now + timeout
+        self.due = now
+        self.attempts = 0
+        self.data: dict = {}
+        self.future: Future = Future()
+
+
+class Poller(object):
+    """Wait for many asynchronous processes with shared status checks.
+
+    A single background thread checks the status of all pending jobs. When more
+    than one job of the same endpoint is due, the status is checked through the
+    list endpoint filtered by the pending statuses, so the number of requests per
+    check does not grow with the number of jobs. Only a job that has left the
+    pending statuses is fetched individually, once, to get its final data.
+
+    When each job is checked is decided by the schedule, such as FixedSchedule or
+    AdaptiveSchedule.
+
+    Examples:
+        >>> poller = Poller(client, interval=5, timeout=600)
+        >>> poller.wait("keypoints", 1)
+        <JobResult [SUCCESS]>
+    """
+
+    def __init__(
+        self,
+        client: "CliClient",
+        interval: float,
+        timeout: float,
+        schedule: Optional[Union[FixedSchedule, AdaptiveSchedule]] = None,
+    ):
+        self._client = client
+        self._timeout = timeout
+        self._schedule: Union[FixedSchedule, AdaptiveSchedule]
+        self._schedule = schedule or FixedSchedule(max(0.1, interval))
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._jobs: Dict[Tuple[str, int], _Job] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, endpoint: str, job_id: int, kind: Optional[str] = None) -> Future:
+        """Start waiting for the job and return a future of its JobResult.
+
+        Args:
+            endpoint: keypoints, drawings, analyses, or comparisons
+            job_id
+            kind: The kind of processing used by the schedule. Defaults to endpoint.
+        """
+        key = (endpoint, job_id)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                job = _Job(endpoint, job_id, kind or endpoint, self._timeout)
+                job.due += self._schedule.first_delay(job.kind)
+                self._jobs[key] = job
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return job.future
+
+    def wait(self, endpoint: str, job_id: int, kind: Optional[str] = None) -> JobResult:
+        """Wait for the job to finish.
+
+        Raises:
+            RequestsError: HTTP request fails.
+            Exception: The status could not be checked for other reasons.
+        """
+        return self.submit(endpoint, job_id, kind=kind).result()
+
+    def _run(self) -> None:
+        try:
+            self._loop()
+        except Exception as e:
+            # The jobs are failed instead of waiting forever, and the next job
+            # starts a new thread.
+            with self._lock:
+                jobs = list(self._jobs.values())
+                self._jobs.clear()
+                self._thread = None
+            for job in jobs:
+                self._finish(job, exception=e)
+        finally:
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _loop(self) -> None:
+        while True:
+            with self._lock:
+                if len(self._jobs) == 0:
+                    self._thread = None
+                    return
+                next_due = min(job.due for job in self._jobs.values())
+
+            delay = next_due - time.monotonic()
+            if delay > 0:
+                self._wakeup.wait(delay)
+                self._wakeup.clear()
+                continue
+
+            now = time.monotonic()
+            with self._lock:
+                due_jobs = [
+                    job
+                    for job in self._jobs.values()
+                    if job.due <= now + COALESCE_WINDOW
+                ]
+            self._check(due_jobs)
+
+    def _check(self, jobs: List[_Job]) -> None:
+        by_endpoint: Dict[str, List[_Job]] = {}
+        for job in jobs:
+            by_endpoint.setdefault(job.endpoint, []).append(job)
+
+        for endpoint, endpoint_jobs in by_endpoint.items():
+            try:
+                if len(endpoint_jobs) == 1:
+                    done_jobs = endpoint_jobs
+                else:
+                    pending_ids = self._get_pending_ids(endpoint)
+                    done_jobs = [
+                        job for job in endpoint_jobs if job.job_id not in pending_ids
+                    ]
+
+                # The results, e.g. the differences of hundreds of comparisons,
+                # are not written to the response cache.
+                for job in done_jobs:
+                    job.data = self._client.get_one_data(
+                        endpoint, job.job_id, use_cache=False
+                    )
+            except Exception as e:
+                # e.g. RequestsError, or an error of refreshing the token
+                for job in endpoint_jobs:
+                    self._finish(job, exception=e)
+                continue
+
+            now = time.monotonic()
+            for job in endpoint_jobs:
+                status = job.data.get("execStatus")
+                if status in TERMINAL_STATUSES:
+                    if status == "SUCCESS":
+                        self._schedule.record(job.kind, now - job.started_at)
+                    self._finish(job, JobResult(job.data))
+                elif now >= job.deadline:
+                    self._finish(job, JobResult(job.data, status="TIMEOUT"))
+                else:
+                    delay = self._schedule.next_delay(job.kind, job.attempts)
+                    job.due = min(now + delay, job.deadline)
+                    job.attempts += 1
+
+    def _get_pending_ids(self, endpoint: str) -> Set[int]:
+        ids: Set[int] = set()
+        for status in PENDING_STATUSES:
+            data: Iterable[dict] = self._client.get_list_data(
+                endpoint, params={"execStatus": status}
+            )
+            ids |= {x["id"] for x in data}
+        return ids
+
+    def _finish(
+        self,
+        job: _Job,
+        result: Optional[JobResult] = None,
+        exception: Optional[Exception] = None,
+    ) -> None:
+        with self._lock:
+            self._jobs.pop((job.endpoint, job.job_id), None)
+        if exception is not None:
+            job.future.set_exception(exception)
+        else:
+            job.future.set_result(result)
@@ -0,0 +1,138 @@
+import json
+import os
+import random
+import tempfile
+import threading
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Optional
+
+# Upper bounds(sec) of the buckets of movie duration, and their names.
+DURATION_BUCKETS = [(10, "10s"), (60, "1m"), (600, "10m"), (3600, "1h")]
+
+
+class FixedSchedule(object):
+    """Poll at a fixed interval.
+
+    The first status check is done immediately.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+    def first_delay(self, kind: str) -> float:
+        """Return the delay(sec) until the first status check."""
+        return 0
+
+    def next_delay(self, kind: str, attempt: int) -> float:
+        """Return the delay(sec) until the next status check."""
+        return self.interval
+
+    def record(self, kind: str, elapsed: float) -> None:
+        """Record the time(sec) it took to complete."""
+
+
+class AdaptiveSchedule(object):
+    """Poll fast at first and then back off exponentially with jitter.
+
+    The first status check is done near the completion time expected from the
+    history of the same kind of processing, such as "keypoints:image" or
+    "drawings:movie:10m", which is of a movie up to 10 minutes long.
+    """
+
+    def __init__(
+        self,
+        history: "LatencyHistory",
+        min_interval: float = 0.5,
+        max_interval: float = 60,
+        factor: float = 2,
+    ):
+        self.history = history
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+
+    def first_delay(self, kind: str) -> float:
+        """Return the delay(sec) until the first status check."""
+        expected = self.history.expected(kind)
+        if expected is None:
+            return self.min_interval
+        return max(self.min_interval, expected * 0.9)
+
+    def next_delay(self, kind: str, attempt: int) -> float:
+        """Return the delay(sec) until the next status check."""
+        delay = min(self.max_interval, self.min_interval * self.factor**attempt)
+        return random.uniform(delay / 2, delay)  # nosec
+
+    def record(self, kind: str, elapsed: float) -> None:
+        """Record the time(sec) it took to complete."""
+        self.history.record(kind, elapsed)
+
+
+class LatencyHistory(object):
+    """Persisted history of the time it took to complete each kind of processing.
+
+    Examples:
+        >>> history = LatencyHistory(Path("latency.json"))
+        >>> history.record("keypoints:image", 1.2)
+        >>> history.expected("keypoints:image")
+        1.2
+    """
+
+    def __init__(self, file: Path, size: int = 20):
+        self._file = file
+        self._size = size
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, List[float]]] = None
+
+    def expected(self, kind: str) -> Optional[float]:
+        """Return the expected time(sec) to complete, or None if unknown."""
+        with self._lock:
+            values = self._load().get(kind)
+        if not values:
+            return None
+        return median(values)
+
+    def record(self, kind: str, elapsed: float) -> None:
+        """Record the time(sec) it took to complete and save it to the file.
+
+        The file is read again and the time is added to it, so that the times
+        recorded by other processes in the meantime are kept.
+        """
+        with self._lock:
+            self._data = None
+            data = self._load()
+            values = data.setdefault(kind, [])
+            values.append(round(elapsed, 3))
+            del values[: -self._size]
+
+            try:
+                fd, tmp_name = tempfile.mkstemp(
+                    dir=str(self._file.parent), suffix=".tmp"
+                )
+            except OSError:
+                return
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(json.dumps(data))
+                Path(tmp_name).replace(self._file)
+            except OSError:
+                Path(tmp_name).unlink()
+
+    def _load(self) -> Dict[str, List[float]]:
+        if self._data is None:
+            try:
+                self._data = json.loads(self._file.read_text())
+            except (OSError, ValueError):
+                self._data = {}
+            if not isinstance(self._data, dict):
+                self._data = {}
+        return self._data
+
+
+def duration_bucket(duration: float) -> str:
+    """Return the name of the bucket of the movie duration(sec), such as "1m"."""
+    for upper, name in DURATION_BUCKETS:
+        if duration <= upper:
+            return name
+    return "long"
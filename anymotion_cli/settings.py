@@ -1,6 +1,5 @@
 import os
 from configparser import ConfigParser, SectionProxy
-from distutils.util import strtobool
 from pathlib import Path
 from typing import Any, Optional, Tuple, Union
 
@@ -9,11 +8,15 @@ from .config import (
     IS_DOWNLOAD,
     IS_OPEN,
     POLLING_INTERVAL,
+    POLLING_MODE,
     TIMEOUT,
     get_app_dir,
 )
 from .exceptions import SettingsValueError
 
+TRUE_VALUES = ["y", "yes", "t", "true", "on", "1"]
+FALSE_VALUES = ["n", "no", "f", "false", "off", "0"]
+
 
 class Settings(object):
     """Read and write settings.
@@ -24,10 +27,12 @@ class Settings(object):
         client_secret (Optional[str]): The value used for authentication.
         api_url (str): The AnyMotion API URL to request.
         interval (int): The interval time(sec).
+        polling_mode (str): "fixed" or "adaptive".
         timeout (int): The timeout period(sec).
 
     Note:
-        interval and timeout is used only when requesting asynchronous processing.
+        interval, polling_mode and timeout is used only when requesting
+        asynchronous processing.
     """
 
     def __init__(self, profile_name: str, use_env: bool = True):
@@ -83,6 +88,23 @@ class Settings(object):
         interval = self._config.polling_interval or POLLING_INTERVAL
         return self._to_int_with_check(interval, "polling_interval", 1)
 
+    @property
+    def polling_mode(self) -> str:
+        """Return the polling mode.
+
+        "fixed" polls at the interval time. "adaptive" polls fast at first and then
+        backs off, starting near the completion time of past processing.
+        If not in config file, return the default value.
+
+        Raises:
+            SettingsValueError
+        """
+        polling_mode = (self._config.polling_mode or POLLING_MODE).lower()
+        if polling_mode not in ["fixed", "adaptive"]:
+            message = f"The polling_mode value is invalid: {polling_mode}"
+            raise SettingsValueError(message)
+        return polling_mode
+
     @property
     def timeout(self) -> int:
         """Return the timeout period(sec).
@@ -217,3 +239,21 @@ class _Environment(object):
             return os.getenv(name.upper())
         else:
             return None
+
+
+def strtobool(value: str) -> bool:
+    """Convert a string representation of truth to bool.
+
+    It accepts the same values as ``distutils.util.strtobool``, which is slow to
+    import and removed in Python 3.12.
+
+    Raises:
+        ValueError: The value is not a representation of truth.
+    """
+    lower_value = value.lower()
+    if lower_value in TRUE_VALUES:
+        return True
+    elif lower_value in FALSE_VALUES:
+        return False
+    else:
+        raise ValueError(f"invalid truth value {value!r}")
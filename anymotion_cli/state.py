@@ -1,8 +1,12 @@
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
 import click
 
-from .output import is_show
+from .output import is_background, is_show
+
+if TYPE_CHECKING:
+    from .client import CliClient
+    from .settings import Settings
 
 
 class State(object):
@@ -17,6 +21,26 @@ class State(object):
         self.is_download: Optional[bool] = None
         self.is_open: Optional[bool] = None
 
+        self.use_cache = True
+        self.refresh_cache = False
+        self.use_dedup = True
+
+        # Clients reused for each profile. None if clients are not reused.
+        self.clients: Optional[Dict[str, Tuple["CliClient", "Settings"]]] = None
+
+    def reuse_clients(self) -> None:
+        """Reuse the client and its connections for each profile from now on.
+
+        It is used in interactive mode, where commands are run repeatedly.
+        """
+        if self.clients is None:
+            self.clients = {}
+
+    def forget_client(self, profile: str) -> None:
+        """Discard the reused client of the profile, e.g. after reconfiguring."""
+        if self.clients is not None:
+            self.clients.pop(profile, None)
+
     @property
     def use_spinner(self) -> bool:
         """Flag to use spinner.
@@ -25,11 +49,12 @@ class State(object):
             - verbose option is not set
             - output to terminal
             - ANYMOTION_USE_SPINNER is true or not set
+            - not in a background job of interactive mode
         """
         from .utils import get_bool_env
 
         env = get_bool_env("ANYMOTION_USE_SPINNER", True)
-        return not self.verbose and is_show() and env
+        return not self.verbose and is_show() and env and not is_background()
 
 
 pass_state = click.make_pass_decorator(State, ensure=True)
@@ -0,0 +1,469 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import BinaryIO, Callable, List, Mapping, Optional, Tuple
+
+import requests
+from anymotion_sdk import RequestsError
+
+PART_SUFFIX = ".part"
+# Suffix of the sidecar of the part file, which has the validator of the file.
+META_SUFFIX = ".json"
+# (connect, read) timeout(sec) so that a stalled connection is resumed.
+TIMEOUT = (10, 60)
+
+# It is less than the connection pool size of requests (10) so that the
+# connections are reused.
+MAX_SEGMENTS = 8
+MIN_SEGMENT_SIZE = 1024 * 1024
+
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+
+def download_file(
+    session: requests.Session,
+    url: str,
+    path: Path,
+    chunk_size: int = 1024 * 1024,
+    progress: Optional[ProgressCallback] = None,
+    retries: int = 5,
+    segments: int = 1,
+) -> None:
+    """Download the file with resuming.
+
+    The file is written to "<path>.part" first. If the connection is lost, the
+    download is resumed from the end of the part file with an HTTP Range request,
+    also in the next call. After the size of the part file is verified, it is
+    renamed to path.
+
+    The ETag or Last-Modified of the file is saved to "<path>.part.json" and
+    sent as If-Range, so a part file of another file at the same path is
+    downloaded again from the beginning instead of being resumed. A part file
+    without them is not resumed.
+
+    If segments is more than 1, the file is split into byte ranges downloaded in
+    parallel. It falls back to a single stream if the server does not support
+    Range, or if a part file of the single stream is left. A part file of the
+    byte ranges is marked in its sidecar and is never resumed, because it has
+    the size of the whole file with the ranges not written yet.
+
+    Args:
+        session
+        url
+        path
+        chunk_size
+        progress: Called with the downloaded size(bytes) and the total size
+            (bytes or None if unknown) each time a chunk is received.
+        retries: The number of retries when no data is received.
+        segments: The number of byte ranges downloaded in parallel.
+
+    Raises:
+        RequestsError: HTTP request fails.
+    """
+    part_path = path.with_name(path.name + PART_SUFFIX)
+    if _read_meta(part_path).get("segmented"):
+        # left by a killed process
+        _remove_part(part_path)
+
+    if segments > 1 and hasattr(os, "pwrite") and _get_size(part_path) == 0:
+        if _download_segments(
+            session, url, part_path, chunk_size, progress, retries, segments
+        ):
+            part_path.replace(path)
+            _remove_meta(part_path)
+            return
+
+    failures = 0
+    while True:
+        size = _get_size(part_path)
+        try:
+            total = _download_part(session, url, part_path, chunk_size, progress)
+            break
+        except requests.RequestException as e:
+            if _get_size(part_path) > size:
+                failures = 0
+            failures += 1
+            if failures > retries:
+                raise RequestsError(f"GET {url} is failed.\n{e}")
+            time.sleep(min(0.1 * 2**failures, 5))
+
+    size = _get_size(part_path)
+    if total is not None and size != total:
+        raise RequestsError(
+            f"GET {url} is failed.\n"
+            f"The downloaded size {size} bytes does not match {total} bytes."
+        )
+    part_path.replace(path)
+    _remove_meta(part_path)
+
+
+def upload_file(
+    session: requests.Session,
+    url: str,
+    path: Path,
+    headers: Optional[dict] = None,
+    progress: Optional[ProgressCallback] = None,
+    retries: int = 5,
+) -> None:
+    """Upload the file with PUT, streaming it from the disk.
+
+    The file is read in small blocks while it is sent, so it is never held in
+    memory. If the request fails, it is retried from the beginning of the file,
+    because the signed upload url accepts only a whole file in a single request.
+
+    Args:
+        session
+        url
+        path
+        headers
+        progress: Called with the uploaded size(bytes) and the total size(bytes)
+            each time a block is sent.
+        retries: The number of retries when the request fails.
+
+    Raises:
+        RequestsError: HTTP request fails.
+    """
+    total = path.stat().st_size
+    headers = dict(headers or {})
+    headers["Content-Length"] = str(total)
+
+    failures = 0
+    while True:
+        with path.open("rb") as f:
+            body = _ProgressReader(f, total, progress)
+            try:
+                response = session.put(url, data=body, headers=headers, timeout=TIMEOUT)
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if response.status_code in [200, 201, 204]:
+                    return
+                error = f"status code: {response.status_code}"
+                if response.status_code < 500:
+                    # e.g. the signed url is expired, which is not solved by retry
+                    raise RequestsError(f"PUT {url} is failed.\n{error}")
+
+        failures += 1
+        if failures > retries:
+            raise RequestsError(f"PUT {url} is failed.\n{error}")
+        time.sleep(min(0.1 * 2**failures, 5))
+
+
+def hash_file(path: Path, chunk_size: int = 1024 * 1024) -> Tuple[str, str]:
+    """Return the base64-encoded MD5 and the hex SHA-256 of the file.
+
+    The file is read chunk by chunk, once for both digests.
+    """
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            md5.update(chunk)
+            sha256.update(chunk)
+    return base64.b64encode(md5.digest()).decode(), sha256.hexdigest()
+
+
+class _ProgressReader(object):
+    """File object that reports the size read as the request body is sent."""
+
+    def __init__(
+        self, file: BinaryIO, total: int, progress: Optional[ProgressCallback]
+    ):
+        self._file = file
+        self._total = total
+        self._progress = progress
+        self._size = 0
+        if progress is not None:
+            progress(0, total)
+
+    def __len__(self) -> int:
+        return self._total - self._size
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._file.read(size)
+        self._size += len(chunk)
+        if self._progress is not None and chunk:
+            self._progress(self._size, self._total)
+        return chunk
+
+
+def _download_part(
+    session: requests.Session,
+    url: str,
+    part_path: Path,
+    chunk_size: int,
+    progress: Optional[ProgressCallback],
+) -> Optional[int]:
+    offset = _get_size(part_path)
+    validator = _read_meta(part_path).get("validator")
+    if offset > 0 and validator is None:
+        # It can not be verified that the part file is of the same file.
+        _remove_part(part_path)
+        offset = 0
+
+    # The range is the bytes of the file itself, so it must not be encoded.
+    headers = {"Accept-Encoding": "identity"}
+    if offset > 0:
+        headers["Range"] = f"bytes={offset}-"
+        # If the file is changed, the server sends the whole file with 200.
+        headers["If-Range"] = str(validator)
+
+    with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code == 416:
+            # The part file is already complete, or larger than the file.
+            _, total = _parse_content_range(response.headers.get("Content-Range"))
+            if total == offset:
+                return total
+            if offset == 0:
+                raise _invalid_response(url, response)
+            _remove_part(part_path)
+            return _download_part(session, url, part_path, chunk_size, progress)
+        elif response.status_code == 206:
+            start, total = _parse_content_range(response.headers.get("Content-Range"))
+            current = _get_validator(response.headers)
+            if offset == 0 and start != 0:
+                raise _invalid_response(url, response)
+            if start != offset or current not in [None, validator]:
+                _remove_part(part_path)
+                return _download_part(session, url, part_path, chunk_size, progress)
+            mode = "ab"
+        elif response.status_code == 200:
+            # The server does not support Range, or the file is changed, so it
+            # restarts from the beginning.
+            offset = 0
+            total = _to_int(response.headers.get("Content-Length"))
+            mode = "wb"
+        else:
+            raise _invalid_response(url, response)
+
+        if offset == 0:
+            _write_meta(part_path, {"validator": _get_validator(response.headers)})
+        if progress is not None:
+            progress(offset, total)
+        with part_path.open(mode) as f:
+            try:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    offset += len(chunk)
+                    if progress is not None:
+                        progress(offset, total)
+            finally:
+                f.flush()
+                os.fsync(f.fileno())
+
+    return total
+
+
+def _download_segments(
+    session: requests.Session,
+    url: str,
+    part_path: Path,
+    chunk_size: int,
+    progress: Optional[ProgressCallback],
+    retries: int,
+    segments: int,
+) -> bool:
+    """Download the byte ranges of the file in parallel into the part file.
+
+    Returns:
+        False if the server does not support Range.
+    """
+    headers = {"Accept-Encoding": "identity", "Range": "bytes=0-0"}
+    with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code != 206:
+            # The error, if any, is raised by the single stream.
+            return False
+        _, total = _parse_content_range(response.headers.get("Content-Range"))
+    if total is None:
+        return False
+
+    segments = max(1, min(segments, MAX_SEGMENTS, total // MIN_SEGMENT_SIZE))
+    bounds = [total * i // segments for i in range(segments + 1)]
+
+    lock = threading.Lock()
+    stop = threading.Event()
+    done = [0]
+
+    def add_progress(size: int) -> None:
+        with lock:
+            done[0] += size
+            if progress is not None:
+                progress(done[0], total)
+
+    add_progress(0)
+    # The part file has holes until all the ranges are written, so it is marked
+    # before it is created, not to be resumed by a single stream.
+    _write_meta(part_path, {"segmented": True})
+    errors: List[BaseException] = []
+    try:
+        # The file is allocated first and each range is written at its
+        # position, so no range is held in memory.
+        fd = os.open(str(part_path), os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, total)
+            with ThreadPoolExecutor(max_workers=segments) as executor:
+                futures = [
+                    executor.submit(
+                        _download_range,
+                        session,
+                        url,
+                        fd,
+                        bounds[i],
+                        bounds[i + 1] - 1,
+                        chunk_size,
+                        add_progress,
+                        retries,
+                        stop,
+                    )
+                    for i in range(segments)
+                ]
+                try:
+                    for future in as_completed(futures):
+                        error = future.exception()
+                        if error is not None:
+                            # stop the other ranges
+                            stop.set()
+                            errors.append(error)
+                except BaseException:
+                    # e.g. KeyboardInterrupt, so that the workers exit
+                    stop.set()
+                    raise
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if errors:
+            raise errors[0]
+    except BaseException:
+        _remove_part(part_path)
+        raise
+    return True
+
+
+def _download_range(
+    session: requests.Session,
+    url: str,
+    fd: int,
+    start: int,
+    end: int,
+    chunk_size: int,
+    add_progress: Callable[[int], None],
+    retries: int,
+    stop: threading.Event,
+) -> None:
+    position = start
+    failures = 0
+    while position <= end and not stop.is_set():
+        last_position = position
+        headers = {"Accept-Encoding": "identity", "Range": f"bytes={position}-{end}"}
+        try:
+            with session.get(
+                url, headers=headers, stream=True, timeout=TIMEOUT
+            ) as response:
+                first, _ = _parse_content_range(response.headers.get("Content-Range"))
+                if response.status_code != 206 or first != position:
+                    raise RequestsError(
+                        f"GET {url} is failed.\n"
+                        f"status code: {response.status_code}\n"
+                        f"Content-Range: {response.headers.get('Content-Range')}"
+                    )
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    chunk = chunk[: end + 1 - position]
+                    os.pwrite(fd, chunk, position)
+                    position += len(chunk)
+                    add_progress(len(chunk))
+                    if position > end or stop.is_set():
+                        break
+        except requests.RequestException as e:
+            error = str(e)
+        else:
+            error = "The range is not complete."
+
+        if position <= end and not stop.is_set():
+            failures = failures + 1 if position == last_position else 0
+            if failures > retries:
+                raise RequestsError(f"GET {url} is failed.\n{error}")
+            time.sleep(min(0.1 * 2**failures, 5))
+
+
+def _parse_content_range(
+    content_range: Optional[str],
+) -> Tuple[Optional[int], Optional[int]]:
+    """Parse Content-Range header and return the start and the total size.
+
+    Examples:
+        >>> _parse_content_range("bytes 100-199/1000")
+        (100, 1000)
+        >>> _parse_content_range("bytes */1000")
+        (None, 1000)
+    """
+    match = re.match(r"bytes (?:(\d+)-\d+|\*)/(\d+|\*)", content_range or "")
+    if match is None:
+        return None, None
+    return _to_int(match.group(1)), _to_int(match.group(2))
+
+
+def _invalid_response(url: str, response: requests.Response) -> RequestsError:
+    message = f"GET {url} is failed.\nstatus code: {response.status_code}"
+    content_range = response.headers.get("Content-Range")
+    if content_range:
+        message += f"\nContent-Range: {content_range}"
+    return RequestsError(message)
+
+
+def _get_validator(headers: Mapping[str, str]) -> Optional[str]:
+    """Return the strong ETag, or Last-Modified, which can be used as If-Range."""
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def _read_meta(part_path: Path) -> dict:
+    try:
+        meta = json.loads(_meta_path(part_path).read_text())
+    except (OSError, ValueError):
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def _write_meta(part_path: Path, meta: dict) -> None:
+    _meta_path(part_path).write_text(json.dumps(meta))
+
+
+def _remove_meta(part_path: Path) -> None:
+    try:
+        _meta_path(part_path).unlink()
+    except OSError:
+        pass
+
+
+def _remove_part(part_path: Path) -> None:
+    try:
+        part_path.unlink()
+    except OSError:
+        pass
+    _remove_meta(part_path)
+
+
+def _meta_path(part_path: Path) -> Path:
+    return part_path.with_name(part_path.name + META_SUFFIX)
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(str(value))
+    except ValueError:
+        return None
+
+
+def _get_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
@@ -0,0 +1,139 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .transfer import hash_file
+
+# Minimum time(sec) between the saves of the index while files are processed.
+SAVE_INTERVAL = 1.0
+
+# The indexes with changes not saved yet are saved at exit.
+_indexes: "weakref.WeakSet[UploadIndex]" = weakref.WeakSet()
+
+
+class UploadIndex(object):
+    """Local index of the uploaded files by their content.
+
+    The SHA-256 of each uploaded file is mapped to the created image or movie,
+    so the same content is not uploaded again. The digests of a file are
+    reused while its size and modification time are the same, so a file is
+    hashed only once unless it is changed.
+
+    The index is saved to a file for each profile. It is discarded if it was
+    made with another API URL or client ID (scope). The changes are saved at
+    most once per SAVE_INTERVAL, and the rest of them by flush() or at exit,
+    so the whole file is not written for each of many files.
+
+    Examples:
+        >>> index = UploadIndex(get_app_dir() / "uploads" / "default.json", scope)
+        >>> md5, sha256 = index.digest(Path("image.jpg"))
+        >>> index.add(sha256, "image", 1)
+        >>> index.get(sha256)
+        ('image', 1)
+    """
+
+    def __init__(self, file: Path, scope: str):
+        self._file = file
+        self._scope = scope
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self._saved_at: Optional[float] = None
+        _indexes.add(self)
+
+    def digest(self, path: Path, chunk_size: int = 1024 * 1024) -> Tuple[str, str]:
+        """Return the base64-encoded MD5 and the hex SHA-256 of the file."""
+        path = path.resolve()
+        stat = path.stat()
+        key = str(path)
+        with self._lock:
+            entry = self._load()["files"].get(key)
+        if (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime"] == stat.st_mtime_ns
+        ):
+            return entry["md5"], entry["sha256"]
+
+        md5, sha256 = hash_file(path, chunk_size=chunk_size)
+        with self._lock:
+            self._load()["files"][key] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "md5": md5,
+                "sha256": sha256,
+            }
+            self._changed()
+        return md5, sha256
+
+    def get(self, sha256: str) -> Optional[Tuple[str, int]]:
+        """Return the media type and the ID of the uploaded content, if any."""
+        with self._lock:
+            media = self._load()["media"].get(sha256)
+        if media is None:
+            return None
+        return str(media["type"]), int(media["id"])
+
+    def add(self, sha256: str, media_type: str, media_id: int) -> None:
+        """Add the uploaded content."""
+        with self._lock:
+            self._load()["media"][sha256] = {"type": media_type, "id": media_id}
+            self._changed()
+
+    def remove(self, sha256: str) -> None:
+        """Remove the content, e.g. if its image or movie no longer exists."""
+        with self._lock:
+            if self._load()["media"].pop(sha256, None) is not None:
+                self._changed()
+
+    def flush(self) -> None:
+        """Save the changes not saved yet."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            try:
+                data = json.loads(self._file.read_text())
+                if data["scope"] != self._scope:
+                    raise ValueError
+                if not isinstance(data["files"], dict):
+                    raise ValueError
+                if not isinstance(data["media"], dict):
+                    raise ValueError
+            except (OSError, ValueError, KeyError, TypeError):
+                data = {"scope": self._scope, "files": {}, "media": {}}
+            self._data = data
+        return self._data
+
+    def _changed(self) -> None:
+        self._dirty = True
+        now = time.monotonic()
+        if self._saved_at is None or now - self._saved_at >= SAVE_INTERVAL:
+            self._save()
+
+    def _save(self) -> None:
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        content = json.dumps(self._data, separators=(",", ":"))
+        try:
+            self._file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=str(self._file.parent), suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+            Path(tmp_name).replace(self._file)
+        except OSError:
+            pass
+
+
+@atexit.register
+def _flush_all() -> None:
+    for index in list(_indexes):
+        index.flush()
@@ -1,22 +1,75 @@
 import json
 import os
-from distutils.util import strtobool
+import re
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 
 import click
-from anymotion_sdk import Client, ClientValueError
-from anymotion_sdk.session import HttpSession
 
 from . import __version__
+from .config import get_app_dir
 from .exceptions import ClickException, SettingsValueError
 from .output import echo_request, echo_response, echo_warning
-from .settings import Settings
+from .settings import Settings, strtobool
 from .state import State
 
+if TYPE_CHECKING:
+    from .auth import TokenCache
+    from .cache import ResponseCache
+    from .client import CliClient
+    from .journal import JobJournal
+    from .keypoints import KeypointStore
+    from .uploads import UploadIndex
+
+
+def get_client(state: State) -> "CliClient":
+    """Get client from state.
+
+    If the state reuses clients, the client of the profile is created only once,
+    so its settings, connections and token are shared by the following commands.
+    Each command gets its own copy of it with the options of the command, so
+    the commands running in the background are not affected by the others.
+    """
+    if state.clients is not None and state.profile in state.clients:
+        client, settings = state.clients[state.profile]
+    else:
+        client, settings = _create_client(state)
+        if state.clients is not None:
+            state.clients[state.profile] = (client, settings)
+    if state.clients is not None:
+        client = client.copy()
+
+    # In interactive mode, the names of all files are got at once for the session.
+    client.name_resolver.prefetch = state.clients is not None
+    client.response_cache = get_response_cache() if state.use_cache else None
+    client.refresh_cache = state.refresh_cache
+    client.upload_index = (
+        get_upload_index(state.profile, settings) if state.use_dedup else None
+    )
+    client.job_journal = get_job_journal(settings)
+
+    client.session.request_callbacks.clear()
+    client.session.response_callbacks.clear()
+    if state.verbose:
+        client.session.add_request_callback(echo_request)
+        client.session.add_response_callback(echo_response)
+
+    # TODO: refactor
+    state.is_download = settings.is_download
+    state.is_open = settings.is_open
+
+    return client
+
+
+def _create_client(state: State) -> Tuple["CliClient", Settings]:
+    # The SDK and requests are imported only by the commands that use the API,
+    # to keep the startup of the other commands fast.
+    from anymotion_sdk import ClientValueError
+    from anymotion_sdk.session import HttpSession
+
+    from .client import CliClient
+    from .schedule import AdaptiveSchedule, FixedSchedule, LatencyHistory
 
-def get_client(state: State) -> Client:
-    """Get client from state."""
     settings = get_settings(state.profile)
     if not settings.is_ok:
         command = click.style(f"{state.cli_name} configure", fg="cyan")
@@ -31,26 +84,90 @@ def get_client(state: State) -> Client:
         session.user_agent = f"{state.cli_name}/{__version__}"
 
     try:
-        client = Client(
+        schedule: Union[FixedSchedule, AdaptiveSchedule]
+        if settings.polling_mode == "adaptive":
+            history = LatencyHistory(get_app_dir() / "latency.json")
+            schedule = AdaptiveSchedule(history)
+        else:
+            schedule = FixedSchedule(settings.interval)
+
+        client = CliClient(
             client_id=str(settings.client_id),
             client_secret=str(settings.client_secret),
             api_url=settings.api_url,
             interval=settings.interval,
             timeout=settings.timeout,
+            schedule=schedule,
+            token_cache=get_token_cache(state.profile),
             session=session,
         )
-    except ClientValueError as e:
+    except (ClientValueError, SettingsValueError) as e:
         raise ClickException(str(e))
 
-    if state.verbose:
-        client.session.add_request_callback(echo_request)
-        client.session.add_response_callback(echo_response)
+    return client, settings
 
-    # TODO: refactor
-    state.is_download = settings.is_download
-    state.is_open = settings.is_open
 
-    return client
+def get_token_cache(profile: str) -> "TokenCache":
+    """Get the access token cache of the profile."""
+    from .auth import TokenCache
+
+    file_name = re.sub(r"[^\w.-]", "_", profile) + ".json"
+    return TokenCache(get_app_dir() / "tokens" / file_name)
+
+
+def get_upload_index(profile: str, settings: Settings) -> "UploadIndex":
+    """Get the index of the files uploaded with the profile."""
+    from .uploads import UploadIndex
+
+    file_name = re.sub(r"[^\w.-]", "_", profile) + ".json"
+    return UploadIndex(get_app_dir() / "uploads" / file_name, _get_scope(settings))
+
+
+def get_job_journal(settings: Settings) -> "JobJournal":
+    """Get the journal of the started jobs."""
+    from .journal import JobJournal
+
+    return JobJournal(get_app_dir() / "jobs.sqlite3", _get_scope(settings))
+
+
+def get_keypoint_store(profile: str, settings: Settings) -> "KeypointStore":
+    """Get the store of the keypoints saved locally with the profile.
+
+    Raises:
+        ClickException: NumPy is not installed.
+    """
+    require_numpy()
+    from .keypoints import KeypointStore
+
+    dir_name = re.sub(r"[^\w.-]", "_", profile)
+    return KeypointStore(get_app_dir() / "keypoints" / dir_name, _get_scope(settings))
+
+
+def require_numpy() -> None:
+    """Check that NumPy, which is optional, is installed.
+
+    Raises:
+        ClickException: NumPy is not installed.
+    """
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise ClickException(
+            "NumPy is required for this command. "
+            "Install it with 'pip install anymotion-cli[local]'."
+        )
+
+
+def _get_scope(settings: Settings) -> str:
+    """Return the scope of the local data, which differs by account."""
+    return "\n".join([settings.api_url, str(settings.client_id)])
+
+
+def get_response_cache() -> "ResponseCache":
+    """Get the cache of API responses."""
+    from .cache import ResponseCache
+
+    return ResponseCache(get_app_dir() / "cache")
 
 
 # TODO: remove?
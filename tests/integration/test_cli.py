@@ -1,5 +1,7 @@
 from textwrap import dedent
 
+import pytest
+
 from anymotion_cli.core import cli
 
 
@@ -178,6 +180,14 @@ class TestImage(object):
             """
         )
 
+    def test_list_with_ndjson(self, runner):
+        result = runner.invoke(cli, ["image", "list", "--format", "ndjson"])
+
+        assert result.exit_code == 0
+        assert result.output == (
+            '{"id":111,"name":"image","contentMd5":"contentmd5"}\n'
+        )
+
 
 class TestKeypoint(object):
     def test_show(self, runner):
@@ -203,6 +213,18 @@ class TestKeypoint(object):
             """
         )
 
+    @pytest.mark.parametrize(
+        "args, expected_count", [([], 1), (["--no-cache"], 2), (["--refresh"], 2)]
+    )
+    def test_show_with_cache(self, runner, requests_mock, args, expected_count):
+        url = "http://api.example.com/anymotion/v1/keypoints/222/"
+        runner.invoke(cli, ["keypoint", "show", "222"])
+        result = runner.invoke(cli, ["keypoint", "show", "222"] + args)
+
+        assert result.exit_code == 0
+        history = [r for r in requests_mock.request_history if r.url == url]
+        assert len(history) == expected_count
+
     def test_list(self, runner):
         result = runner.invoke(cli, ["keypoint", "list"])
 
@@ -1,9 +1,12 @@
 import io
+import time
 
 import click
+import pytest
 from prompt_toolkit.document import Document
 
-from anymotion_cli.click_custom.repl import ClickCompleter, repl
+from anymotion_cli.click_custom.repl import ClickCompleter, _BackgroundJobs, repl
+from anymotion_cli.output import confirm
 
 
 class TestCompletion(object):
@@ -155,3 +158,111 @@ class TestRepl(object):
 
         ctx = root_command.make_context("cli", [""])
         repl(ctx)
+
+
+class TestBackgroundJobs(object):
+    @pytest.mark.parametrize("command", ["cmd --name a &", ":bg cmd --name a"])
+    def test_run_in_background(self, monkeypatch, capsys, group, command):
+        monkeypatch.setattr(
+            "sys.stdin", io.StringIO(f"{command}\n:wait\n:jobs\nfail &\n:wait 2\n")
+        )
+        ctx = group.make_context("cli", [""])
+
+        repl(ctx)
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[:2] == ["[1] cmd --name a", "a"]
+        assert lines[2] == lines[3] == "[1] Done cmd --name a"
+        assert lines[4:] == ["[2] fail", "[2] Failed fail"]
+
+    def test_fg(self, monkeypatch, capsys, group):
+        monkeypatch.setattr("sys.stdin", io.StringIO("sleep &\n:fg\n:jobs\n"))
+        ctx = group.make_context("cli", [""])
+
+        repl(ctx)
+
+        assert capsys.readouterr().out == (
+            "[1] sleep\n[1] Done sleep\n[1] Done sleep\n"
+        )
+
+    def test_unexpected_error(self, monkeypatch, capsys, group):
+        monkeypatch.setattr("sys.stdin", io.StringIO("crash &\n:wait\n"))
+        ctx = group.make_context("cli", [""])
+
+        repl(ctx)
+
+        out, err = capsys.readouterr()
+        assert out == "[1] crash\n[1] Failed crash\n"
+        assert err.startswith("Traceback (most recent call last):\n")
+        assert err.endswith("ValueError: unexpected\n")
+
+    def test_confirm_in_background(self, monkeypatch, capsys, group):
+        monkeypatch.setattr("sys.stdin", io.StringIO("ask &\n:wait\ncmd --name a\n"))
+        ctx = group.make_context("cli", [""])
+
+        repl(ctx)
+
+        # the default is used without reading the input of the prompt
+        assert capsys.readouterr().out == "[1] ask\nFalse\n[1] Done ask\na\n"
+
+    def test_jobs_without_jobs(self, monkeypatch, capsys, group):
+        monkeypatch.setattr("sys.stdin", io.StringIO(":jobs\n:fg\n"))
+        ctx = group.make_context("cli", [""])
+
+        repl(ctx)
+
+        assert capsys.readouterr().out == (
+            "There are no background jobs.\nThere are no running background jobs.\n"
+        )
+
+    @pytest.mark.parametrize(
+        "command, expected",
+        [
+            (":wait 100", "Error: no such job: 100\n"),
+            (":wait a", "Error: invalid job ID: a\n"),
+            (":wait 1 2", "Error: invalid arguments of :wait: too many"),
+            (":bg", "Error: missing command: :bg COMMAND\n"),
+        ],
+    )
+    def test_invalid(self, monkeypatch, capsys, group, command, expected):
+        monkeypatch.setattr("sys.stdin", io.StringIO(command))
+        ctx = group.make_context("cli", [""])
+
+        repl(ctx)
+
+        assert capsys.readouterr().out.startswith(expected)
+
+    @pytest.fixture(autouse=True)
+    def background_jobs(self, monkeypatch):
+        monkeypatch.setattr(
+            "anymotion_cli.click_custom.repl._background_jobs", _BackgroundJobs()
+        )
+
+    @pytest.fixture
+    def group(self):
+        @click.group()
+        def root_command():
+            pass
+
+        @root_command.command()
+        @click.option("--name")
+        def cmd(name):
+            click.echo(name)
+
+        @root_command.command()
+        def sleep():
+            time.sleep(0.2)
+
+        @root_command.command()
+        def fail():
+            raise click.ClickException("error")
+
+        @root_command.command()
+        def crash():
+            raise ValueError("unexpected")
+
+        @root_command.command()
+        def ask():
+            click.echo(confirm("Continue?"))
+
+        return root_command
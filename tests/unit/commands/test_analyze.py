@@ -1,9 +1,11 @@
+import json
 from textwrap import dedent
 
 import pytest
 from anymotion_sdk import RequestsError
 
 from anymotion_cli.commands.analyze import cli
+from anymotion_cli.keypoints import KeypointStore
 
 
 class TestAnalyze(object):
@@ -208,3 +210,74 @@ class TestAnalyze(object):
 
         mocker.patch("anymotion_cli.commands.analyze.get_client", client_mock)
         return client_mock
+
+
+class TestAnalyzeLocal(object):
+    def test_valid(self, runner, make_client, store):
+        client_mock = make_client()
+        rule = '{"analysisType": "distance", "points": ["nose", "leftEye"]}'
+
+        result = runner.invoke(cli, ["analyze", "1", "--rule", rule, "--local"])
+
+        assert result.exit_code == 0
+        assert json.loads(result.output) == [
+            {
+                "analysisType": "distance",
+                "description": "nose and leftEye distances",
+                "values": [5, None],
+            }
+        ]
+        assert client_mock.return_value.analyze_keypoint.call_count == 0
+        assert store.ids() == [1]
+
+        # the keypoints saved in the store are used
+        result = runner.invoke(cli, ["analyze", "1", "--rule", rule, "--local"])
+
+        assert result.exit_code == 0
+        client_mock.return_value.get_one_data.assert_called_once_with(
+            "keypoints", 1, use_cache=False
+        )
+
+    @pytest.mark.parametrize(
+        "status, rule, expected",
+        [
+            ("FAILURE", "[]", "Error: Status of keypoint 1 is not SUCCESS.\n"),
+            (
+                "SUCCESS",
+                '[{"analysisType": "speed"}]',
+                "Error: Rule is invalid for local analysis. "
+                "Unsupported analysis type: speed\n",
+            ),
+        ],
+    )
+    def test_invalid(self, runner, make_client, store, status, rule, expected):
+        make_client(status)
+
+        result = runner.invoke(cli, ["analyze", "1", "--rule", rule, "--local"])
+
+        assert result.exit_code == 1
+        assert result.output == expected
+
+    @pytest.fixture
+    def store(self, mocker, tmp_path):
+        store = KeypointStore(tmp_path / "keypoints", "scope")
+        mocker.patch("anymotion_cli.commands.analyze.get_settings")
+        mocker.patch(
+            "anymotion_cli.commands.analyze.get_keypoint_store", return_value=store
+        )
+        yield store
+
+    @pytest.fixture
+    def make_client(self, mocker):
+        def _make_client(status="SUCCESS"):
+            client_mock = mocker.MagicMock()
+            client_mock.return_value.get_one_data.return_value = {
+                "id": 1,
+                "image": 2,
+                "keypoint": [{"nose": [0, 0], "leftEye": [3, 4]}, {"nose": [0, 0]}],
+                "execStatus": status,
+            }
+            mocker.patch("anymotion_cli.commands.analyze.get_client", client_mock)
+            return client_mock
+
+        return _make_client
@@ -0,0 +1,37 @@
+import pytest
+
+from anymotion_cli.cache import ResponseCache
+from anymotion_cli.commands.cache import cli
+
+
+@pytest.fixture
+def response_cache(mocker, tmp_path):
+    response_cache = ResponseCache(tmp_path / "cache", max_size=1024 * 1024)
+    mocker.patch(
+        "anymotion_cli.commands.cache.get_response_cache",
+        mocker.MagicMock(return_value=response_cache),
+    )
+    yield response_cache
+
+
+def test_cache_stats(runner, response_cache):
+    response_cache.set(("url", "images", 1), {"id": 1})
+    response_cache.set(("url", "images", 2), {"id": 2})
+
+    result = runner.invoke(cli, ["cache", "stats"])
+
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert lines[3].split() == ["entries", "2"]
+    assert lines[4].split() == ["size", "16", "B"]
+    assert lines[5].split() == ["max_size", "1.0", "MiB"]
+
+
+def test_cache_clear(runner, response_cache):
+    response_cache.set(("url", "images", 1), {"id": 1})
+
+    result = runner.invoke(cli, ["cache", "clear"])
+
+    assert result.exit_code == 0
+    assert result.output == "Cleared the cache.\n"
+    assert response_cache.stats()["entries"] == 0
@@ -1,9 +1,14 @@
+import json
+from concurrent.futures import Future
 from textwrap import dedent
 
 import pytest
 from anymotion_sdk import RequestsError
 
-from anymotion_cli.commands.compare import cli
+from anymotion_cli.cache import ResponseCache
+from anymotion_cli.client import CliClient
+from anymotion_cli.commands.compare import cli, score_difference
+from anymotion_cli.keypoints import KeypointArray, KeypointStore
 
 
 class TestCompare(object):
@@ -102,3 +107,256 @@ class TestCompare(object):
             return client_mock
 
         return _make_client
+
+
+class TestCompareLocal(object):
+    def test_valid(self, runner, make_client, store):
+        store.add(
+            KeypointArray.from_frames(
+                [{"nose": [0, 0], "leftEye": [4, 0]}], meta={"keypoint_id": 1}
+            )
+        )
+        client_mock = make_client()
+
+        result = runner.invoke(cli, ["compare", "1", "2", "--local"])
+
+        assert result.exit_code == 0
+        assert json.loads(result.output) == [
+            {
+                "nose": {"distance": 0.0, "direction": 0.0},
+                "leftEye": {"distance": 0.0, "direction": 0.0},
+            }
+        ]
+        client = client_mock.return_value
+        client.get_one_data.assert_called_once_with("keypoints", 2, use_cache=False)
+        assert client.compare_keypoint.call_count == 0
+        assert store.ids() == [1, 2]
+
+    def test_not_success(self, runner, make_client, store):
+        make_client(status="PROCESSING")
+
+        result = runner.invoke(cli, ["compare", "1", "2", "--local"])
+
+        assert result.exit_code == 1
+        assert result.output == "Error: Status of keypoint 1 is not SUCCESS.\n"
+
+    def test_with_drawing(self, runner, make_client, store):
+        client_mock = make_client()
+
+        result = runner.invoke(cli, ["compare", "1", "2", "--local", "-d"])
+
+        assert client_mock.call_count == 0
+        assert result.exit_code == 2
+        assert (
+            '"--local" and "--with-drawing" options cannot be used at the same time.'
+        ) in result.output
+
+    @pytest.fixture
+    def store(self, mocker, tmp_path):
+        store = KeypointStore(tmp_path / "keypoints", "scope")
+        mocker.patch("anymotion_cli.commands.compare.get_settings")
+        mocker.patch(
+            "anymotion_cli.commands.compare.get_keypoint_store", return_value=store
+        )
+        yield store
+
+    @pytest.fixture
+    def make_client(self, mocker):
+        def _make_client(status="SUCCESS"):
+            client_mock = mocker.MagicMock()
+            client_mock.return_value.get_one_data.side_effect = (
+                lambda _, keypoint_id, **kwargs: {
+                    "id": keypoint_id,
+                    "image": 10 + keypoint_id,
+                    "keypoint": [{"nose": [10, 10], "leftEye": [18, 10]}],
+                    "execStatus": status,
+                }
+            )
+            mocker.patch("anymotion_cli.commands.compare.get_client", client_mock)
+            return client_mock
+
+        return _make_client
+
+
+class TestCompareMany(object):
+    def test_valid(self, runner, make_client):
+        client_mock = make_client()
+
+        result = runner.invoke(
+            cli,
+            ["compare", "1", "--targets-from", "-", "--top-k", "2"],
+            input="# targets\n4\n2\n\n3\n2\n",
+        )
+
+        assert result.exit_code == 0
+        assert result.output.startswith("Comparing keypoint 1 with 3 targets.\n")
+        assert result.output.count("Success: Comparison is complete.") == 3
+        assert "(target id: 3, comparison id: 103, score: 0.3000)" in result.output
+        table = result.output.split("\n\n")[-1].splitlines()
+        assert table[0].split() == ["Rank", "Target", "ID", "Score", "Comparison", "ID"]
+        assert [row.split() for row in table[2:]] == [
+            ["1", "2", "0.2000", "102"],
+            ["2", "3", "0.3000", "103"],
+        ]
+        assert client_mock.return_value.compare_keypoint.call_count == 3
+
+    def test_differences_are_not_cached(self, mocker, runner, tmp_path):
+        client = CliClient(
+            client_id="client_id",
+            client_secret="client_secret",
+            api_url="http://api.example.com/anymotion/v1/",
+            interval=0.01,
+            response_cache=ResponseCache(tmp_path),
+        )
+        mocker.patch("anymotion_cli.commands.compare.get_client", return_value=client)
+        mocker.patch(
+            "anymotion_sdk.Client.compare_keypoint",
+            side_effect=lambda source, target: target + 100,
+        )
+        mocker.patch("anymotion_sdk.Client.get_list_data", return_value=[])
+        get_mock = mocker.patch(
+            "anymotion_sdk.Client.get_one_data",
+            side_effect=lambda endpoint, comparison_id: {
+                "id": comparison_id,
+                "execStatus": "SUCCESS",
+                "difference": [{"nose": {"distance": 1, "direction": 0}}],
+            },
+        )
+
+        result = runner.invoke(
+            cli, ["compare", "1", "--targets-from", "-"], input="2\n3\n4\n"
+        )
+
+        assert result.exit_code == 0
+        assert result.output.count("Success: Comparison is complete.") == 3
+        # the difference of the waited result is used
+        assert get_mock.call_count == 3
+        assert client.response_cache.stats()["entries"] == 0
+
+    def test_with_failure(self, runner, make_client):
+        make_client(failed_ids=[3])
+
+        result = runner.invoke(
+            cli, ["compare", "1", "--targets-from", "-"], input="2\n3\n4\n"
+        )
+
+        assert result.exit_code == 1
+        assert (
+            "Error: Comparison failed. (target id: 3, comparison id: 103)\nmessage"
+        ) in result.output
+        table = result.output.split("\n\n")[-1].splitlines()
+        assert [row.split()[1] for row in table[2:4]] == ["2", "4"]
+        assert result.output.endswith("Error: 1 of 3 comparisons failed.\n")
+
+    def test_local(self, runner, make_client, mocker, tmp_path):
+        store = KeypointStore(tmp_path / "keypoints", "scope")
+        mocker.patch("anymotion_cli.commands.compare.get_settings")
+        mocker.patch(
+            "anymotion_cli.commands.compare.get_keypoint_store", return_value=store
+        )
+        client_mock = make_client()
+
+        result = runner.invoke(
+            cli, ["compare", "1", "--targets-from", "-", "--local"], input="2\n3\n"
+        )
+
+        assert result.exit_code == 0
+        table = result.output.split("\n\n")[-1].splitlines()
+        assert table[0].split() == ["Rank", "Target", "ID", "Score"]
+        assert [row.split()[:2] for row in table[2:]] == [["1", "2"], ["2", "3"]]
+        assert store.ids() == [1, 2, 3]
+        assert client_mock.return_value.compare_keypoint.call_count == 0
+
+    @pytest.mark.parametrize(
+        "args, content, expected",
+        [
+            (
+                ["compare", "1", "2", "--targets-from", "-"],
+                "3\n",
+                '"TARGET_ID" and "--targets-from" option cannot be used at the same '
+                "time.",
+            ),
+            (
+                ["compare", "1", "-d", "--targets-from", "-"],
+                "3\n",
+                '"--targets-from" and "--with-drawing" options cannot be used',
+            ),
+            (
+                ["compare", "1", "--targets-from", "-"],
+                "2\nthree\n",
+                "Invalid value for '--targets-from': Line 2 is not a keypoint id",
+            ),
+            (
+                ["compare", "1", "--targets-from", "-"],
+                "# no targets\n",
+                "Invalid value for '--targets-from': There are no keypoint ids.",
+            ),
+        ],
+    )
+    def test_invalid_params(self, runner, make_client, args, content, expected):
+        client_mock = make_client()
+
+        result = runner.invoke(cli, args, input=content)
+
+        assert client_mock.call_count == 0
+        assert result.exit_code == 2
+        assert expected in result.output
+
+    @pytest.fixture
+    def make_client(self, mocker):
+        def _make_client(failed_ids=()):
+            client_mock = mocker.MagicMock()
+            client = client_mock.return_value
+            client.compare_keypoint.side_effect = lambda source, target: target + 100
+
+            def submit_wait(endpoint, comparison_id):
+                response = mocker.MagicMock()
+                if comparison_id - 100 in failed_ids:
+                    response.status = "FAILURE"
+                    response.failure_detail = "message"
+                else:
+                    response.status = "SUCCESS"
+                    distance = (comparison_id - 100) / 10
+                    response.json = {
+                        "id": comparison_id,
+                        "execStatus": "SUCCESS",
+                        "difference": [
+                            {"nose": {"distance": distance, "direction": 0}},
+                            {"nose": {"distance": distance, "direction": 0}},
+                        ],
+                    }
+                future = Future()
+                future.set_result(response)
+                return future
+
+            client.submit_wait.side_effect = submit_wait
+            client.get_one_data.side_effect = lambda _, keypoint_id, **kwargs: {
+                "id": keypoint_id,
+                "image": 10 + keypoint_id,
+                "keypoint": [
+                    {
+                        "nose": [0, 0],
+                        "leftEye": [4, keypoint_id - 1],
+                        "rightEye": [4, 0],
+                    }
+                ],
+                "execStatus": "SUCCESS",
+            }
+            mocker.patch("anymotion_cli.commands.compare.get_client", client_mock)
+            return client_mock
+
+        return _make_client
+
+
+@pytest.mark.parametrize(
+    "difference, expected",
+    [
+        ([{"nose": {"distance": 1, "direction": 90}}, {"nose": {"distance": 2}}], 1.5),
+        ([{"nose": {"distance": 1}, "leftEye": {"distance": 0}}, {}], 0.5),
+        ([[{"distance": 3.0}], {"distance": None}], 3.0),
+        ([{}, {}], None),
+        ([], None),
+    ],
+)
+def test_score_difference(difference, expected):
+    assert score_difference(difference) == expected
@@ -100,6 +100,7 @@ def test_configure_list(mocker, runner, client_id, expected_client_id):
         client_secret     ****************cret
         polling_interval  10
         timeout           600
+        polling_mode      fixed
     """
     )
 
@@ -109,6 +110,7 @@ def test_configure_list(mocker, runner, client_id, expected_client_id):
     settings_mock.return_value.client_secret = "client_secret"
     settings_mock.return_value.interval = 10
     settings_mock.return_value.timeout = 600
+    settings_mock.return_value.polling_mode = "fixed"
     mocker.patch("anymotion_cli.commands.configure.get_settings", settings_mock)
 
     result = runner.invoke(cli, ["configure", "list"])
@@ -133,6 +135,7 @@ class TestConfigureGet(object):
                 False,
             ),
             (["configure", "get", "polling_interval"], "5\n", False),
+            (["configure", "get", "polling_mode"], "fixed\n", False),
             (["configure", "get", "timeout"], "600\n", False),
             (["configure", "get", "is_download"], "True\n", False),
             (["configure", "get", "is_open"], "False\n", False),
@@ -5,12 +5,9 @@ from textwrap import dedent
 import pytest
 from anymotion_sdk import RequestsError
 
-from anymotion_cli.commands.download import (
-    _get_name_from_comparison_id,
-    _get_name_from_keypoint_id,
-    _is_skip,
-    cli,
-)
+from anymotion_cli.commands.download import _is_skip, cli
+from anymotion_cli.names import NameResolver
+from anymotion_cli.output import TransferProgress
 
 
 class TestDownload(object):
@@ -85,6 +82,16 @@ class TestDownload(object):
         assert client_mock.call_count == 1
         assert result.exit_code == 0
         assert "Downloading..." in result.output
+        progress = client_mock.return_value.download.call_args[1]["progress"]
+        assert isinstance(progress, TransferProgress)
+
+    def test_with_segments(self, runner, make_client):
+        client_mock = make_client()
+
+        result = runner.invoke(cli, ["download", "111", "--segments", "4"])
+
+        assert result.exit_code == 0
+        assert client_mock.return_value.download.call_args[1]["segments"] == 4
 
     @pytest.mark.parametrize(
         "force, is_skip, expected",
@@ -152,12 +159,19 @@ class TestDownload(object):
     @pytest.mark.parametrize(
         "args, expected",
         [
-            (["download"], "Error: Missing argument 'DRAWING_ID'.\n"),
+            (["download"], "Error: Either DRAWING_ID or '--all' option is required.\n"),
+            (
+                ["download", "111", "--all"],
+                (
+                    "Error: DRAWING_ID and '--all' option cannot be used at the same "
+                    "time.\n"
+                ),
+            ),
             (
                 ["download", "invalid_id"],
                 (
-                    "Error: Invalid value for 'DRAWING_ID': "
-                    "invalid_id is not a valid integer\n",
+                    "Error: Invalid value for '[DRAWING_ID]': "
+                    "invalid_id is not a valid integer\n"
                 ),
             ),
             (["download", "111", "-o"], "Error: -o option requires an argument\n"),
@@ -218,101 +232,13 @@ class TestDownload(object):
                 get_name_mock = mocker.MagicMock(side_effect=RequestsError())
             else:
                 get_name_mock = mocker.MagicMock(return_value="image")
-            mocker.patch(
-                "anymotion_cli.commands.download._get_name_from_keypoint_id",
-                get_name_mock,
-            )
+            client_mock.return_value.name_resolver.drawing_name = get_name_mock
 
             return client_mock
 
         return _make_client
 
 
-class TestGetNameFromKeypointId(object):
-    @pytest.mark.parametrize(
-        "keypoint_id, media_type, expected",
-        [
-            (222, "image", "image"),
-            (222, "movie", "movie"),
-            (222, None, ""),
-            (None, None, ""),
-        ],
-    )
-    def test_valid(self, make_client, keypoint_id, media_type, expected):
-        client_mock = make_client(media_type=media_type)
-        name = _get_name_from_keypoint_id(client_mock(), keypoint_id)
-
-        assert client_mock.call_count == 1
-        assert name == expected
-
-    @pytest.fixture
-    def make_client(self, mocker):
-        def _make_client(media_type=None):
-            client_mock = mocker.MagicMock()
-
-            if media_type == "image":
-                data = {"image": 111, "movie": None}
-                client_mock.return_value.get_image.return_value = {"name": "image"}
-            elif media_type == "movie":
-                data = {"image": None, "movie": 111}
-                client_mock.return_value.get_movie.return_value = {"name": "movie"}
-            else:
-                data = {"image": None, "movie": None}
-
-            client_mock.return_value.get_keypoint.return_value = data
-
-            return client_mock
-
-        return _make_client
-
-
-class TestGetNameFromComparisonId(object):
-    @pytest.mark.parametrize(
-        "comparison_id, target_name, source_name, expected",
-        [
-            (333, "image1", "image2", "image1_image2"),
-            (333, "image1", "", ""),
-            (333, "", "image2", ""),
-            (333, "", "", ""),
-            (None, "", "", ""),
-        ],
-    )
-    def test_valid(
-        self, make_client, comparison_id, target_name, source_name, expected
-    ):
-        client_mock = make_client(target_name=target_name, source_name=source_name)
-        name = _get_name_from_comparison_id(client_mock(), comparison_id)
-
-        assert client_mock.call_count == 1
-        assert name == expected
-
-    @pytest.fixture
-    def make_client(self, mocker):
-        def _make_client(target_name="image1", source_name="image2"):
-            def _return_value(client, keypoint_id):
-                if keypoint_id == 111:
-                    return target_name
-                elif keypoint_id == 222:
-                    return source_name
-                else:
-                    return ""
-
-            get_name_from_keypoint_id_mock = mocker.MagicMock(side_effect=_return_value)
-            mocker.patch(
-                "anymotion_cli.commands.download._get_name_from_keypoint_id",
-                get_name_from_keypoint_id_mock,
-            )
-
-            client_mock = mocker.MagicMock()
-            client_mock.return_value.get_comparison.return_value = {
-                "target": 111,
-                "source": 222,
-            }
-            return client_mock
-
-        return _make_client
-
-
 class TestIsSkip(object):
     def test_not_exists(self, capfd, make_path):
         path = make_path("image.jpg", exists=False)
@@ -336,3 +262,149 @@ class TestIsSkip(object):
         out, err = capfd.readouterr()
         assert out == f"File already exists: {path}\nDo you want to overwrite? [y/N]: "
         assert err == ""
+
+
+class TestDownloadAll(object):
+    def test_valid(self, runner, make_client, tmp_path):
+        client_mock = make_client()
+
+        result = runner.invoke(cli, ["download", "--all", "-o", str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            ".amcli-manifest.jsonl",
+            "drawing_3.mp4",
+            "image_1.jpg",
+            "movie_image_2.mp4",
+        ]
+        client_mock.return_value.get_drawings.assert_called_once_with(
+            params={"execStatus": "SUCCESS"}
+        )
+        # names are resolved with a list request for each endpoint
+        assert client_mock.return_value.get_list_data.call_count == 4
+        assert result.output.startswith(
+            f"Downloading 3 drawn files to {tmp_path}. (0 already downloaded)\n"
+        )
+        assert result.output.count("Success: Downloaded the file to") == 3
+
+    def test_with_segments(self, mocker, runner, make_client, tmp_path):
+        make_client()
+        resize_mock = mocker.patch("anymotion_cli.aio._resize_connection_pool")
+
+        result = runner.invoke(
+            cli,
+            ["download", "--all", "-o", str(tmp_path), "-j", "4", "--segments", "3"],
+        )
+
+        assert result.exit_code == 0
+        assert resize_mock.call_args[0][1] == 12
+
+    def test_downloaded_files_are_skipped(self, runner, make_client, tmp_path):
+        client_mock = make_client()
+        runner.invoke(cli, ["download", "--all", "-o", str(tmp_path)])
+        (tmp_path / "image_1.jpg").unlink()
+        client_mock.return_value.get_one_data.reset_mock()
+
+        result = runner.invoke(cli, ["download", "--all", "-o", str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert result.output.startswith(
+            f"Downloading 1 drawn files to {tmp_path}. (2 already downloaded)\n"
+        )
+        client_mock.return_value.get_one_data.assert_called_once_with("drawings", 1)
+
+    def test_with_force_and_since(self, runner, make_client, tmp_path):
+        make_client()
+        runner.invoke(cli, ["download", "--all", "-o", str(tmp_path)])
+
+        result = runner.invoke(
+            cli, ["download", "--all", "-o", str(tmp_path), "--since", "1", "--force"]
+        )
+
+        assert result.exit_code == 0
+        assert result.output.startswith(
+            f"Downloading 2 drawn files to {tmp_path}. (0 already downloaded)\n"
+        )
+
+    def test_with_error(self, runner, make_client, tmp_path):
+        client_mock = make_client()
+        client_mock.return_value.download_file.side_effect = RequestsError("error")
+
+        result = runner.invoke(cli, ["download", "--all", "-o", str(tmp_path)])
+
+        assert result.exit_code == 1
+        assert result.output.count("Error: Download failed.") == 3
+        assert result.output.endswith("Error: 3 of 3 downloads failed.\n")
+        assert not (tmp_path / ".amcli-manifest.jsonl").exists()
+
+    def test_with_os_error(self, runner, make_client, tmp_path):
+        client_mock = make_client()
+        download_mock = client_mock.return_value.download_file
+        write_file = download_mock.side_effect
+
+        def download_file(url, path, **kwargs):
+            if path.name == "movie_image_2.mp4":
+                raise OSError("No space left on device")
+            write_file(url, path, **kwargs)
+
+        download_mock.side_effect = download_file
+
+        result = runner.invoke(cli, ["download", "--all", "-o", str(tmp_path)])
+
+        assert result.exit_code == 1
+        assert result.output.count("Success: Downloaded the file to") == 2
+        assert "Error: Download failed. (drawing id: 2)\nNo space left" in (
+            result.output
+        )
+        assert result.output.endswith("Error: 1 of 3 downloads failed.\n")
+
+    def test_out_is_not_directory(self, runner, make_client, make_path):
+        make_client()
+        path = make_path("image.jpg", is_file=True)
+
+        result = runner.invoke(cli, ["download", "--all", "-o", str(path)])
+
+        assert result.exit_code == 2
+        assert "is not a directory." in result.output
+
+    @pytest.fixture
+    def make_client(self, mocker):
+        def _make_client():
+            client_mock = mocker.MagicMock()
+            client = client_mock.return_value
+            client.get_drawings.return_value = [
+                {"id": 3, "execStatus": "SUCCESS"},
+                {"id": 1, "keypoint": 11, "execStatus": "SUCCESS"},
+                {"id": 2, "comparison": 21, "execStatus": "SUCCESS"},
+            ]
+
+            def get_one_data(endpoint, drawing_id):
+                suffix = ".jpg" if drawing_id == 1 else ".mp4"
+                data = {
+                    "id": drawing_id,
+                    "drawingUrl": f"http://example.com/drawing{suffix}?sig=x",
+                    "execStatus": "SUCCESS",
+                }
+                if drawing_id == 1:
+                    data["keypoint"] = 11
+                elif drawing_id == 2:
+                    data["comparison"] = 21
+                return data
+
+            lists = {
+                "images": [{"id": 101, "name": "image"}],
+                "movies": [{"id": 102, "name": "movie"}],
+                "keypoints": [{"id": 11, "image": 101}, {"id": 12, "movie": 102}],
+                "comparisons": [{"id": 21, "source": 11, "target": 12}],
+            }
+
+            client.get_one_data.side_effect = get_one_data
+            client.get_list_data.side_effect = lambda endpoint: lists[endpoint]
+            client.name_resolver = NameResolver(client, prefetch=False)
+            client.download_file.side_effect = lambda url, path, **kw: path.write_text(
+                "content"
+            )
+            mocker.patch("anymotion_cli.commands.download.get_client", client_mock)
+            return client_mock
+
+        return _make_client
@@ -1,9 +1,11 @@
+from concurrent.futures import Future
 from textwrap import dedent
 
 import pytest
 from anymotion_sdk import RequestsError
+from anymotion_sdk.client import UploadResult
 
-from anymotion_cli.commands.extract import cli
+from anymotion_cli.commands.extract import cli, validate_paths
 
 
 class TestExtract(object):
@@ -83,6 +85,34 @@ class TestExtract(object):
             """
         )
 
+    @pytest.mark.parametrize(
+        "found_id, expected",
+        [
+            (
+                222,
+                "Success: Reused the extracted keypoints. (keypoint id: 222)\n\n",
+            ),
+            (
+                None,
+                "Keypoint extraction started. (keypoint id: 111)\n"
+                "Success: Keypoint extraction is complete.\n\n",
+            ),
+        ],
+    )
+    def test_with_reuse(self, runner, make_client, found_id, expected):
+        client_mock = make_client(with_drawing=True)
+        client = client_mock.return_value
+        client.find_keypoint.return_value = found_id
+
+        result = runner.invoke(
+            cli, ["extract", "--image-id", "333", "--reuse", "--with-drawing"]
+        )
+
+        assert result.exit_code == 0
+        assert result.output == expected
+        client.find_keypoint.assert_called_once_with(image_id=333, movie_id=None)
+        assert client.extract_keypoint.call_count == (0 if found_id else 1)
+
     @pytest.mark.parametrize(
         "with_extract_exception, with_wait_exception", [(True, True), (False, True)]
     )
@@ -105,27 +135,42 @@ class TestExtract(object):
             (
                 ["extract"],
                 False,
-                "Error: Either '--image-id' or '--movie-id' or '--path' is required\n",
+                (
+                    "Error: Either '--image-id', '--movie-id', '--path', "
+                    "'--image-ids' or '--movie-ids' is required\n"
+                ),
             ),
             (
                 ["extract", "--image-id", "1", "--movie-id", "1"],
                 False,
-                "Error: Either '--image-id' or '--movie-id' or '--path' is required\n",
+                (
+                    "Error: Either '--image-id', '--movie-id', '--path', "
+                    "'--image-ids' or '--movie-ids' is required\n"
+                ),
             ),
             (
                 ["extract", "--image-id", "1", "--path", "<path>"],
                 True,
-                "Error: Either '--image-id' or '--movie-id' or '--path' is required\n",
+                (
+                    "Error: Either '--image-id', '--movie-id', '--path', "
+                    "'--image-ids' or '--movie-ids' is required\n"
+                ),
             ),
             (
                 ["extract", "--movie-id", "1", "--path", "<path>"],
                 True,
-                "Error: Either '--image-id' or '--movie-id' or '--path' is required\n",
+                (
+                    "Error: Either '--image-id', '--movie-id', '--path', "
+                    "'--image-ids' or '--movie-ids' is required\n"
+                ),
             ),
             (
                 ["extract", "--image-id", "1", "--movie-id", "1", "--path", "<path>"],
                 True,
-                "Error: Either '--image-id' or '--movie-id' or '--path' is required\n",
+                (
+                    "Error: Either '--image-id', '--movie-id', '--path', "
+                    "'--image-ids' or '--movie-ids' is required\n"
+                ),
             ),
             (
                 ["extract", "--image-id"],
@@ -223,3 +268,220 @@ class TestExtract(object):
             return client_mock
 
         return _make_client
+
+
+class TestExtractBatch(object):
+    @pytest.mark.parametrize(
+        "args, expected_label",
+        [
+            (["extract", "--image-ids", "1,2"], "image id"),
+            (["extract", "--movie-ids", "1, 2"], "movie id"),
+        ],
+    )
+    def test_valid_with_ids(self, runner, make_client, args, expected_label):
+        client_mock = make_client()
+
+        result = runner.invoke(cli, args)
+
+        assert client_mock.call_count == 1
+        assert result.exit_code == 0
+        assert result.output.startswith("Keypoint extraction started for 2 items.\n")
+        for media_id in [1, 2]:
+            assert (
+                "Success: Keypoint extraction is complete. "
+                f"({expected_label}: {media_id}, keypoint id: {media_id + 100})"
+            ) in result.output
+        assert client_mock.return_value.submit_wait.call_count == 2
+
+    @pytest.mark.parametrize("pattern", ["<dir>", "<dir>/*.jpg"])
+    def test_valid_with_paths(self, runner, make_path, make_client, pattern):
+        directory = make_path("images", is_dir=True)
+        for name in ["a.jpg", "b.jpg", "c.txt"]:
+            (directory / name).touch()
+        client_mock = make_client()
+
+        result = runner.invoke(
+            cli, ["extract", "--path", pattern.replace("<dir>", str(directory))]
+        )
+
+        assert result.exit_code == 0
+        assert "Keypoint extraction started for 2 items." in result.output
+        assert client_mock.return_value.upload.call_count == 2
+        assert result.output.count("Success: Keypoint extraction is complete.") == 2
+
+    def test_run_is_recorded_with_absolute_paths(
+        self, monkeypatch, runner, make_path, make_client
+    ):
+        directory = make_path("images", is_dir=True)
+        for name in ["a.jpg", "b.jpg"]:
+            (directory / name).touch()
+        monkeypatch.chdir(directory)
+        client_mock = make_client()
+
+        result = runner.invoke(cli, ["extract", "--path", "*.jpg"])
+
+        assert result.exit_code == 0
+        journal = client_mock.return_value.job_journal
+        journal.start_run.assert_called_once_with(
+            "extract",
+            [{"path": directory.resolve() / name} for name in ["a.jpg", "b.jpg"]],
+            {"reuse": False},
+        )
+
+    def test_unreadable_path(self, runner, make_path, make_client):
+        directory = make_path("images", is_dir=True)
+        for name in ["a.jpg", "b.jpg"]:
+            (directory / name).touch()
+        client_mock = make_client()
+        client = client_mock.return_value
+
+        def find_uploaded(path):
+            if path.name == "a.jpg":
+                raise PermissionError("Permission denied")
+            return None
+
+        client.find_uploaded.side_effect = find_uploaded
+
+        result = runner.invoke(cli, ["extract", "--path", str(directory)])
+
+        assert result.exit_code == 1
+        assert "Permission denied" in result.output
+        assert result.output.count("Success: Keypoint extraction is complete.") == 1
+        assert result.output.endswith("Error: 1 of 2 keypoint extractions failed.\n")
+        client.job_journal.finish_run.assert_called_once()
+
+    def test_uploaded_paths_are_skipped(self, runner, make_path, make_client):
+        directory = make_path("images", is_dir=True)
+        for name in ["a.jpg", "b.jpg"]:
+            (directory / name).touch()
+        client_mock = make_client()
+        client = client_mock.return_value
+        client.find_uploaded.return_value = UploadResult(image_id=1, movie_id=None)
+
+        result = runner.invoke(cli, ["extract", "--path", str(directory)])
+
+        assert result.exit_code == 0
+        assert client.find_uploaded.call_count == 2
+        assert client.upload.call_count == 0
+        assert result.output.count("Success: Keypoint extraction is complete.") == 2
+
+    def test_with_reuse(self, runner, make_client):
+        client_mock = make_client()
+        client = client_mock.return_value
+        # all the keypoints are listed once for the batch
+        client.find_keypoint.side_effect = lambda image_id, movie_id, prefetch: (
+            222 if image_id == 2 and prefetch else None
+        )
+
+        result = runner.invoke(cli, ["extract", "--image-ids", "1,2", "--reuse"])
+
+        assert result.exit_code == 0
+        assert (
+            "Success: Reused the extracted keypoints. (image id: 2, keypoint id: 222)"
+        ) in result.output
+        assert result.output.count("Success: Keypoint extraction is complete.") == 1
+        assert client.extract_keypoint.call_count == 1
+
+    def test_failed_item(self, runner, make_client):
+        client_mock = make_client(failed_ids=[2])
+
+        result = runner.invoke(cli, ["extract", "--image-ids", "1,2,3"])
+
+        assert client_mock.call_count == 1
+        assert result.exit_code == 1
+        assert result.output.count("Success: Keypoint extraction is complete.") == 2
+        assert (
+            "Error: Keypoint extraction failed. (image id: 2, keypoint id: 102)\n"
+            "message\n"
+        ) in result.output
+        assert result.output.endswith("Error: 1 of 3 keypoint extractions failed.\n")
+
+    def test_with_requests_error(self, runner, make_client):
+        client_mock = make_client()
+        client_mock.return_value.extract_keypoint.side_effect = RequestsError("error")
+
+        result = runner.invoke(cli, ["extract", "--movie-ids", "1,2"])
+
+        assert result.exit_code == 1
+        assert result.output.count("Error: Keypoint extraction failed.") == 2
+
+    @pytest.mark.parametrize(
+        "args, expected",
+        [
+            (
+                ["extract", "--image-ids", "1,a"],
+                "Error: Invalid value for '--image-ids': "
+                "1,a is not a comma separated list of integers\n",
+            ),
+            (
+                ["extract", "--path", "<dir>/*.mp4"],
+                "Error: Invalid value for '--path': No movie or image file matches",
+            ),
+            (
+                ["extract", "--image-ids", "1,2", "--movie-ids", "3"],
+                "Error: Either '--image-id', '--movie-id', '--path', "
+                "'--image-ids' or '--movie-ids' is required\n",
+            ),
+        ],
+    )
+    def test_invalid_params(self, runner, make_path, make_client, args, expected):
+        directory = make_path("images", is_dir=True)
+        args = [arg.replace("<dir>", str(directory)) for arg in args]
+        client_mock = make_client()
+
+        result = runner.invoke(cli, args)
+
+        assert client_mock.call_count == 0
+        assert result.exit_code == 2
+        assert expected in result.output
+
+    @pytest.fixture
+    def make_client(self, mocker):
+        def _make_client(failed_ids=[]):
+            client_mock = mocker.MagicMock()
+
+            client_mock.return_value.find_uploaded.return_value = None
+            client_mock.return_value.upload.return_value._asdict.return_value = {
+                "image_id": 1,
+                "movie_id": None,
+            }
+
+            def extract_keypoint(data):
+                return (data.get("image_id") or data.get("movie_id")) + 100
+
+            def submit_wait(endpoint, keypoint_id):
+                response = mocker.MagicMock()
+                if keypoint_id - 100 in failed_ids:
+                    response.status = "FAILURE"
+                    response.failure_detail = "message"
+                else:
+                    response.status = "SUCCESS"
+                future = Future()
+                future.set_result(response)
+                return future
+
+            client_mock.return_value.extract_keypoint.side_effect = extract_keypoint
+            client_mock.return_value.submit_wait.side_effect = submit_wait
+
+            mocker.patch("anymotion_cli.commands.extract.get_client", client_mock)
+            return client_mock
+
+        return _make_client
+
+
+@pytest.mark.parametrize(
+    "names, value, expected",
+    [
+        (["clip[1].jpg", "clip1.jpg"], "clip[1].jpg", ["clip[1].jpg"]),
+        (["clip1.jpg", "clip2.jpg"], "clip[1].jpg", ["clip1.jpg"]),
+        (["a.jpg", "b.mp4", "c.txt"], "*", ["a.jpg", "b.mp4"]),
+    ],
+)
+def test_validate_paths(make_path, names, value, expected):
+    directory = make_path("images", is_dir=True)
+    for name in names:
+        (directory / name).touch()
+
+    paths = validate_paths(None, None, str(directory / value))
+
+    assert paths == [directory / name for name in expected]
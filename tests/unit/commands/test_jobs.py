@@ -0,0 +1,186 @@
+from concurrent.futures import Future
+
+import pytest
+from anymotion_sdk import RequestsError
+
+from anymotion_cli.commands.jobs import cli
+from anymotion_cli.journal import JobJournal
+
+
+class TestJobsList(object):
+    def test_valid(self, runner, make_client):
+        client = make_client().return_value
+        client.job_journal.add("keypoints", 1, {"image_id": 2})
+        client.job_journal.add("drawings", 3, {"keypoint_id": 1, "rule": [0] * 20})
+        client.job_journal.update("keypoints", 1, "SUCCESS")
+
+        result = runner.invoke(cli, ["jobs", "list"])
+
+        assert result.exit_code == 0
+        lines = result.output.splitlines()
+        assert lines[0].split() == ["Endpoint", "ID", "Status", "Started", "Inputs"]
+        assert lines[2].split()[:3] == ["drawings", "3", "PROCESSING"]
+        assert lines[2].endswith("...")
+        assert lines[3].split()[:3] == ["keypoints", "1", "SUCCESS"]
+
+        result = runner.invoke(cli, ["jobs", "list", "--in-progress"])
+
+        assert len(result.output.splitlines()) == 3
+
+    def test_no_jobs(self, runner, make_client):
+        make_client()
+
+        result = runner.invoke(cli, ["jobs", "list"])
+
+        assert result.exit_code == 0
+        assert result.output == "There are no jobs.\n"
+
+
+class TestJobsWait(object):
+    def test_valid(self, runner, make_client):
+        client = make_client().return_value
+        client.job_journal.add("keypoints", 1, {"image_id": 2})
+        client.job_journal.add("drawings", 3, {"keypoint_id": 1})
+        client.job_journal.add("analyses", 4, {"keypoint_id": 1})
+        client.job_journal.update("analyses", 4, "SUCCESS")
+
+        result = runner.invoke(cli, ["jobs", "wait"])
+
+        assert result.exit_code == 0
+        assert result.output.startswith("Waiting for 2 jobs.\n")
+        assert (
+            "Success: Keypoint extraction is complete. (keypoint id: 1)"
+        ) in result.output
+        assert "Success: Drawing is complete. (drawing id: 3)" in result.output
+        assert client.submit_wait.call_count == 2
+
+    def test_failed_job(self, runner, make_client):
+        client = make_client().return_value
+        client.job_journal.add("keypoints", 1, {"image_id": 2})
+        client.job_journal.add("keypoints", 2, {"image_id": 3})
+        client.job_journal.add("drawings", 3, {"keypoint_id": 2})
+        client.job_journal.add("analyses", 4, {"keypoint_id": 2})
+        errors = {3: RequestsError("error"), 4: KeyError("execStatus")}
+        client.submit_wait.side_effect = _submit_wait(errors.get, failed_ids=[1])
+
+        result = runner.invoke(cli, ["jobs", "wait"])
+
+        assert result.exit_code == 1
+        assert (
+            "Error: Keypoint extraction failed. (keypoint id: 1)\nmessage\n"
+        ) in result.output
+        assert "Error: Drawing failed. (drawing id: 3)\nerror\n" in result.output
+        assert "Error: Analysis failed. (analysis id: 4)\n" in result.output
+        assert result.output.endswith("Error: 3 of 4 jobs failed.\n")
+
+    def test_no_jobs(self, runner, make_client):
+        make_client()
+
+        result = runner.invoke(cli, ["jobs", "wait"])
+
+        assert result.exit_code == 0
+        assert result.output == "There are no jobs in progress.\n"
+
+
+class TestJobsResume(object):
+    def test_valid(self, mocker, runner, make_path, make_client):
+        client_mock = make_client()
+        client = client_mock.return_value
+        mocker.patch("anymotion_cli.commands.extract.get_client", client_mock)
+        path = make_path("image.jpg", is_file=True)
+        journal = client.job_journal
+        run_id = journal.start_run("extract", [{"image_id": 1}, {"path": path}])
+        journal.add("keypoints", 101, {"image_id": 1})
+
+        result = runner.invoke(cli, ["jobs", "resume"])
+
+        assert result.exit_code == 0
+        assert result.output.startswith(
+            f"Resuming the batch run. (run id: {run_id})\n"
+            "Keypoint extraction started for 2 items.\n"
+        )
+        assert result.output.count("Success: Keypoint extraction is complete.") == 2
+        # the job already started is waited for instead of being started again
+        client.extract_keypoint.assert_called_once_with(
+            data={"image_id": 5, "movie_id": None}
+        )
+        assert client.upload.call_args[0] == (path,)
+        assert journal.get_run(run_id)["finished"] is True
+        assert journal.get_run() is None
+
+    @pytest.mark.parametrize("reuse", [True, False])
+    def test_with_reuse(self, mocker, runner, make_client, reuse):
+        client_mock = make_client()
+        client = client_mock.return_value
+        client.find_keypoint.return_value = 200
+        mocker.patch("anymotion_cli.commands.extract.get_client", client_mock)
+        client.job_journal.start_run("extract", [{"image_id": 1}], {"reuse": reuse})
+
+        result = runner.invoke(cli, ["jobs", "resume"])
+
+        assert result.exit_code == 0
+        assert client.find_keypoint.called is reuse
+        assert client.extract_keypoint.called is not reuse
+
+    def test_no_run(self, runner, make_client):
+        make_client()
+
+        result = runner.invoke(cli, ["jobs", "resume"])
+
+        assert result.exit_code == 1
+        assert result.output == "Error: There is no batch run to resume.\n"
+
+    def test_unsupported_run(self, runner, make_client):
+        client = make_client().return_value
+        run_id = client.job_journal.start_run("draw", [])
+
+        result = runner.invoke(cli, ["jobs", "resume", str(run_id)])
+
+        assert result.exit_code == 1
+        assert result.output == "Error: Unable to resume the run of draw.\n"
+
+
+@pytest.fixture
+def make_client(mocker, tmp_path):
+    def _make_client(failed_ids=[]):
+        client_mock = mocker.MagicMock()
+        client = client_mock.return_value
+
+        client.job_journal = JobJournal(tmp_path / "jobs.sqlite3", "scope")
+        client.find_uploaded.return_value = None
+        client.upload.return_value._asdict.return_value = {
+            "image_id": 5,
+            "movie_id": None,
+        }
+        client.extract_keypoint.side_effect = lambda data: data["image_id"] + 100
+        client.submit_wait.side_effect = _submit_wait(
+            lambda job_id: None, failed_ids=failed_ids
+        )
+
+        mocker.patch("anymotion_cli.commands.jobs.get_client", client_mock)
+        return client_mock
+
+    return _make_client
+
+
+def _submit_wait(get_error, failed_ids):
+    def submit_wait(endpoint, job_id):
+        future = Future()
+        error = get_error(job_id)
+        if error is not None:
+            future.set_exception(error)
+            return future
+
+        response = JobResultMock()
+        if job_id in failed_ids:
+            response.status = "FAILURE"
+            response.failure_detail = "message"
+        future.set_result(response)
+        return future
+
+    return submit_wait
+
+
+class JobResultMock(object):
+    status = "SUCCESS"
+    failure_detail = None
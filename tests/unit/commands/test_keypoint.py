@@ -1,9 +1,12 @@
+import json
 from textwrap import dedent
 
+import numpy as np
 import pytest
 from anymotion_sdk import RequestsError
 
 from anymotion_cli.commands.keypoint import cli
+from anymotion_cli.keypoints import KeypointArray, KeypointStore
 
 
 def test_keypoint(runner):
@@ -252,6 +255,153 @@ class TestKeypointShow(object):
         return _make_client
 
 
+class TestKeypointExport(object):
+    def test_valid(self, runner, make_path, make_client):
+        out = make_path("out", is_dir=True)
+        client_mock = make_client()
+
+        result = runner.invoke(cli, ["keypoint", "export", "111", "-o", str(out)])
+
+        assert client_mock.call_count == 1
+        assert result.exit_code == 0
+        assert result.output == (
+            f"Success: Keypoints are exported to {out / '111.npz'}. "
+            "(2 frames, 17 joints)\n"
+        )
+        with np.load(str(out / "111.npz")) as data:
+            assert data["points"].shape == (2, 17, 2)
+            assert json.loads(str(data["meta"])) == {
+                "keypoint_id": 111,
+                "image_id": 2,
+            }
+
+    def test_file_exists(self, runner, make_path, make_client):
+        path = make_path("keypoint.npz", is_file=True)
+        make_client()
+
+        result = runner.invoke(cli, ["keypoint", "export", "111", "-o", str(path)])
+
+        assert result.exit_code == 1
+        assert result.output.startswith("Error: File already exists:")
+
+        result = runner.invoke(
+            cli, ["keypoint", "export", "111", "-o", str(path), "--force"]
+        )
+
+        assert result.exit_code == 0
+        assert path.stat().st_size > 0
+
+    def test_without_pyarrow(self, mocker, runner, make_path, make_client):
+        make_client()
+        mocker.patch.dict("sys.modules", {"pyarrow": None})
+        path = make_path("keypoint.parquet", exists=False)
+
+        result = runner.invoke(
+            cli, ["keypoint", "export", "111", "--format", "parquet", "-o", str(path)]
+        )
+
+        assert result.exit_code == 1
+        assert result.output == (
+            "Error: pyarrow is required to export to parquet. "
+            "Install it with 'pip install anymotion-cli[arrow]'.\n"
+        )
+
+    def test_not_success(self, runner, make_path, make_client):
+        make_client(status="FAILURE")
+
+        result = runner.invoke(
+            cli, ["keypoint", "export", "111", "-o", str(make_path("out", is_dir=True))]
+        )
+
+        assert result.exit_code == 1
+        assert result.output == "Error: Status is not SUCCESS.\n"
+
+    @pytest.fixture
+    def make_client(self, mocker):
+        def _make_client(status="SUCCESS"):
+            client_mock = mocker.MagicMock()
+            client_mock.return_value.get_keypoint.return_value = {
+                "id": 111,
+                "image": 2,
+                "movie": None,
+                "keypoint": [{"nose": [1, 2]}, {"leftEye": [3, 4]}],
+                "execStatus": status,
+            }
+            mocker.patch("anymotion_cli.commands.keypoint.get_client", client_mock)
+            return client_mock
+
+        return _make_client
+
+
+class TestKeypointSync(object):
+    def test_valid(self, runner, make_client, store):
+        store.add(KeypointArray.from_frames([], meta={"keypoint_id": 1}))
+        client_mock = make_client()
+
+        result = runner.invoke(cli, ["keypoint", "sync"])
+
+        assert result.exit_code == 0
+        assert result.output.startswith(
+            f"Saving 2 keypoints to {store.directory}. (1 already saved)\n"
+        )
+        assert result.output.count("Success: Saved the keypoints.") == 2
+        assert store.ids() == [1, 2, 3]
+        assert store.load(2).points.shape == (1, 17, 2)
+        assert store.load(3).meta["fps"] == 30
+        assert client_mock.return_value.get_one_data.call_count == 2
+        calls = client_mock.return_value.get_one_data.call_args_list
+        assert all(x[1] == {"use_cache": False} for x in calls)
+
+        result = runner.invoke(cli, ["keypoint", "sync"])
+
+        assert result.exit_code == 0
+        assert result.output == (
+            f"Saving 0 keypoints to {store.directory}. (3 already saved)\n"
+        )
+
+    def test_with_error(self, runner, make_client, store):
+        client_mock = make_client()
+        client_mock.return_value.get_one_data.side_effect = RequestsError("error")
+
+        result = runner.invoke(cli, ["keypoint", "sync"])
+
+        assert result.exit_code == 1
+        assert result.output.count("Error: Saving the keypoints failed.") == 3
+        assert result.output.endswith("Error: 3 of 3 keypoints failed to save.\n")
+
+    @pytest.fixture
+    def store(self, mocker, tmp_path):
+        store = KeypointStore(tmp_path / "keypoints", "scope")
+        mocker.patch("anymotion_cli.commands.keypoint.get_settings")
+        mocker.patch(
+            "anymotion_cli.commands.keypoint.get_keypoint_store", return_value=store
+        )
+        yield store
+
+    @pytest.fixture
+    def make_client(self, mocker):
+        def _make_client():
+            client_mock = mocker.MagicMock()
+            client = client_mock.return_value
+            client.get_keypoints.return_value = [
+                {"id": 1, "image": 11, "movie": None},
+                {"id": 2, "image": 12, "movie": None},
+                {"id": 3, "image": None, "movie": 13},
+            ]
+            client.get_list_data.return_value = [{"id": 13, "fps": 30}]
+            client.get_one_data.side_effect = lambda endpoint, keypoint_id, **kwargs: {
+                "id": keypoint_id,
+                "image": 12 if keypoint_id == 2 else None,
+                "movie": 13 if keypoint_id == 3 else None,
+                "keypoint": [{"nose": [1, 2]}],
+                "execStatus": "SUCCESS",
+            }
+            mocker.patch("anymotion_cli.commands.keypoint.get_client", client_mock)
+            return client_mock
+
+        return _make_client
+
+
 class TestKeypointList(object):
     @pytest.mark.parametrize(
         "args",
@@ -282,6 +432,22 @@ class TestKeypointList(object):
             """
         )
 
+    def test_with_ndjson(self, runner, make_client):
+        client_mock = make_client()
+        client_mock.return_value.iter_list_data.return_value = iter(
+            [[{"id": 1}, {"id": 2}], [{"id": 3}]]
+        )
+
+        result = runner.invoke(
+            cli, ["keypoint", "list", "--status", "SUCCESS", "--format", "ndjson"]
+        )
+
+        client_mock.return_value.iter_list_data.assert_called_once_with(
+            "keypoints", params={"execStatus": "SUCCESS"}
+        )
+        assert result.exit_code == 0
+        assert result.output == '{"id":1}\n{"id":2}\n{"id":3}\n'
+
     def test_with_spinner(self, monkeypatch, runner, make_client):
         monkeypatch.setenv("ANYMOTION_USE_SPINNER", "true")
         client_mock = make_client()
@@ -0,0 +1,224 @@
+import json
+from concurrent.futures import Future
+
+import pytest
+from anymotion_sdk.client import UploadResult
+
+from anymotion_cli.commands.pipeline import DEFAULT_CONCURRENCY, cli, load_spec
+from anymotion_cli.exceptions import ClickException
+
+
+class TestRun(object):
+    def test_valid(self, runner, make_path, make_client):
+        make_path("image.jpg", is_file=True)
+        spec_file = make_spec(
+            make_path,
+            {
+                "inputs": ["*.jpg", {"image_id": 2}, {"keypoint_id": 303}],
+                "analyze": [{"rule": [{"analysisType": "a"}]}, {"rule": {"b": 1}}],
+                "compare": {"target": {"keypoint_id": 303}},
+                "draw": {"rule": [{"drawingType": "a"}]},
+                "download": {"out": "drawn"},
+            },
+        )
+        client_mock = make_client()
+        client = client_mock.return_value
+
+        result = runner.invoke(cli, ["pipeline", "run", str(spec_file)])
+
+        assert result.exit_code == 0
+        assert "Pipeline started for 3 inputs." in result.output
+        assert client.upload.call_count == 1
+        assert client.extract_keypoint.call_count == 2
+        assert client.analyze_keypoint.call_count == 6
+        # the target is not compared with itself
+        assert client.compare_keypoint.call_count == 2
+        assert client.draw_keypoint.call_count == 3
+        files = sorted(p.name for p in (spec_file.parent / "drawn").iterdir())
+        assert files == ["name_2101.mp4", "name_2102.mp4", "name_2303.mp4"]
+
+    def test_failed_stage(self, runner, make_path, make_client):
+        spec_file = make_spec(
+            make_path,
+            {
+                "inputs": [{"image_id": 1}, {"image_id": 2}],
+                "analyze": [{"rule": {}}],
+                "draw": {},
+            },
+        )
+        client_mock = make_client(failed=[("keypoints", 102)])
+        client = client_mock.return_value
+
+        result = runner.invoke(cli, ["pipeline", "run", str(spec_file)])
+
+        assert result.exit_code == 1
+        assert (
+            "Error: Keypoint extraction failed. (image id: 2)\nmessage\n"
+        ) in result.output
+        assert result.output.endswith("Error: 1 of 4 stages failed.\n")
+        client.analyze_keypoint.assert_called_once_with(101, {})
+        assert client.draw_keypoint.call_count == 1
+
+    def test_unexpected_errors(self, runner, make_path, make_client):
+        make_path("image.jpg", is_file=True)
+        spec_file = make_spec(
+            make_path,
+            {"inputs": ["image.jpg", {"image_id": 2}], "analyze": [{"rule": {}}]},
+        )
+        client_mock = make_client()
+        client = client_mock.return_value
+        client.upload.side_effect = FileNotFoundError("No such file")
+        client.analyze_keypoint.side_effect = ValueError("invalid response")
+
+        result = runner.invoke(cli, ["pipeline", "run", str(spec_file)])
+
+        assert result.exit_code == 1
+        assert "Error: Upload failed. (path: " in result.output
+        assert "No such file\n" in result.output
+        assert (
+            "Error: Analysis failed. (image id: 2)\ninvalid response\n"
+        ) in result.output
+        assert result.output.endswith("Error: 2 of 3 stages failed.\n")
+
+    def test_with_reuse(self, runner, make_path, make_client):
+        spec_file = make_spec(
+            make_path, {"inputs": [{"movie_id": 1}], "extract": {"reuse": True}}
+        )
+        client_mock = make_client()
+        client = client_mock.return_value
+        client.find_keypoint.return_value = 333
+
+        result = runner.invoke(cli, ["pipeline", "run", str(spec_file)])
+
+        assert result.exit_code == 0
+        assert (
+            "Success: Reused the extracted keypoints. (movie id: 1, keypoint id: 333)"
+        ) in result.output
+        assert client.extract_keypoint.call_count == 0
+
+    def test_invalid_spec(self, runner, make_path, make_client):
+        spec_file = make_spec(make_path, {"inputs": []})
+        client_mock = make_client()
+
+        result = runner.invoke(cli, ["pipeline", "run", str(spec_file)])
+
+        assert result.exit_code == 1
+        assert result.output == (
+            "Error: Invalid spec: 'inputs' must be a non-empty list.\n"
+        )
+        assert client_mock.call_count == 0
+
+    @pytest.fixture
+    def make_client(self, mocker, tmp_path):
+        def _make_client(failed=[]):
+            client_mock = mocker.MagicMock()
+            client = client_mock.return_value
+
+            client.find_uploaded.return_value = None
+            client.upload.return_value = UploadResult(image_id=1, movie_id=None)
+            client.find_keypoint.return_value = None
+            client.extract_keypoint.side_effect = lambda data: (
+                (data.get("image_id") or data.get("movie_id")) + 100
+            )
+            client.analyze_keypoint.side_effect = lambda keypoint_id, rule: (
+                keypoint_id + 1000
+            )
+            client.compare_keypoint.side_effect = lambda source_id, target_id: (
+                source_id + 3000
+            )
+            client.draw_keypoint.side_effect = lambda keypoint_id, **kwargs: (
+                keypoint_id + 2000
+            )
+            client.get_one_data.return_value = {
+                "drawingUrl": "http://example.com/drawing.mp4",
+                "execStatus": "SUCCESS",
+            }
+            client.name_resolver.drawing_name.return_value = "name"
+            client.download_file.side_effect = lambda url, path, **kwargs: (
+                path.write_text("content")
+            )
+
+            def submit_wait(endpoint, job_id):
+                response = mocker.MagicMock()
+                if (endpoint, job_id) in failed:
+                    response.status = "FAILURE"
+                    response.failure_detail = "message"
+                else:
+                    response.status = "SUCCESS"
+                future = Future()
+                future.set_result(response)
+                return future
+
+            client.submit_wait.side_effect = submit_wait
+
+            mocker.patch("anymotion_cli.commands.pipeline.get_client", client_mock)
+            return client_mock
+
+        return _make_client
+
+
+class TestLoadSpec(object):
+    def test_defaults(self, make_path):
+        spec = load_spec(make_spec(make_path, {"inputs": [{"image_id": 1}]}))
+
+        assert spec == {
+            "inputs": [{"image_id": 1}],
+            "extract": {"reuse": False},
+            "analyze": [],
+            "compare": None,
+            "draw": None,
+            "download": None,
+            "concurrency": DEFAULT_CONCURRENCY,
+        }
+
+    def test_yaml(self, make_path):
+        make_path("rule.json", is_file=True, content='{"rule": 1}')
+        path = make_path(
+            "spec.yaml",
+            is_file=True,
+            content=(
+                "inputs:\n"
+                "  - movie_id: 1\n"
+                "draw:\n"
+                "  rule_file: rule.json\n"
+                "concurrency:\n"
+                "  draw: 2\n"
+            ),
+        )
+
+        spec = load_spec(path)
+
+        assert spec["draw"] == {"rule": {"rule": 1}, "background_rule": None}
+        assert spec["concurrency"]["draw"] == 2
+
+    @pytest.mark.parametrize(
+        "data, expected",
+        [
+            ([], "It must be an object."),
+            ({"inputs": [1]}, "Invalid input: 1."),
+            ({"inputs": ["*.mp4"]}, "No movie or image file matches"),
+            ({"inputs": [{"image_id": 1}], "unknown": 1}, "Unknown keys: unknown"),
+            ({"inputs": [{"image_id": 1}], "download": {}}, "requires 'draw'"),
+            (
+                {"inputs": [{"image_id": 1}], "concurrency": {"draw": 0}},
+                "'concurrency.draw' must be a positive integer.",
+            ),
+            (
+                {"inputs": [{"image_id": 1}], "analyze": [{"rule": {}}, {}]},
+                "'analyze[1]' requires 'rule' or 'rule_file'.",
+            ),
+            (
+                {"inputs": [{"image_id": 1}], "draw": {"rule": 1, "rule_file": "a"}},
+                "'rule' and 'rule_file' cannot be used at the same time.",
+            ),
+        ],
+    )
+    def test_invalid(self, make_path, data, expected):
+        with pytest.raises(ClickException) as excinfo:
+            load_spec(make_spec(make_path, data))
+
+        assert expected in excinfo.value.format_message()
+
+
+def make_spec(make_path, data):
+    return make_path("spec.json", is_file=True, content=json.dumps(data))
@@ -1,7 +1,9 @@
 import pytest
 from anymotion_sdk import FileTypeError, RequestsError
+from anymotion_sdk.client import UploadResult
 
 from anymotion_cli.commands.upload import cli
+from anymotion_cli.output import TransferProgress
 
 
 class TestUpload(object):
@@ -22,6 +24,33 @@ class TestUpload(object):
         assert result.output == expected
         assert client_mock.call_count == 1
 
+    def test_with_spinner(self, monkeypatch, runner, make_path, make_client):
+        monkeypatch.setenv("ANYMOTION_USE_SPINNER", "true")
+        path = make_path("movie.mp4", is_file=True)
+        client_mock = make_client(media_type="movie")
+
+        result = runner.invoke(cli, ["upload", str(path)])
+
+        assert result.exit_code == 0
+        assert "Uploading..." in result.output
+        progress = client_mock.return_value.upload.call_args[1]["progress"]
+        assert isinstance(progress, TransferProgress)
+
+    def test_uploaded_file(self, runner, make_path, make_client):
+        path = make_path("image.jpg", is_file=True)
+        client_mock = make_client()
+        client = client_mock.return_value
+        client.find_uploaded.return_value = UploadResult(image_id=2, movie_id=None)
+
+        result = runner.invoke(cli, ["upload", str(path)])
+
+        assert result.exit_code == 0
+        assert result.output == (
+            f"Success: Skipped the upload of {path} because the same content "
+            "has already been uploaded. (image id: 2)\n"
+        )
+        assert client.upload.call_count == 0
+
     def test_with_RequestsError(self, runner, make_path, make_client):
         path = make_path("image.jpg", is_file=True)
         client_mock = make_client(with_requests_error=True)
@@ -104,6 +133,7 @@ class TestUpload(object):
             media_type="image", with_file_type_error=False, with_requests_error=False
         ):
             client_mock = mocker.MagicMock()
+            client_mock.return_value.find_uploaded.return_value = None
 
             if with_file_type_error:
                 client_mock.return_value.upload.side_effect = FileTypeError()
@@ -0,0 +1,137 @@
+import asyncio
+from concurrent.futures import Future
+
+import pytest
+from anymotion_sdk import RequestsError
+
+from anymotion_cli import aio
+from anymotion_cli.aio import AsyncClient, map_unordered
+from anymotion_cli.client import CliClient
+
+
+class TestAsyncClient(object):
+    def test_call(self, mocker):
+        client = mocker.MagicMock()
+        client.extract_keypoint.return_value = 1
+        aclient = AsyncClient(client)
+
+        keypoint_id = aio.run(aclient.extract_keypoint(image_id=1))
+
+        assert keypoint_id == 1
+        client.extract_keypoint.assert_called_once_with(image_id=1)
+
+    def test_call_with_requests_error(self, mocker):
+        client = mocker.MagicMock()
+        client.get_one_data.side_effect = RequestsError("error")
+        aclient = AsyncClient(client)
+
+        with pytest.raises(RequestsError):
+            aio.run(aclient.get_one_data("images", 1))
+
+    def test_wait_for(self, mocker):
+        future = Future()
+        client = mocker.MagicMock()
+        client.submit_wait.return_value = future
+        aclient = AsyncClient(client)
+
+        async def main():
+            task = asyncio.ensure_future(aclient.wait_for_drawing(1))
+            await asyncio.sleep(0.01)
+            assert not task.done()
+            future.set_result("result")
+            return await task
+
+        assert aio.run(main()) == "result"
+        client.submit_wait.assert_called_once_with("drawings", 1)
+
+    def test_connection_pool_size(self):
+        client = CliClient(
+            client_id="client_id",
+            client_secret="client_secret",
+            api_url="http://api.example.com/anymotion/v1/",
+        )
+        max_retries = client.session.session.get_adapter("https://").max_retries
+
+        AsyncClient(client, max_workers=32)
+
+        adapter = client.session.session.get_adapter("https://")
+        assert adapter._pool_maxsize == 32
+        assert adapter.max_retries is max_retries
+
+    def test_connection_pool_is_kept(self):
+        client = CliClient(
+            client_id="client_id",
+            client_secret="client_secret",
+            api_url="http://api.example.com/anymotion/v1/",
+        )
+        AsyncClient(client, max_workers=32)
+        adapter = client.session.session.get_adapter("https://")
+
+        AsyncClient(client, max_workers=4)
+
+        assert client.session.session.get_adapter("https://") is adapter
+
+    def test_old_connection_pool_is_closed(self, mocker):
+        client = CliClient(
+            client_id="client_id",
+            client_secret="client_secret",
+            api_url="http://api.example.com/anymotion/v1/",
+        )
+        adapter = client.session.session.get_adapter("https://")
+        close = mocker.patch.object(adapter, "close")
+
+        AsyncClient(client, max_workers=4, connections=32)
+
+        close.assert_called_once_with()
+        new_adapter = client.session.session.get_adapter("https://")
+        assert new_adapter._pool_maxsize == 32
+
+
+class TestMapUnordered(object):
+    def test_order_of_completion(self):
+        async def func(x):
+            await asyncio.sleep(x / 100)
+            return x * 10
+
+        async def main():
+            return [
+                (item, task.result())
+                async for item, task in map_unordered(func, [3, 1, 2], 3)
+            ]
+
+        assert aio.run(main()) == [(1, 10), (2, 20), (3, 30)]
+
+    def test_jobs(self):
+        running = []
+        max_running = []
+
+        async def func(x):
+            running.append(x)
+            max_running.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(x)
+
+        async def main():
+            async for _ in map_unordered(func, range(10), 3):
+                pass
+
+        aio.run(main())
+
+        assert max(max_running) == 3
+
+    def test_exception(self):
+        async def func(x):
+            if x == 2:
+                raise ValueError()
+            return x
+
+        async def main():
+            results = {}
+            async for item, task in map_unordered(func, [1, 2], 2):
+                results[item] = task.exception()
+            return results
+
+        results = aio.run(main())
+
+        assert results[1] is None
+        assert isinstance(results[2], ValueError)
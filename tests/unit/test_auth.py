@@ -0,0 +1,93 @@
+import stat
+import time
+
+import pytest
+
+from anymotion_cli.auth import CachedAuthentication, TokenCache
+
+OAUTH_URL = "http://api.example.com/oauth/v1/accesstokens"
+
+
+class TestTokenCache(object):
+    def test_save_and_load(self, tmp_path):
+        cache = TokenCache(tmp_path / "tokens" / "default.json")
+
+        with cache.lock():
+            cache.save("key", "token", 100.0)
+
+        assert cache.load("key") == ("token", 100.0)
+        assert cache.load("other_key") is None
+
+    def test_permission(self, tmp_path):
+        file = tmp_path / "tokens" / "default.json"
+        cache = TokenCache(file)
+
+        with cache.lock():
+            cache.save("key", "token", 100.0)
+
+        assert stat.S_IMODE(file.stat().st_mode) == 0o600
+
+    @pytest.mark.parametrize("content", [None, "", "invalid", "{}", "[]"])
+    def test_load_invalid(self, tmp_path, content):
+        file = tmp_path / "default.json"
+        if content is not None:
+            file.write_text(content)
+
+        assert TokenCache(file).load("key") is None
+
+    def test_clear(self, tmp_path):
+        cache = TokenCache(tmp_path / "tokens" / "default.json")
+        with cache.lock():
+            cache.save("key", "token", 100.0)
+
+        cache.clear()
+
+        assert cache.load("key") is None
+
+
+class TestCachedAuthentication(object):
+    def test_token_is_reused(self, requests_mock, tmp_path):
+        oauth_mock = self._mock_oauth(requests_mock, time.time())
+        cache = TokenCache(tmp_path / "default.json")
+
+        token1 = self._make_auth(cache).token
+        token2 = self._make_auth(cache).token
+
+        assert token1 == token2 == "token"
+        assert oauth_mock.call_count == 1
+
+    def test_expired_token_is_not_reused(self, requests_mock, tmp_path):
+        oauth_mock = self._mock_oauth(requests_mock, time.time() - 86399 + 60)
+        cache = TokenCache(tmp_path / "default.json")
+
+        self._make_auth(cache).token
+        self._make_auth(cache).token
+
+        assert oauth_mock.call_count == 2
+
+    def test_token_of_other_credentials_is_not_reused(self, requests_mock, tmp_path):
+        oauth_mock = self._mock_oauth(requests_mock, time.time())
+        cache = TokenCache(tmp_path / "default.json")
+
+        self._make_auth(cache).token
+        self._make_auth(cache, client_secret="other_secret").token
+
+        assert oauth_mock.call_count == 2
+
+    def _make_auth(self, cache, client_secret="client_secret"):
+        return CachedAuthentication(
+            "client_id",
+            client_secret,
+            cache,
+            base_url="http://api.example.com/",
+        )
+
+    def _mock_oauth(self, requests_mock, issued_at):
+        return requests_mock.post(
+            OAUTH_URL,
+            json={
+                "accessToken": "token",
+                "issuedAt": str(int(issued_at * 1000)),
+                "expiresIn": "86399",
+            },
+        )
@@ -0,0 +1,310 @@
+from concurrent.futures import Future
+
+import pytest
+
+from anymotion_cli.cache import ResponseCache
+from anymotion_cli.client import CliClient
+from anymotion_cli.journal import JobJournal
+from anymotion_cli.poller import JobResult
+from anymotion_cli.schedule import AdaptiveSchedule, LatencyHistory
+from anymotion_cli.uploads import UploadIndex
+
+
+class TestCliClient(object):
+    @pytest.mark.parametrize(
+        "method, endpoint",
+        [
+            ("wait_for_extraction", "keypoints"),
+            ("wait_for_drawing", "drawings"),
+            ("wait_for_analysis", "analyses"),
+            ("wait_for_comparison", "comparisons"),
+        ],
+    )
+    def test_wait_for(self, mocker, client, method, endpoint):
+        submit_mock = mocker.patch.object(client.poller, "submit")
+
+        getattr(client, method)(1)
+
+        submit_mock.assert_called_once_with(endpoint, 1, kind=endpoint)
+
+    @pytest.mark.parametrize(
+        "data, expected_kind",
+        [({"image_id": 1, "movie_id": None}, "image"), ({"movie_id": 1}, "movie")],
+    )
+    def test_wait_for_with_media_type(self, mocker, client, data, expected_kind):
+        mocker.patch("anymotion_sdk.Client.extract_keypoint", return_value=10)
+        mocker.patch("anymotion_sdk.Client.draw_keypoint", return_value=20)
+        mocker.patch("anymotion_sdk.Client.analyze_keypoint", return_value=30)
+        submit_mock = mocker.patch.object(client.poller, "submit")
+
+        keypoint_id = client.extract_keypoint(data=data)
+        drawing_id = client.draw_keypoint(keypoint_id=keypoint_id)
+        analysis_id = client.analyze_keypoint(keypoint_id, rule=[])
+        client.wait_for_extraction(keypoint_id)
+        client.wait_for_drawing(drawing_id)
+        client.wait_for_analysis(analysis_id)
+
+        assert submit_mock.call_args_list == [
+            mocker.call("keypoints", 10, kind=f"keypoints:{expected_kind}"),
+            mocker.call("drawings", 20, kind=f"drawings:{expected_kind}"),
+            mocker.call("analyses", 30, kind=f"analyses:{expected_kind}"),
+        ]
+
+    @pytest.mark.parametrize(
+        "movie, expected_kind",
+        [
+            ({"id": 1, "duration": 5}, "movie:10s"),
+            ({"id": 1, "frameCount": 18000, "fps": 30}, "movie:10m"),
+            ({"id": 1}, "movie"),
+        ],
+    )
+    def test_wait_for_with_duration(self, mocker, tmp_path, movie, expected_kind):
+        schedule = AdaptiveSchedule(LatencyHistory(tmp_path / "latency.json"))
+        client = CliClient(
+            client_id="client_id",
+            client_secret="client_secret",
+            api_url="http://api.example.com/anymotion/v1/",
+            schedule=schedule,
+        )
+        mocker.patch("anymotion_sdk.Client.extract_keypoint", return_value=10)
+        mocker.patch("anymotion_sdk.Client.get_one_data", return_value=movie)
+        submit_mock = mocker.patch.object(client.poller, "submit")
+
+        client.extract_keypoint(movie_id=1)
+        client.wait_for_extraction(10)
+
+        submit_mock.assert_called_once_with(
+            "keypoints", 10, kind=f"keypoints:{expected_kind}"
+        )
+
+    @pytest.mark.parametrize(
+        "endpoint, status, expected_count",
+        [
+            ("keypoints", "SUCCESS", 1),
+            ("keypoints", "PROCESSING", 2),
+            ("images", None, 1),
+            ("drawings", "SUCCESS", 2),
+        ],
+    )
+    def test_get_one_data_with_cache(
+        self, mocker, tmp_path, client, endpoint, status, expected_count
+    ):
+        get_mock = mocker.patch(
+            "anymotion_sdk.Client.get_one_data",
+            return_value={"id": 1, "execStatus": status},
+        )
+        client.response_cache = ResponseCache(tmp_path)
+
+        for _ in range(2):
+            data = client.get_one_data(endpoint, 1)
+
+        assert data == {"id": 1, "execStatus": status}
+        assert get_mock.call_count == expected_count
+
+    def test_get_one_data_with_refresh(self, mocker, tmp_path, client):
+        get_mock = mocker.patch(
+            "anymotion_sdk.Client.get_one_data",
+            side_effect=[{"id": 1, "execStatus": "SUCCESS", "x": i} for i in range(2)],
+        )
+        client.response_cache = ResponseCache(tmp_path)
+        client.get_one_data("keypoints", 1)
+        client.refresh_cache = True
+
+        assert client.get_one_data("keypoints", 1)["x"] == 1
+        client.refresh_cache = False
+        assert client.get_one_data("keypoints", 1)["x"] == 1
+        assert get_mock.call_count == 2
+
+    def test_get_one_data_without_cache(self, mocker, tmp_path, client):
+        get_mock = mocker.patch(
+            "anymotion_sdk.Client.get_one_data",
+            return_value={"id": 1, "execStatus": "SUCCESS"},
+        )
+        client.response_cache = ResponseCache(tmp_path)
+
+        for _ in range(2):
+            client.get_one_data("keypoints", 1, use_cache=False)
+
+        assert get_mock.call_count == 2
+        assert list(tmp_path.iterdir()) == []
+
+    def test_waited_result_is_not_cached(self, mocker, tmp_path, client):
+        get_mock = mocker.patch(
+            "anymotion_sdk.Client.get_one_data",
+            return_value={"id": 1, "execStatus": "SUCCESS", "difference": []},
+        )
+        client.response_cache = ResponseCache(tmp_path)
+
+        result = client.wait_for_comparison(1)
+
+        assert result.status == "SUCCESS"
+        get_mock.assert_called_once_with("comparisons", 1)
+        assert client.response_cache.stats()["entries"] == 0
+
+    def test_copy_resolves_names_with_copy(self, mocker, client):
+        copied = client.copy()
+        data = {("keypoints", 11): {"id": 11, "image": 101}, ("images", 101): {}}
+        get_mock = mocker.patch.object(
+            copied,
+            "get_one_data",
+            side_effect=lambda endpoint, endpoint_id: dict(
+                data[(endpoint, endpoint_id)], name="image"
+            ),
+        )
+
+        assert copied.name_resolver.drawing_name({"keypoint": 11}) == "image"
+        assert get_mock.call_count == 2
+
+    def test_iter_list_data(self, requests_mock, client):
+        mock_token(requests_mock)
+        url = "http://api.example.com/anymotion/v1/images/"
+        requests_mock.get(
+            url,
+            [
+                {"json": {"data": [{"id": 1}, {"id": 2}], "next": f"{url}?page=2"}},
+                {"json": {"data": [{"id": 3}], "next": None}},
+            ],
+        )
+
+        pages = client.iter_list_data("images", params={"name": "image"})
+
+        assert next(pages) == [{"id": 1}, {"id": 2}]
+        assert requests_mock.last_request.qs == {"name": ["image"], "size": ["1000"]}
+        assert list(pages) == [[{"id": 3}]]
+        assert requests_mock.last_request.qs == {"page": ["2"]}
+
+    def test_upload(self, requests_mock, tmp_path, client):
+        mock_token(requests_mock)
+        path = tmp_path / "movie.mp4"
+        path.write_bytes(b"0123456789")
+        requests_mock.post(
+            "http://api.example.com/anymotion/v1/movies/",
+            json={"id": 1, "uploadUrl": "http://storage.example.com/movie.mp4"},
+        )
+        requests_mock.put("http://storage.example.com/movie.mp4")
+
+        result = client.upload(path, text="text")
+
+        assert result.image_id is None
+        assert result.movie_id == 1
+        register_request, upload_request = requests_mock.request_history[-2:]
+        assert register_request.json() == {
+            "content_md5": "eB5eJF1ptWaXm4bijSPyxw==",
+            "name": "movie",
+            "text": "text",
+        }
+        assert upload_request.headers["Content-MD5"] == "eB5eJF1ptWaXm4bijSPyxw=="
+
+    def test_find_uploaded(self, requests_mock, tmp_path, client):
+        mock_token(requests_mock)
+        path = tmp_path / "image.jpg"
+        path.write_bytes(b"0123456789")
+        client.upload_index = UploadIndex(tmp_path / "uploads.json", "scope")
+        # the deleted image is found even if the image is in the response cache
+        client.response_cache = ResponseCache(tmp_path / "cache")
+        assert client.find_uploaded(path) is None
+
+        requests_mock.post(
+            "http://api.example.com/anymotion/v1/images/",
+            json={"id": 1, "uploadUrl": "http://storage.example.com/image.jpg"},
+        )
+        requests_mock.put("http://storage.example.com/image.jpg")
+        client.upload(path)
+        copied_path = tmp_path / "copied.jpg"
+        copied_path.write_bytes(b"0123456789")
+        requests_mock.get("http://api.example.com/anymotion/v1/images/1/", json={})
+
+        assert client.find_uploaded(copied_path) == (1, None)
+
+        requests_mock.get(
+            "http://api.example.com/anymotion/v1/images/1/", status_code=404
+        )
+        assert client.find_uploaded(copied_path) is None
+        assert client.upload_index.get(client.upload_index.digest(path)[1]) is None
+
+    def test_find_keypoint(self, mocker, client):
+        get_list_mock = mocker.patch.object(
+            client,
+            "get_list_data",
+            return_value=[
+                {"id": 1, "image": 11, "movie": None},
+                {"id": 3, "image": 11, "movie": None},
+                {"id": 2, "image": None, "movie": 12},
+            ],
+        )
+        result = JobResult({"id": 4, "image": None, "movie": 13}, "SUCCESS")
+        mocker.patch.object(client.poller, "submit", return_value=Future())
+
+        assert client.find_keypoint(image_id=11, prefetch=True) == 3
+        assert client.find_keypoint(movie_id=12, prefetch=True) == 2
+        assert client.find_keypoint(movie_id=13, prefetch=True) is None
+        get_list_mock.assert_called_once_with(
+            "keypoints", params={"execStatus": "SUCCESS"}
+        )
+
+        client.submit_wait("keypoints", 4).set_result(result)
+        assert client.find_keypoint(movie_id=13) == 4
+        assert get_list_mock.call_count == 1
+
+    def test_find_keypoint_without_prefetch(self, mocker, client):
+        get_list_mock = mocker.patch.object(
+            client,
+            "get_list_data",
+            return_value=[
+                {"id": 1, "image": 11, "movie": None},
+                {"id": 3, "image": 11, "movie": None},
+                {"id": 2, "image": None, "movie": 12},
+            ],
+        )
+
+        assert client.find_keypoint(image_id=11) == 3
+        assert client.find_keypoint(movie_id=13) is None
+        assert get_list_mock.call_args_list == [
+            mocker.call("keypoints", params={"execStatus": "SUCCESS", "image": 11}),
+            mocker.call("keypoints", params={"execStatus": "SUCCESS", "movie": 13}),
+        ]
+
+    def test_jobs_are_recorded(self, mocker, tmp_path, client):
+        client.job_journal = JobJournal(tmp_path / "jobs.sqlite3", "scope")
+        mocker.patch(
+            "anymotion_sdk.Client.extract_keypoint", autospec=True, return_value=1
+        )
+        mocker.patch(
+            "anymotion_sdk.Client.draw_keypoint", autospec=True, return_value=2
+        )
+        futures = [Future(), Future()]
+        mocker.patch.object(client.poller, "submit", side_effect=futures)
+
+        client.extract_keypoint(data={"image_id": 11, "movie_id": None})
+        client.draw_keypoint(1, rule=[1])
+        jobs = client.job_journal.jobs()
+        assert [(x["endpoint"], x["id"], x["inputs"]) for x in jobs] == [
+            ("drawings", 2, {"keypoint_id": 1, "rule": [1]}),
+            ("keypoints", 1, {"image_id": 11}),
+        ]
+
+        client.submit_wait("keypoints", 1).set_result(
+            JobResult({"id": 1, "image": 11, "movie": None}, "SUCCESS")
+        )
+        client.submit_wait("drawings", 2).set_result(JobResult({"id": 2}, "TIMEOUT"))
+        in_progress = client.job_journal.jobs(in_progress=True)
+        assert [(x["endpoint"], x["id"]) for x in in_progress] == [("drawings", 2)]
+
+    @pytest.fixture
+    def client(self):
+        yield CliClient(
+            client_id="client_id",
+            client_secret="client_secret",
+            api_url="http://api.example.com/anymotion/v1/",
+        )
+
+
+def mock_token(requests_mock):
+    requests_mock.post(
+        "http://api.example.com/oauth/v1/accesstokens",
+        json={
+            "accessToken": "token",
+            "issuedAt": "1580000000000",
+            "expiresIn": "86399",
+        },
+    )
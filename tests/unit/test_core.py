@@ -1,4 +1,6 @@
 import re
+import subprocess  # nosec
+import sys
 
 import pytest
 
@@ -18,6 +20,9 @@ def test_show_help_message(runner, args):
     [
         "analysis",
         "analyze",
+        "cache",
+        "compare",
+        "comparison",
         "configure",
         "download",
         "draw",
@@ -25,8 +30,10 @@ def test_show_help_message(runner, args):
         "extract",
         "image",
         "interactive",
+        "jobs",
         "keypoint",
         "movie",
+        "pipeline",
         "upload",
     ],
 )
@@ -77,3 +84,54 @@ def test_interactive(runner, args):
 
     assert result.exit_code == 0
     assert "Start interactive mode." in result.output
+
+
+# Budget(us) of the cumulative import time of anymotion_cli modules at startup.
+STARTUP_IMPORT_BUDGET = 300000
+HEAVY_MODULES = [
+    "anymotion_sdk",
+    "prompt_toolkit",
+    "pygments",
+    "requests",
+    "tabulate",
+    "yaspin",
+]
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--version"],
+        ["configure", "get", "timeout"],
+    ],
+)
+def test_startup_import_time(monkeypatch, tmp_path, args):
+    monkeypatch.setenv("ANYMOTION_ROOT", str(tmp_path))
+    code = (
+        "from anymotion_cli.core import cli; "
+        f"cli({args!r}, prog_name='amcli', standalone_mode=False)"
+    )
+
+    result = subprocess.run(  # nosec
+        [sys.executable, "-X", "importtime", "-c", code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    assert result.returncode == 0
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        imports[name.strip()] = (int(cumulative), not name[1:].startswith(" "))
+
+    for module in HEAVY_MODULES:
+        assert module not in imports
+    total = sum(
+        cumulative
+        for name, (cumulative, is_top_level) in imports.items()
+        if is_top_level and name.startswith("anymotion_cli")
+    )
+    assert total < STARTUP_IMPORT_BUDGET
@@ -0,0 +1,106 @@
+import sqlite3
+
+import pytest
+
+from anymotion_cli.journal import JobJournal
+
+
+@pytest.fixture
+def file(tmp_path):
+    yield tmp_path / "jobs.sqlite3"
+
+
+def test_add_and_update(file):
+    JobJournal(file, "scope").add("keypoints", 1, {"image_id": 2})
+    JobJournal(file, "scope").add("drawings", 3, {"keypoint_id": 1})
+    journal = JobJournal(file, "scope")
+
+    jobs = journal.jobs()
+    assert [(x["endpoint"], x["id"], x["status"]) for x in jobs] == [
+        ("drawings", 3, "PROCESSING"),
+        ("keypoints", 1, "PROCESSING"),
+    ]
+    assert jobs[1]["inputs"] == {"image_id": 2}
+
+    journal.update("keypoints", 1, "SUCCESS")
+    assert [x["id"] for x in journal.jobs(in_progress=True)] == [3]
+    assert len(journal.jobs(limit=1)) == 1
+
+
+def test_find_job(file):
+    journal = JobJournal(file, "scope")
+    journal.add("keypoints", 1, {"image_id": 2})
+    journal.add("keypoints", 2, {"image_id": 3})
+    journal.update("keypoints", 2, "FAILURE")
+
+    assert journal.find_job("keypoints", {"image_id": 2}, 0)["id"] == 1
+    assert journal.find_job("keypoints", {"image_id": 3}, 0) is None
+    assert journal.find_job("keypoints", {"image_id": 2}, 2**40) is None
+    assert journal.find_job("drawings", {"image_id": 2}, 0) is None
+
+
+def test_runs(file, tmp_path):
+    journal = JobJournal(file, "scope")
+    first_id = journal.start_run(
+        "extract", [{"path": tmp_path / "a.jpg"}], {"reuse": True}
+    )
+    second_id = journal.start_run("extract", [{"image_id": 1}])
+
+    assert journal.get_run()["id"] == second_id
+    journal.finish_run(second_id)
+
+    run = journal.get_run()
+    assert run["id"] == first_id
+    assert run["command"] == "extract"
+    assert run["items"] == [{"path": str(tmp_path / "a.jpg")}]
+    assert run["finished"] is False
+    assert run["options"] == {"reuse": True}
+    assert journal.get_run(second_id)["finished"] is True
+    assert journal.get_run(second_id)["options"] == {}
+    assert journal.get_run(100) is None
+
+
+def test_old_journal_is_migrated(file):
+    db = sqlite3.connect(str(file))
+    db.execute(
+        "CREATE TABLE runs (id INTEGER PRIMARY KEY AUTOINCREMENT, scope TEXT NOT NULL, "
+        "command TEXT NOT NULL, items TEXT NOT NULL, "
+        "finished INTEGER NOT NULL DEFAULT 0, started_at REAL NOT NULL)"
+    )
+    db.execute(
+        "INSERT INTO runs (scope, command, items, started_at) "
+        "VALUES ('scope', 'extract', '[]', 0)"
+    )
+    db.commit()
+    db.close()
+    journal = JobJournal(file, "scope")
+
+    assert journal.get_run()["options"] == {}
+    run_id = journal.start_run("extract", [], {"reuse": True})
+    assert journal.get_run(run_id)["options"] == {"reuse": True}
+
+
+def test_other_scope_is_separated(file):
+    JobJournal(file, "scope").add("keypoints", 1, {"image_id": 2})
+    JobJournal(file, "scope").start_run("extract", [])
+    journal = JobJournal(file, "other scope")
+
+    assert journal.jobs() == []
+    assert journal.get_run() is None
+
+
+def test_error_is_ignored(mocker, file):
+    journal = JobJournal(file, "scope")
+    mocker.patch("sqlite3.connect", side_effect=sqlite3.OperationalError)
+
+    journal.add("keypoints", 1, {"image_id": 2})
+    assert journal.jobs() == []
+    assert journal.start_run("extract", []) is None
+
+
+def test_broken_file_is_ignored(file):
+    file.write_text("broken")
+    journal = JobJournal(file, "scope")
+
+    journal.add("keypoints", 1, {"image_id": 2})
+    assert journal.jobs() == []
@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+import pytest
+
+from anymotion_cli.keypoints import JOINT_NAMES, KeypointArray, KeypointStore
+
+
+def test_from_frames():
+    frames = [
+        {"nose": [1, 2], "rightAnkle": [3, 4], "leftEye": None},
+        {},
+        None,
+        {"nose": [5, 6, 0.9], "tail": [7, 8]},
+    ]
+
+    array = KeypointArray.from_frames(frames, meta={"keypoint_id": 1})
+
+    assert array.joint_names == JOINT_NAMES + ["tail"]
+    assert array.points.shape == (4, 18, 2)
+    assert array.points.dtype == np.float32
+    assert array.mask.sum() == 4
+    assert array.mask[0, 0] and array.mask[0, 16] and not array.mask[0, 1]
+    np.testing.assert_array_equal(array.points[3, [0, 17]], [[5, 6], [7, 8]])
+    assert np.isnan(array.points[1]).all()
+    assert array.meta == {"keypoint_id": 1}
+
+
+def test_from_empty_frames():
+    array = KeypointArray.from_frames([])
+
+    assert array.points.shape == (0, 17, 2)
+    assert array.mask.shape == (0, 17)
+
+
+def test_save_npz(tmp_path):
+    path = tmp_path / "keypoint.npz"
+    array = KeypointArray.from_frames(
+        [{"nose": [1, 2]}, {"leftEye": [3, 4]}], meta={"keypoint_id": 1}
+    )
+
+    array.save(path, "npz")
+
+    with np.load(str(path)) as data:
+        np.testing.assert_array_equal(data["points"], array.points)
+        np.testing.assert_array_equal(data["mask"], array.mask)
+        assert data["joints"].tolist() == JOINT_NAMES
+        assert json.loads(str(data["meta"])) == {"keypoint_id": 1}
+
+
+@pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+def test_save_table(tmp_path, export_format):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    path = tmp_path / f"keypoint.{export_format}"
+    array = KeypointArray.from_frames([{"nose": [1, 2]}, {"leftEye": [3, 4]}])
+
+    array.save(path, export_format)
+
+    if export_format == "parquet":
+        table = pq.read_table(str(path))
+    else:
+        table = feather.read_table(str(path))
+    assert table.num_rows == 2
+    assert table.column("nose_x").to_pylist() == [1, None]
+    assert table.column("leftEye_y").to_pylist() == [None, 4]
+    assert table.schema.field("nose_x").type == pa.float32()
+    metadata = json.loads(table.schema.metadata[b"anymotion"])
+    assert metadata["joints"] == JOINT_NAMES
+
+
+def test_save_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        KeypointArray.from_frames([]).save(tmp_path / "keypoint.csv", "csv")
+
+
+class TestKeypointStore(object):
+    def test_add_and_load(self, tmp_path):
+        store = KeypointStore(tmp_path / "keypoints", "scope")
+        array = KeypointArray.from_frames(
+            [{"nose": [1, 2]}, {"leftEye": [3, 4]}],
+            meta={"keypoint_id": 1, "movie_id": 2, "fps": 30},
+        )
+
+        store.add(array)
+
+        store = KeypointStore(tmp_path / "keypoints", "scope")
+        assert store.ids() == [1]
+        assert 1 in store and 2 not in store
+        loaded = store.load(1)
+        assert isinstance(loaded.points, np.memmap)
+        np.testing.assert_array_equal(loaded.points, array.points)
+        np.testing.assert_array_equal(loaded.mask, array.mask)
+        assert loaded.joint_names == JOINT_NAMES
+        assert loaded.meta == {
+            "keypoint_id": 1,
+            "image_id": None,
+            "movie_id": 2,
+            "fps": 30,
+        }
+        assert not isinstance(store.load(1, mmap=False).points, np.memmap)
+        assert store.load(2) is None
+
+    def test_other_scope_is_kept(self, tmp_path):
+        store = KeypointStore(tmp_path / "keypoints", "scope")
+        store.add(KeypointArray.from_frames([], meta={"keypoint_id": 1}))
+
+        other_store = KeypointStore(tmp_path / "keypoints", "other scope")
+        other_store.add(KeypointArray.from_frames([], meta={"keypoint_id": 2}))
+
+        assert other_store.directory != store.directory
+        assert other_store.ids() == [2]
+        assert 1 not in other_store
+        assert KeypointStore(tmp_path / "keypoints", "scope").ids() == [1]
+
+    def test_failed_write_is_discarded(self, mocker, tmp_path):
+        store = KeypointStore(tmp_path / "keypoints", "scope")
+        mocker.patch("numpy.save", side_effect=OSError)
+
+        with pytest.raises(OSError):
+            store.add(KeypointArray.from_frames([], meta={"keypoint_id": 1}))
+
+        assert store.ids() == []
+        assert list(store.directory.iterdir()) == []
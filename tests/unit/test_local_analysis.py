@@ -0,0 +1,99 @@
+import pytest
+
+from anymotion_cli.keypoints import KeypointArray
+from anymotion_cli.local_analysis import analyze
+
+# A frame of a bent arm, a frame of a straight arm and a frame without the wrist.
+FRAMES = [
+    {"rightShoulder": [0, 0], "rightElbow": [0, 10], "rightWrist": [10, 10]},
+    {"rightShoulder": [0, 0], "rightElbow": [0, 10], "rightWrist": [0, 20]},
+    {"rightShoulder": [0, 0], "rightElbow": [0, 10]},
+]
+
+
+@pytest.mark.parametrize(
+    "rule, expected",
+    [
+        (
+            {
+                "analysisType": "angle",
+                "points": ["rightShoulder", "rightElbow", "rightWrist"],
+            },
+            {
+                "analysisType": "angle",
+                "description": "rightShoulder, rightElbow and rightWrist angles",
+                "values": [90, 180, None],
+            },
+        ),
+        (
+            {
+                "analysisType": "vectorAngle",
+                "description": "elbow",
+                "points": ["rightShoulder", "rightElbow", "rightWrist"],
+            },
+            {
+                "analysisType": "vectorAngle",
+                "description": "elbow",
+                "values": [90, 180, None],
+            },
+        ),
+        (
+            {"analysisType": "topVertexAngle", "points": ["rightElbow", "rightWrist"]},
+            {
+                "analysisType": "topVertexAngle",
+                "description": "rightElbow and rightWrist angles",
+                "values": [90, 180, None],
+            },
+        ),
+        (
+            {
+                "analysisType": "bottomVertexAngle",
+                "points": ["rightElbow", "rightWrist"],
+            },
+            {
+                "analysisType": "bottomVertexAngle",
+                "description": "rightElbow and rightWrist angles",
+                "values": [90, 0, None],
+            },
+        ),
+        (
+            {"analysisType": "distance", "points": ["rightShoulder", "rightWrist"]},
+            {
+                "analysisType": "distance",
+                "description": "rightShoulder and rightWrist distances",
+                "values": [14, 20, None],
+            },
+        ),
+    ],
+)
+def test_analyze(rule, expected):
+    array = KeypointArray.from_frames(FRAMES)
+
+    assert analyze(array, rule) == [expected]
+    assert analyze(array, [rule, rule]) == [expected, expected]
+
+
+def test_analyze_same_points():
+    array = KeypointArray.from_frames([{"nose": [1, 1], "leftEye": [1, 1]}])
+    rule = {"analysisType": "topVertexAngle", "points": ["nose", "leftEye"]}
+
+    assert analyze(array, rule)[0]["values"] == [None]
+
+
+@pytest.mark.parametrize(
+    "rule, message",
+    [
+        ([1], "Rule must be an object: 1"),
+        ({"analysisType": "speed"}, "Unsupported analysis type: speed"),
+        ({"analysisType": "angle", "points": ["nose"]}, "angle requires 3 points"),
+        (
+            {"analysisType": "distance", "points": ["nose", "tail"]},
+            "Unknown points: tail",
+        ),
+    ],
+)
+def test_invalid_rule(rule, message):
+    with pytest.raises(ValueError) as excinfo:
+        analyze(KeypointArray.from_frames(FRAMES), rule)
+
+    assert str(excinfo.value).startswith(message)
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from anymotion_cli.keypoints import KeypointArray
+from anymotion_cli.local_comparison import _frame_costs, align, compare
+
+POSES = [
+    {"nose": [0, 0], "leftHip": [0, 10], "rightHip": [4, 10]},
+    {"nose": [2, 0], "leftHip": [0, 10], "rightHip": [4, 10]},
+    {"nose": [4, 0], "leftHip": [0, 10], "rightHip": [4, 10]},
+]
+
+
+def test_compare_same_poses():
+    source = KeypointArray.from_frames(POSES)
+    # the same poses at another position and size
+    target = KeypointArray.from_frames(
+        [
+            {name: [x * 2 + 100, y * 2 + 50] for name, (x, y) in pose.items()}
+            for pose in POSES
+        ]
+    )
+
+    difference = compare(source, target)
+
+    assert len(difference) == 3
+    for frame in difference:
+        assert set(frame) == {"nose", "leftHip", "rightHip"}
+        assert all(x["distance"] == 0 for x in frame.values())
+
+
+def test_compare_slower_target():
+    source = KeypointArray.from_frames(POSES)
+    target = KeypointArray.from_frames([pose for pose in POSES for _ in range(3)])
+
+    difference = compare(source, target)
+
+    assert len(difference) == 3
+    assert all(x["distance"] == 0 for frame in difference for x in frame.values())
+
+
+def test_compare_direction():
+    source = KeypointArray.from_frames([POSES[0]])
+    target = KeypointArray.from_frames([POSES[2]])
+
+    difference = compare(source, target)
+
+    # the nose moves right, so the others move left relative to the center
+    assert difference[0]["nose"]["direction"] == 0
+    assert difference[0]["leftHip"]["direction"] == 180
+    assert difference[0]["nose"]["distance"] > difference[0]["leftHip"]["distance"]
+
+
+def test_compare_missing_joints():
+    source = KeypointArray.from_frames([POSES[0], {}])
+    target = KeypointArray.from_frames([dict(POSES[0], nose=None), POSES[0]])
+
+    difference = compare(source, target)
+
+    assert len(difference) == 2
+    assert set(difference[0]) == {"leftHip", "rightHip"}
+    assert difference[1] == {}
+
+
+@pytest.mark.parametrize(
+    "source_frames, target_frames, expected",
+    [([], POSES, []), (POSES[:2], [], [{}, {}])],
+)
+def test_compare_empty(source_frames, target_frames, expected):
+    source = KeypointArray.from_frames(source_frames)
+    target = KeypointArray.from_frames(target_frames)
+
+    assert compare(source, target) == expected
+
+
+@pytest.mark.parametrize("n, m", [(1, 1), (1, 4), (4, 1), (10, 7), (3, 20), (30, 45)])
+def test_align_cost_is_dtw(mocker, n, m):
+    rng = np.random.default_rng(n * 100 + m)
+    source = rng.normal(size=(n, 3, 2))
+    target = rng.normal(size=(m, 3, 2))
+    backtrack_mock = mocker.patch("anymotion_cli.local_comparison._backtrack")
+
+    align(source, target, window=1.0)
+
+    rows = backtrack_mock.call_args[0][0]
+    assert rows[-1][1][-1] == pytest.approx(_dtw(source, target), rel=1e-5)
+
+
+def test_align_is_limited_to_band():
+    source = np.zeros((100, 1, 2))
+    target = np.zeros((100, 1, 2))
+    target[:, 0, 0] = np.arange(100)
+    source[:, 0, 0] = np.arange(100) + 50
+
+    matches = align(source, target, window=0.1)
+
+    # the nearest frames are out of the band
+    assert np.all(np.abs(matches - np.arange(100)) <= 10)
+
+
+def _dtw(source, target):
+    n, m = len(source), len(target)
+    costs = np.array([_frame_costs(x, target) for x in source])
+    cumulative = np.full((n + 1, m + 1), np.inf)
+    cumulative[0, 0] = 0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            cumulative[i, j] = costs[i - 1, j - 1] + min(
+                cumulative[i - 1, j], cumulative[i, j - 1], cumulative[i - 1, j - 1]
+            )
+    return cumulative[n, m]
@@ -0,0 +1,85 @@
+import pytest
+
+from anymotion_cli.names import NameResolver
+
+
+@pytest.fixture
+def client(mocker):
+    lists = {
+        "images": [{"id": 101, "name": "image"}],
+        "movies": [{"id": 102, "name": "movie"}],
+        "keypoints": [{"id": 11, "image": 101}, {"id": 12, "movie": 102}, {"id": 13}],
+        "comparisons": [{"id": 21, "source": 11, "target": 12}, {"id": 22}],
+    }
+    client = mocker.MagicMock()
+    client.get_list_data.side_effect = lambda endpoint: lists[endpoint]
+    client.get_one_data.side_effect = lambda endpoint, endpoint_id: next(
+        (x for x in lists[endpoint] if x["id"] == endpoint_id), {}
+    )
+    yield client
+
+
+@pytest.mark.parametrize(
+    "drawing, expected",
+    [
+        ({"keypoint": 11}, "image"),
+        ({"keypoint": 12}, "movie"),
+        ({"keypoint": 13}, ""),
+        ({"keypoint": 99}, ""),
+        ({"comparison": 99}, ""),
+        ({"comparison": 21}, "movie_image"),
+        ({"comparison": 22}, ""),
+        ({}, ""),
+    ],
+)
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_drawing_name(client, drawing, expected, prefetch):
+    resolver = NameResolver(client, prefetch=prefetch)
+
+    assert resolver.drawing_name(drawing) == expected
+
+
+def test_list_is_fetched_once(client):
+    resolver = NameResolver(client)
+
+    for _ in range(3):
+        resolver.drawing_name({"comparison": 21})
+
+    assert client.get_list_data.call_count == 4
+
+
+def test_data_is_fetched_one_by_one_without_prefetch(client):
+    resolver = NameResolver(client, prefetch=False)
+
+    for _ in range(3):
+        resolver.drawing_name({"comparison": 21})
+
+    assert client.get_list_data.call_count == 0
+    assert client.get_one_data.call_count == 5
+
+
+def test_new_data_is_fetched_after_prefetch(client):
+    resolver = NameResolver(client)
+    resolver.drawing_name({"keypoint": 11})
+    client.get_list_data.side_effect = None
+    client.get_one_data.side_effect = [{"id": 14, "image": 101}]
+
+    assert resolver.drawing_name({"keypoint": 14}) == "image"
+    assert client.get_list_data.call_count == 2
+    assert client.get_one_data.call_count == 1
+
+
+def test_bind(mocker, client):
+    resolver = NameResolver(client, prefetch=False)
+    resolver.drawing_name({"keypoint": 11})
+    other_client = mocker.MagicMock()
+    other_client.get_one_data.return_value = {"id": 12}
+
+    bound = resolver.bind(other_client)
+
+    # the data kept is shared, and the rest is got with the other client
+    assert bound.drawing_name({"keypoint": 11}) == "image"
+    assert bound.drawing_name({"keypoint": 12}) == ""
+    other_client.get_one_data.assert_called_once_with("keypoints", 12)
+    assert resolver.drawing_name({"keypoint": 12}) == ""
+    assert client.get_one_data.call_count == 2
@@ -1,13 +1,19 @@
+import json
 from textwrap import dedent
 
+import click
 import pytest
 
+from anymotion_cli import output
 from anymotion_cli.output import (
+    TransferProgress,
     echo,
     echo_json,
+    echo_ndjson,
     echo_request,
     echo_response,
     echo_success,
+    format_size,
 )
 
 
@@ -59,6 +65,81 @@ def test_echo_json(capfd):
     assert err == ""
 
 
+def test_echo_json_with_pager(mocker):
+    pager_mock = mocker.patch("click.echo_via_pager")
+
+    echo_json({"key": "value"}, pager=True)
+
+    assert "".join(pager_mock.call_args[0][0]) == '{\n  "key": "value"\n}\n'
+
+
+def test_echo_json_is_streamed(monkeypatch, capfd):
+    monkeypatch.setattr(output, "JSON_BLOCK_SIZE", 100)
+    data = {"keypoint": [{"leftEye": [i, i + 1]} for i in range(100)]}
+
+    blocks = list(output._iter_json(data))
+    echo_json(data)
+
+    expected = json.dumps(data, indent=2) + "\n"
+    assert len(blocks) > 10
+    assert all(block.endswith("\n") for block in blocks)
+    assert "".join(blocks) == expected
+    assert click.unstyle("".join(output._highlight(iter(blocks)))) == expected
+    out, err = capfd.readouterr()
+    assert out == "\n" + expected + "\n"
+
+
+@pytest.mark.parametrize("isatty", [True, False])
+def test_echo_json_is_colorized_only_for_terminal(mocker, isatty):
+    mocker.patch("sys.stdout.isatty", return_value=isatty)
+    highlight_mock = mocker.patch.object(output, "_highlight", side_effect=iter)
+    mocker.patch("click.echo")
+
+    echo_json({"key": "value"})
+
+    assert highlight_mock.called is isatty
+
+
+def test_echo_ndjson(capfd):
+    echo_ndjson(iter([[{"key": "値"}, {"key": [1, 2]}], [], [{"key": None}]]))
+
+    out, err = capfd.readouterr()
+    assert out == '{"key":"値"}\n{"key":[1,2]}\n{"key":null}\n'
+    assert err == ""
+
+
+def test_transfer_progress(mocker, capfd):
+    mocker.patch("anymotion_cli.output.time.monotonic", side_effect=[0, 0, 0, 0, 1, 1])
+
+    with TransferProgress("Downloading...", interval=0) as progress:
+        progress(0, 2048)
+        progress(1024, 2048)
+
+    out, err = capfd.readouterr()
+    assert out.split("\r") == [
+        "",
+        "Downloading...",
+        "Downloading... 0 B / 2.0 KiB",
+        "Downloading... 1.0 KiB / 2.0 KiB (1.0 KiB/s)",
+        " " * 44,
+        "",
+    ]
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [
+        (0, "0 B"),
+        (1023, "1023 B"),
+        (1536, "1.5 KiB"),
+        (10 * 1024**2, "10.0 MiB"),
+        (3 * 1024**4, "3072.0 GiB"),
+    ],
+)
+def test_format_size(size, expected):
+    assert format_size(size) == expected
+
+
 @pytest.mark.parametrize(
     "headers, json, expected",
     [
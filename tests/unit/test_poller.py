@@ -0,0 +1,142 @@
+from concurrent.futures import wait
+
+import pytest
+from anymotion_sdk import RequestsError
+
+from anymotion_cli.poller import JobResult, Poller
+from anymotion_cli.schedule import FixedSchedule
+
+
+class TestJobResult(object):
+    @pytest.mark.parametrize(
+        "data, status, expected_status, expected_detail",
+        [
+            ({"execStatus": "SUCCESS"}, None, "SUCCESS", None),
+            ({"execStatus": "FAILURE", "failureDetail": "x"}, None, "FAILURE", "x"),
+            ({"execStatus": "PROCESSING"}, "TIMEOUT", "TIMEOUT", None),
+        ],
+    )
+    def test_valid(self, data, status, expected_status, expected_detail):
+        result = JobResult(data, status=status)
+
+        assert result.status == expected_status
+        assert result.failure_detail == expected_detail
+
+
+class TestPoller(object):
+    def test_wait_single_job(self, make_client):
+        client = make_client(processing={1: 2})
+        poller = Poller(client, interval=0.01, timeout=10)
+
+        result = poller.wait("keypoints", 1)
+
+        assert result.status == "SUCCESS"
+        assert client.get_one_data.call_count == 3
+        assert client.get_list_data.call_count == 0
+
+    def test_wait_many_jobs(self, make_client):
+        client = make_client(processing={i: 2 for i in range(50)})
+        # delay the first check until all jobs are submitted
+        schedule = FixedSchedule(0.01)
+        schedule.first_delay = lambda kind: 0.2
+        poller = Poller(client, interval=0.01, timeout=10, schedule=schedule)
+
+        futures = [poller.submit("keypoints", i) for i in range(50)]
+        wait(futures, timeout=10)
+
+        assert all(f.result().status == "SUCCESS" for f in futures)
+        # finished jobs are fetched individually only once
+        assert client.get_one_data.call_count <= 50 * 2
+        # status checks are shared among the pending jobs
+        assert client.get_list_data.call_count <= 3 * 2
+
+    def test_same_job_is_shared(self, make_client):
+        client = make_client()
+        poller = Poller(client, interval=0.01, timeout=10)
+
+        future1 = poller.submit("analyses", 1)
+        future2 = poller.submit("analyses", 1)
+
+        assert future1 is future2
+        assert future1.result().status == "SUCCESS"
+
+    def test_timeout(self, make_client):
+        client = make_client(processing={1: 1000})
+        poller = Poller(client, interval=0.01, timeout=0.05)
+
+        result = poller.wait("drawings", 1)
+
+        assert result.status == "TIMEOUT"
+
+    def test_with_requests_error(self, make_client):
+        client = make_client()
+        client.get_one_data.side_effect = RequestsError("error")
+        poller = Poller(client, interval=0.01, timeout=10)
+
+        with pytest.raises(RequestsError):
+            poller.wait("comparisons", 1)
+
+    def test_with_other_error(self, make_client):
+        client = make_client()
+        client.get_list_data.side_effect = ValueError("error")
+        schedule = FixedSchedule(0.01)
+        schedule.first_delay = lambda kind: 0.1
+        poller = Poller(client, interval=0.01, timeout=10, schedule=schedule)
+
+        futures = [poller.submit("keypoints", i) for i in range(2)]
+
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+
+    def test_restart_after_unexpected_error(self, monkeypatch, make_client):
+        client = make_client()
+        poller = Poller(client, interval=0.01, timeout=10)
+
+        def check(jobs):
+            raise KeyError("id")
+
+        monkeypatch.setattr(poller, "_check", check)
+        with pytest.raises(KeyError):
+            poller.submit("keypoints", 1).result(timeout=5)
+
+        monkeypatch.undo()
+        assert poller.submit("keypoints", 2).result(timeout=5).status == "SUCCESS"
+
+    @pytest.fixture
+    def make_client(self, mocker):
+        def _make_client(processing={}):
+            """Make a client mock.
+
+            processing is the number of status checks for each id until the job
+            finishes.
+            """
+            counts = dict(processing)
+            client = mocker.MagicMock()
+
+            def get_status(job_id):
+                if counts.get(job_id, 0) > 0:
+                    return "PROCESSING"
+                return "SUCCESS"
+
+            def get_one_data(endpoint, job_id, **kwargs):
+                status = get_status(job_id)
+                counts[job_id] = counts.get(job_id, 0) - 1
+                return {"id": job_id, "execStatus": status}
+
+            def get_list_data(endpoint, params):
+                data = [
+                    {"id": job_id, "execStatus": get_status(job_id)}
+                    for job_id in counts
+                    if get_status(job_id) == params["execStatus"]
+                ]
+                if params["execStatus"] == "PROCESSING":
+                    for job_id in counts:
+                        counts[job_id] -= 1
+                return data
+
+            client.get_one_data.side_effect = get_one_data
+            client.get_list_data.side_effect = get_list_data
+            return client
+
+        return _make_client
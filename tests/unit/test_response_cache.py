@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from anymotion_cli.cache import ResponseCache, is_immutable
+
+
+@pytest.mark.parametrize(
+    "endpoint, data, expected",
+    [
+        ("images", {"id": 1}, True),
+        ("movies", {"id": 1}, True),
+        ("keypoints", {"execStatus": "SUCCESS"}, True),
+        ("keypoints", {"execStatus": "PROCESSING"}, False),
+        ("analyses", {"execStatus": "FAILURE"}, False),
+        ("comparisons", {"execStatus": "SUCCESS"}, True),
+        ("drawings", {"execStatus": "SUCCESS"}, False),
+        ("keypoints", None, False),
+    ],
+)
+def test_is_immutable(endpoint, data, expected):
+    assert is_immutable(endpoint, data) is expected
+
+
+class TestResponseCache(object):
+    def test_set_and_get(self, tmp_path):
+        cache = ResponseCache(tmp_path / "cache")
+        cache.set(("url", "keypoints", 1), {"id": 1})
+
+        assert cache.get(("url", "keypoints", 1)) == {"id": 1}
+        assert cache.get(("url", "keypoints", 2)) is None
+        assert cache.get(("other_url", "keypoints", 1)) is None
+
+    def test_large_data_is_compressed(self, tmp_path):
+        cache = ResponseCache(tmp_path, compress_threshold=100)
+        data = {"keypoint": [{"nose": [1, 2]}] * 100}
+        cache.set(("url", "keypoints", 1), data)
+
+        files = list(tmp_path.iterdir())
+        assert [path.suffix for path in files] == [".gz"]
+        assert files[0].stat().st_size < 100
+        assert cache.get(("url", "keypoints", 1)) == data
+
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        cache = ResponseCache(tmp_path, max_size=24)
+        for i in range(3):
+            cache.set(("url", "images", i), {"id": i})
+            path = cache._paths(("url", "images", i))[1]
+            os.utime(str(path), (i, i))
+        cache.get(("url", "images", 0))
+        cache.set(("url", "images", 3), {"id": 3})
+
+        assert cache.get(("url", "images", 0)) == {"id": 0}
+        assert cache.get(("url", "images", 1)) is None
+        assert cache.get(("url", "images", 2)) == {"id": 2}
+        assert cache.get(("url", "images", 3)) == {"id": 3}
+
+    def test_stats_and_clear(self, tmp_path):
+        cache = ResponseCache(tmp_path, max_size=1000)
+        cache.set(("url", "images", 1), {"id": 1})
+        cache.set(("url", "images", 2), {"id": 2})
+
+        assert cache.stats() == {"entries": 2, "size": 16, "max_size": 1000}
+
+        cache.clear()
+
+        assert cache.stats() == {"entries": 0, "size": 0, "max_size": 1000}
+        assert cache.get(("url", "images", 1)) is None
+
+    def test_broken_file_is_ignored(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        cache.set(("url", "images", 1), {"id": 1})
+        cache._paths(("url", "images", 1))[1].write_text("{")
+
+        assert cache.get(("url", "images", 1)) is None
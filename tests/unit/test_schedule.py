@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from anymotion_cli.schedule import (
+    AdaptiveSchedule,
+    FixedSchedule,
+    LatencyHistory,
+    duration_bucket,
+)
+
+
+def test_fixed_schedule():
+    schedule = FixedSchedule(5)
+
+    assert schedule.first_delay("keypoints") == 0
+    assert schedule.next_delay("keypoints", 0) == 5
+    assert schedule.next_delay("keypoints", 10) == 5
+
+
+class TestAdaptiveSchedule(object):
+    def test_first_delay_without_history(self, tmp_path):
+        schedule = AdaptiveSchedule(LatencyHistory(tmp_path / "latency.json"))
+
+        assert schedule.first_delay("keypoints:image") == 0.5
+
+    def test_first_delay_with_history(self, tmp_path):
+        history = LatencyHistory(tmp_path / "latency.json")
+        for elapsed in [10, 20, 30]:
+            history.record("drawings:movie", elapsed)
+        schedule = AdaptiveSchedule(history)
+
+        assert schedule.first_delay("drawings:movie") == pytest.approx(18)
+        assert schedule.first_delay("drawings:image") == 0.5
+
+    @pytest.mark.parametrize(
+        "attempt, expected_max", [(0, 0.5), (1, 1), (3, 4), (7, 60), (100, 60)]
+    )
+    def test_next_delay(self, tmp_path, attempt, expected_max):
+        schedule = AdaptiveSchedule(LatencyHistory(tmp_path / "latency.json"))
+
+        for _ in range(10):
+            delay = schedule.next_delay("keypoints", attempt)
+            assert expected_max / 2 <= delay <= expected_max
+
+
+class TestLatencyHistory(object):
+    def test_persisted(self, tmp_path):
+        file = tmp_path / "latency.json"
+        LatencyHistory(file).record("keypoints:image", 1.5)
+
+        assert LatencyHistory(file).expected("keypoints:image") == 1.5
+        assert json.loads(file.read_text()) == {"keypoints:image": [1.5]}
+
+    def test_other_process_is_merged(self, tmp_path):
+        file = tmp_path / "latency.json"
+        history = LatencyHistory(file)
+        other_history = LatencyHistory(file)
+        history.expected("keypoints:image")
+
+        other_history.record("keypoints:image", 1)
+        history.record("keypoints:image", 3)
+        history.record("drawings:image", 5)
+
+        assert json.loads(file.read_text()) == {
+            "keypoints:image": [1, 3],
+            "drawings:image": [5],
+        }
+        assert history.expected("keypoints:image") == 2
+        assert [path.name for path in tmp_path.iterdir()] == ["latency.json"]
+
+    def test_size(self, tmp_path):
+        history = LatencyHistory(tmp_path / "latency.json", size=3)
+        for elapsed in [100, 1, 2, 3]:
+            history.record("keypoints", elapsed)
+
+        assert history.expected("keypoints") == 2
+
+    @pytest.mark.parametrize("content", ["", "invalid", "[1, 2]"])
+    def test_invalid_file(self, tmp_path, content):
+        file = tmp_path / "latency.json"
+        file.write_text(content)
+
+        assert LatencyHistory(file).expected("keypoints") is None
+
+
+@pytest.mark.parametrize(
+    "duration, expected",
+    [(2, "10s"), (10, "10s"), (30, "1m"), (600, "10m"), (1800, "1h"), (7200, "long")],
+)
+def test_duration_bucket(duration, expected):
+    assert duration_bucket(duration) == expected
@@ -4,7 +4,7 @@ from textwrap import dedent
 import pytest
 
 from anymotion_cli.exceptions import SettingsValueError
-from anymotion_cli.settings import Settings
+from anymotion_cli.settings import Settings, strtobool
 
 
 @pytest.fixture
@@ -40,6 +40,7 @@ class Test_設定ファイルが存在しない場合(object):
         settings = Settings("default")
 
         assert settings.interval == 5
+        assert settings.polling_mode == "fixed"
         assert settings.timeout == 600
         assert settings.api_url == "https://api.customer.jp/anymotion/v1/"
         assert settings.client_id is None
@@ -119,6 +120,7 @@ class Test_設定ファイルが存在する場合(object):
                 [default]
                 anymotion_api_url = http://api.example.com/anymotion/v1/
                 polling_interval = 20
+                polling_mode = Adaptive
                 timeout = 300
             """
             )
@@ -128,8 +130,19 @@ class Test_設定ファイルが存在する場合(object):
 
         assert settings.api_url == "http://api.example.com/anymotion/v1/"
         assert settings.interval == 20
+        assert settings.polling_mode == "adaptive"
         assert settings.timeout == 300
 
+    def test_polling_modeの値が無効な場合エラーが発生すること(self, mocker_home):
+        config_file_path = mocker_home / ".anymotion" / "config"
+        (mocker_home / ".anymotion").mkdir()
+        config_file_path.write_text("[default]\npolling_mode = invalid\n")
+
+        settings = Settings("default")
+
+        with pytest.raises(SettingsValueError):
+            settings.polling_mode
+
     @pytest.mark.parametrize("interval, timeout", [(0, 10), ("a", 10), (10, -1)])
     def test_configファイルの値が無効な場合エラーが発生すること(self, mocker_home, interval, timeout):
         config_file_path = mocker_home / ".anymotion" / "config"
@@ -195,3 +208,23 @@ def test_is_ok(monkeypatch, mocker_home, client_id, client_secret, expected):
     settings = Settings("default")
 
     assert settings.is_ok is expected
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("y", True),
+        ("True", True),
+        ("ON", True),
+        ("1", True),
+        ("no", False),
+        ("0", False),
+    ],
+)
+def test_strtobool(value, expected):
+    assert strtobool(value) is expected
+
+
+def test_strtobool_with_invalid_value():
+    with pytest.raises(ValueError):
+        strtobool("invalid")
@@ -0,0 +1,384 @@
+import json
+import re
+
+import pytest
+import requests
+from anymotion_sdk import RequestsError
+
+from anymotion_cli import transfer
+from anymotion_cli.transfer import (
+    _meta_path,
+    _parse_content_range,
+    download_file,
+    hash_file,
+    upload_file,
+)
+
+URL = "http://example.com/movie.mp4"
+CONTENT = b"0123456789"
+
+
+@pytest.fixture(autouse=True)
+def sleep_mock(mocker):
+    yield mocker.patch("anymotion_cli.transfer.time.sleep")
+
+
+@pytest.fixture
+def path(tmp_path):
+    yield tmp_path / "movie.mp4"
+
+
+@pytest.fixture
+def part_path(tmp_path):
+    yield tmp_path / "movie.mp4.part"
+
+
+class TestDownloadFile(object):
+    def test_download(self, requests_mock, path, part_path):
+        requests_mock.get(
+            URL, content=CONTENT, headers={"Content-Length": str(len(CONTENT))}
+        )
+        progress = []
+
+        download_file(
+            requests.Session(),
+            URL,
+            path,
+            chunk_size=4,
+            progress=lambda *args: progress.append(args),
+        )
+
+        assert path.read_bytes() == CONTENT
+        assert not part_path.exists()
+        assert "Range" not in requests_mock.last_request.headers
+        assert progress == [(0, 10), (4, 10), (8, 10), (10, 10)]
+
+    def test_resume(self, requests_mock, path, part_path):
+        part_path.write_bytes(CONTENT[:4])
+        _write_validator(part_path, '"etag"')
+        requests_mock.get(
+            URL,
+            status_code=206,
+            content=CONTENT[4:],
+            headers={"Content-Range": "bytes 4-9/10", "ETag": '"etag"'},
+        )
+
+        download_file(requests.Session(), URL, path)
+
+        assert path.read_bytes() == CONTENT
+        assert requests_mock.last_request.headers["Range"] == "bytes=4-"
+        assert requests_mock.last_request.headers["If-Range"] == '"etag"'
+        assert not _meta_path(part_path).exists()
+
+    def test_part_file_of_another_file(self, requests_mock, path, part_path):
+        part_path.write_bytes(b"xxxx")
+        _write_validator(part_path, '"other"')
+        # the server sends the whole file because If-Range does not match
+        requests_mock.get(
+            URL, content=CONTENT, headers={"Content-Length": "10", "ETag": '"etag"'}
+        )
+
+        download_file(requests.Session(), URL, path)
+
+        assert path.read_bytes() == CONTENT
+        assert requests_mock.last_request.headers["If-Range"] == '"other"'
+
+    def test_if_range_is_ignored(self, requests_mock, path, part_path):
+        part_path.write_bytes(b"xxxx")
+        _write_validator(part_path, '"other"')
+        requests_mock.get(
+            URL,
+            [
+                {
+                    "status_code": 206,
+                    "content": CONTENT[4:],
+                    "headers": {"Content-Range": "bytes 4-9/10", "ETag": '"etag"'},
+                },
+                {"content": CONTENT, "headers": {"ETag": '"etag"'}},
+            ],
+        )
+
+        download_file(requests.Session(), URL, path)
+
+        assert path.read_bytes() == CONTENT
+        assert "Range" not in requests_mock.last_request.headers
+
+    def test_part_file_without_validator(self, requests_mock, path, part_path):
+        part_path.write_bytes(b"xxxx")
+        requests_mock.get(URL, content=CONTENT, headers={"Content-Length": "10"})
+
+        download_file(requests.Session(), URL, path)
+
+        assert path.read_bytes() == CONTENT
+        assert "Range" not in requests_mock.last_request.headers
+
+    def test_validator_is_saved(self, requests_mock, path, part_path):
+        requests_mock.get(
+            URL,
+            [
+                {
+                    "content": CONTENT[:4],
+                    "headers": {"Content-Length": "10", "Last-Modified": "yesterday"},
+                },
+                {
+                    "status_code": 206,
+                    "content": CONTENT[4:],
+                    "headers": {"Content-Range": "bytes 4-9/10"},
+                },
+            ],
+        )
+        # the connection is lost after 4 bytes
+        with pytest.raises(RequestsError):
+            download_file(requests.Session(), URL, path)
+
+        download_file(requests.Session(), URL, path)
+
+        assert path.read_bytes() == CONTENT
+        assert requests_mock.last_request.headers["If-Range"] == "yesterday"
+
+    def test_resume_after_connection_error(self, requests_mock, path):
+        requests_mock.get(
+            URL,
+            [
+                {"exc": requests.exceptions.ConnectionError},
+                {"content": CONTENT, "headers": {"Content-Length": "10"}},
+            ],
+        )
+
+        download_file(requests.Session(), URL, path)
+
+        assert path.read_bytes() == CONTENT
+        assert requests_mock.call_count == 2
+
+    def test_part_file_is_complete(self, requests_mock, path, part_path):
+        part_path.write_bytes(CONTENT)
+        _write_validator(part_path, '"etag"')
+        requests_mock.get(URL, status_code=416, headers={"Content-Range": "bytes */10"})
+
+        download_file(requests.Session(), URL, path)
+
+        assert path.read_bytes() == CONTENT
+
+    def test_range_is_not_supported(self, requests_mock, path, part_path):
+        part_path.write_bytes(b"xxxx")
+        _write_validator(part_path, '"etag"')
+        requests_mock.get(URL, content=CONTENT, headers={"Content-Length": "10"})
+
+        download_file(requests.Session(), URL, path)
+
+        assert path.read_bytes() == CONTENT
+
+    def test_size_mismatch(self, requests_mock, path, part_path):
+        requests_mock.get(URL, content=CONTENT[:5], headers={"Content-Length": "10"})
+
+        with pytest.raises(RequestsError):
+            download_file(requests.Session(), URL, path)
+
+        assert not path.exists()
+
+    def test_retries_are_exhausted(self, requests_mock, path, sleep_mock):
+        requests_mock.get(URL, exc=requests.exceptions.ConnectionError)
+
+        with pytest.raises(RequestsError):
+            download_file(requests.Session(), URL, path, retries=2)
+
+        assert requests_mock.call_count == 3
+        assert not path.exists()
+
+    def test_with_error_status(self, requests_mock, path):
+        requests_mock.get(URL, status_code=403)
+
+        with pytest.raises(RequestsError):
+            download_file(requests.Session(), URL, path)
+
+        assert not path.exists()
+
+
+class TestDownloadFileWithSegments(object):
+    def test_download(self, requests_mock, path, part_path, serve_ranges):
+        serve_ranges()
+        progress = []
+
+        download_file(
+            requests.Session(),
+            URL,
+            path,
+            chunk_size=2,
+            progress=lambda *args: progress.append(args),
+            segments=3,
+        )
+
+        assert path.read_bytes() == CONTENT
+        assert not part_path.exists()
+        ranges = sorted(r.headers["Range"] for r in requests_mock.request_history)
+        assert ranges == ["bytes=0-0", "bytes=0-2", "bytes=3-5", "bytes=6-9"]
+        assert progress[0] == (0, 10)
+        assert progress[-1] == (10, 10)
+
+    def test_resume_range_after_connection_error(
+        self, requests_mock, path, serve_ranges
+    ):
+        serve_ranges(fail_once="bytes=3-5")
+
+        download_file(requests.Session(), URL, path, segments=3)
+
+        assert path.read_bytes() == CONTENT
+        assert requests_mock.call_count == 5
+
+    def test_range_is_not_supported(self, requests_mock, path):
+        requests_mock.get(URL, content=CONTENT, headers={"Content-Length": "10"})
+
+        download_file(requests.Session(), URL, path, segments=3)
+
+        assert path.read_bytes() == CONTENT
+        assert requests_mock.call_count == 2
+
+    def test_retries_are_exhausted(self, path, part_path, serve_ranges):
+        serve_ranges(fail_always="bytes=3-5")
+
+        with pytest.raises(RequestsError):
+            download_file(requests.Session(), URL, path, segments=3, retries=1)
+
+        assert not path.exists()
+        assert not part_path.exists()
+        assert not _meta_path(part_path).exists()
+
+    @pytest.mark.parametrize("segments", [1, 3])
+    def test_killed_download_is_not_resumed(
+        self, requests_mock, path, part_path, serve_ranges, segments
+    ):
+        # the part file of the killed process has the full size with holes
+        part_path.write_bytes(bytes(len(CONTENT)))
+        _meta_path(part_path).write_text(json.dumps({"segmented": True}))
+        if segments == 1:
+            requests_mock.get(URL, content=CONTENT, headers={"Content-Length": "10"})
+        else:
+            serve_ranges()
+
+        download_file(requests.Session(), URL, path, segments=segments)
+
+        assert path.read_bytes() == CONTENT
+        assert not _meta_path(part_path).exists()
+        if segments == 1:
+            assert "Range" not in requests_mock.last_request.headers
+
+    def test_interrupted(self, mocker, path, part_path, serve_ranges):
+        serve_ranges()
+        stopped = []
+
+        def download_range(*args):
+            stop = args[-1]
+            stopped.append(stop.wait(timeout=5))
+
+        mocker.patch.object(transfer, "_download_range", download_range)
+        mocker.patch.object(transfer, "as_completed", side_effect=KeyboardInterrupt)
+
+        with pytest.raises(KeyboardInterrupt):
+            download_file(requests.Session(), URL, path, segments=3)
+
+        assert stopped == [True, True, True]
+        assert not part_path.exists()
+        assert not _meta_path(part_path).exists()
+
+    @pytest.fixture
+    def serve_ranges(self, monkeypatch, requests_mock):
+        monkeypatch.setattr(transfer, "MIN_SEGMENT_SIZE", 1)
+
+        def _serve_ranges(fail_once=None, fail_always=None):
+            failed = []
+
+            def callback(request, context):
+                value = request.headers["Range"]
+                if value == fail_always or (value == fail_once and not failed):
+                    failed.append(value)
+                    raise requests.exceptions.ConnectionError
+                start, last = map(int, re.findall(r"\d+", value))
+                context.status_code = 206
+                context.headers["Content-Range"] = f"bytes {start}-{last}/10"
+                stop = last + 1
+                return CONTENT[start:stop]
+
+            requests_mock.get(URL, content=callback)
+
+        return _serve_ranges
+
+
+def _write_validator(part_path, validator):
+    _meta_path(part_path).write_text(json.dumps({"validator": validator}))
+
+
+class TestUploadFile(object):
+    def test_upload(self, requests_mock, path):
+        path.write_bytes(CONTENT)
+        received = []
+        requests_mock.put(
+            URL,
+            text=lambda request, context: received.append(
+                request.body.read(4) + request.body.read()
+            ),
+        )
+        progress = []
+
+        upload_file(
+            requests.Session(),
+            URL,
+            path,
+            headers={"Content-MD5": "md5"},
+            progress=lambda size, total: progress.append((size, total)),
+        )
+
+        assert received == [CONTENT]
+        assert requests_mock.last_request.headers["Content-MD5"] == "md5"
+        assert requests_mock.last_request.headers["Content-Length"] == "10"
+        assert progress == [(0, 10), (4, 10), (10, 10)]
+
+    @pytest.mark.parametrize(
+        "response", [{"exc": requests.exceptions.ConnectionError}, {"status_code": 503}]
+    )
+    def test_retry(self, requests_mock, path, response):
+        path.write_bytes(CONTENT)
+        requests_mock.put(URL, [response, {"status_code": 200}])
+
+        upload_file(requests.Session(), URL, path)
+
+        assert requests_mock.call_count == 2
+
+    def test_retries_are_exhausted(self, requests_mock, path):
+        path.write_bytes(CONTENT)
+        requests_mock.put(URL, exc=requests.exceptions.ConnectionError)
+
+        with pytest.raises(RequestsError):
+            upload_file(requests.Session(), URL, path, retries=2)
+
+        assert requests_mock.call_count == 3
+
+    def test_with_error_status(self, requests_mock, path):
+        path.write_bytes(CONTENT)
+        requests_mock.put(URL, status_code=403)
+
+        with pytest.raises(RequestsError):
+            upload_file(requests.Session(), URL, path)
+
+        assert requests_mock.call_count == 1
+
+
+def test_hash_file(path):
+    path.write_bytes(CONTENT)
+
+    assert hash_file(path, chunk_size=3) == (
+        "eB5eJF1ptWaXm4bijSPyxw==",
+        "84d89877f0d4041efb6bf91a16f0248f2fd573e6af05c19f96bedb9f882f7882",
+    )
+
+
+@pytest.mark.parametrize(
+    "content_range, expected",
+    [
+        ("bytes 100-199/1000", (100, 1000)),
+        ("bytes */1000", (None, 1000)),
+        ("bytes 0-99/*", (0, None)),
+        (None, (None, None)),
+    ],
+)
+def test_parse_content_range(content_range, expected):
+    assert _parse_content_range(content_range) == expected
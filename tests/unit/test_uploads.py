@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from anymotion_cli.uploads import UploadIndex
+
+SHA256 = "84d89877f0d4041efb6bf91a16f0248f2fd573e6af05c19f96bedb9f882f7882"
+
+
+@pytest.fixture
+def file(tmp_path):
+    yield tmp_path / "uploads" / "default.json"
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(b"0123456789")
+    yield path
+
+
+def test_digest(file, path):
+    index = UploadIndex(file, "scope")
+
+    assert index.digest(path) == ("eB5eJF1ptWaXm4bijSPyxw==", SHA256)
+
+
+def test_digest_is_reused_if_file_is_not_changed(mocker, file, path):
+    hash_mock = mocker.patch(
+        "anymotion_cli.uploads.hash_file", return_value=("md5", "sha256")
+    )
+    UploadIndex(file, "scope").digest(path)
+
+    assert UploadIndex(file, "scope").digest(path) == ("md5", "sha256")
+    assert hash_mock.call_count == 1
+
+    os.utime(str(path), ns=(0, 0))
+    UploadIndex(file, "scope").digest(path)
+    assert hash_mock.call_count == 2
+
+
+def test_add_and_get(file):
+    UploadIndex(file, "scope").add(SHA256, "image", 1)
+    index = UploadIndex(file, "scope")
+
+    assert index.get(SHA256) == ("image", 1)
+    assert index.get("other") is None
+
+    index.remove(SHA256)
+    assert UploadIndex(file, "scope").get(SHA256) is None
+
+
+def test_saves_are_batched(mocker, file):
+    index = UploadIndex(file, "scope")
+    save_spy = mocker.spy(index, "_save")
+
+    for i in range(100):
+        index.add(f"{i:064x}", "image", i)
+
+    assert save_spy.call_count == 1
+    assert UploadIndex(file, "scope").get(f"{99:064x}") is None
+
+    index.flush()
+    assert save_spy.call_count == 2
+    assert UploadIndex(file, "scope").get(f"{99:064x}") == ("image", 99)
+
+
+def test_other_scope_is_discarded(file):
+    UploadIndex(file, "scope").add(SHA256, "image", 1)
+
+    assert UploadIndex(file, "other scope").get(SHA256) is None
+
+
+def test_broken_file_is_ignored(file):
+    file.parent.mkdir()
+    file.write_text("{")
+
+    assert UploadIndex(file, "scope").get(SHA256) is None
@@ -1,6 +1,6 @@
 import pytest
-from anymotion_sdk.client import Client
 
+from anymotion_cli.client import CliClient
 from anymotion_cli.exceptions import ClickException, SettingsValueError
 from anymotion_cli.state import State
 from anymotion_cli.utils import (
@@ -8,6 +8,7 @@ from anymotion_cli.utils import (
     get_client,
     get_settings,
     parse_rule,
+    require_numpy,
 )
 
 
@@ -28,7 +29,7 @@ class TestGetClient(object):
         client = get_client(state)
 
         assert settings_mock.call_count == 1
-        assert type(client) is Client
+        assert type(client) is CliClient
 
     def test_error_occurs_if_is_ok_False(self, mocker):
         settings_mock = mocker.MagicMock()
@@ -58,6 +59,92 @@ class TestGetClient(object):
         assert settings_mock.call_count == 1
 
 
+class TestGetClientReused(object):
+    @pytest.fixture
+    def settings_mock(self, mocker):
+        settings_mock = mocker.MagicMock()
+        settings_mock.return_value.client_id = "client_id"
+        settings_mock.return_value.client_secret = "client_secret"
+        settings_mock.return_value.api_url = "http://api.example.com/anymotion/v1/"
+        settings_mock.return_value.interval = 10
+        settings_mock.return_value.timeout = 600
+        mocker.patch("anymotion_cli.utils.Settings", settings_mock)
+        return settings_mock
+
+    def test_client_is_not_reused_by_default(self, settings_mock):
+        state = State()
+
+        assert get_client(state) is not get_client(state)
+        assert settings_mock.call_count == 2
+
+    def test_client_is_reused(self, settings_mock):
+        state = State()
+        state.reuse_clients()
+
+        client1, client2 = get_client(state), get_client(state)
+
+        assert client1.session.session is client2.session.session
+        assert client1.auth is client2.auth
+        assert client1.poller is client2.poller
+        assert settings_mock.call_count == 1
+
+    def test_options_are_not_shared(self, settings_mock):
+        state = State()
+        state.reuse_clients()
+        state.verbose = True
+        client1 = get_client(state)
+        state.verbose = False
+        state.use_dedup = False
+        state.use_cache = False
+        client2 = get_client(state)
+
+        assert len(client1.session.request_callbacks) == 1
+        assert client1.upload_index is not None
+        assert len(client2.session.request_callbacks) == 0
+        assert client2.upload_index is None
+        assert client2.response_cache is None
+
+    def test_names_are_prefetched_if_reused(self, settings_mock):
+        state = State()
+        assert get_client(state).name_resolver.prefetch is False
+
+        state.reuse_clients()
+        assert get_client(state).name_resolver.prefetch is True
+
+    def test_upload_index_is_not_used_without_dedup(self, settings_mock):
+        state = State()
+        assert get_client(state).upload_index is not None
+
+        state.use_dedup = False
+        assert get_client(state).upload_index is None
+
+    def test_client_is_recreated_after_forget(self, settings_mock):
+        state = State()
+        state.reuse_clients()
+        client = get_client(state)
+        state.forget_client(state.profile)
+
+        assert get_client(state).poller is not client.poller
+        assert settings_mock.call_count == 2
+
+    def test_verbose_is_updated(self, settings_mock):
+        state = State()
+        state.reuse_clients()
+        state.verbose = True
+        get_client(state)
+        state.verbose = True
+        client = get_client(state)
+
+        assert len(client.session.request_callbacks) == 1
+        assert len(client.session.response_callbacks) == 1
+
+        state.verbose = False
+        client = get_client(state)
+
+        assert len(client.session.request_callbacks) == 0
+        assert len(client.session.response_callbacks) == 0
+
+
 class TestGetSettings(object):
     def test_valid(self, mocker):
         settings_mock = mocker.MagicMock()
@@ -77,6 +164,19 @@ class TestGetSettings(object):
         assert settings_mock.call_count == 1
 
 
+class TestRequireNumpy(object):
+    def test_valid(self):
+        require_numpy()
+
+    def test_not_installed(self, mocker):
+        mocker.patch.dict("sys.modules", {"numpy": None})
+
+        with pytest.raises(ClickException) as excinfo:
+            require_numpy()
+
+        assert "pip install anymotion-cli[local]" in str(excinfo.value)
+
+
 class TestParseRule(object):
     @pytest.mark.parametrize("rule, expected", [(None, None), ("[1, 2]", [1, 2])])
     def test_valid(self, rule, expected):